@@ -35,7 +35,9 @@ the following example::
     serve(TestContainer, AnotherContainer)
 """
 
+import asyncio
 import hashlib
+import time
 from pprint import pformat
 
 import tornado.routing
@@ -44,6 +46,7 @@ import tornado.web
 import core4.const
 import core4.error
 import core4.util.node
+import core4.util.tool
 from core4.api.v1.request.default import DefaultHandler
 from core4.api.v1.request.main import CoreBaseHandler
 from core4.api.v1.request.standard.asset import CoreAssetHandler
@@ -67,6 +70,88 @@ class CoreRoutingRule(tornado.routing.Rule):
         self.rsc_id = rsc_id
 
 
+class CoreHandlerDirectory(CoreBase, QueryMixin,
+                           metaclass=core4.util.tool.Singleton):
+    """
+    Process-wide directory of all alive resource handlers registered in
+    ``sys.handler`` (see :meth:`.CoreApiServerTool.register`). The directory
+    is refreshed with each heartbeat of the API server (see
+    :meth:`.CoreApiServerTool.heartbeat`) and on access if older than
+    ``daemon.heartbeat`` seconds. It serves
+    :meth:`.CoreApiContainer.get_handler` and
+    :meth:`.CoreRequestHandler.reverse_url` without database queries.
+
+    .. note:: handler documents are shared and must not be modified.
+    """
+    concurr = True
+
+    def __init__(self):
+        super().__init__()
+        self.handler = []
+        self.route = {}
+        self.timestamp = None
+        self._refresh = None
+
+    async def refresh(self):
+        """
+        Reloads all alive handlers from ``sys.handler``. Concurrent calls wait
+        for the same reload.
+        """
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.ensure_future(self._load())
+        await self._refresh
+
+    async def _load(self):
+        # internal method to load all alive handlers and the named routes
+        alive = set([(d["routing"], d["hostname"], d["port"])
+                     for d in await self.get_daemon_async(kind="app")])
+        handler = []
+        route = {}
+        inactive = 0
+        async for doc in self.config.sys.handler.find(
+                projection={"_id": 0}):
+            if ((doc["routing"], doc["hostname"], doc["port"]) in alive
+                    and doc["started_at"] is not None):
+                handler.append(doc)
+                for c in doc["container"]:
+                    if c[3] is not None:
+                        route.setdefault(c[3], []).append(
+                            (doc["routing"], c[1]))
+            else:
+                inactive += 1
+        self.handler = handler
+        self.route = route
+        # an empty directory is not kept, e.g. before the first heartbeat
+        self.timestamp = time.monotonic() if handler else None
+        self.logger.debug("found [%d] handler alive, [%d] inactive",
+                          len(handler), inactive)
+
+    async def get(self, rsc_id=None):
+        """
+        :param rsc_id: filter for
+        :return: list of alive handler documents from ``sys.handler``
+        """
+        if (self.timestamp is None
+                or time.monotonic() - self.timestamp
+                > self.config.daemon.heartbeat):
+            await self.refresh()
+        if rsc_id is None:
+            return self.handler
+        return [d for d in self.handler if d["rsc_id"] == rsc_id]
+
+    async def reverse(self, name):
+        """
+        :param name: of the rule as defined in :class:`.CoreApiContainer`
+        :return: tuple of ``routing`` and path pattern of the first alive
+                 handler with the passed rule ``name``, ``None`` if not found
+        """
+        await self.get()
+        found = self.route.get(name)
+        if found:
+            return found[0]
+        return None
+
+
 class CoreApiContainer(CoreBase, QueryMixin):
     """
     :class:`CoreApiContainer` class is a container for a single or multiple
@@ -290,8 +375,8 @@ class CoreApiContainer(CoreBase, QueryMixin):
     async def get_handler(self, rsc_id=None):
         """
         Delivers resource handler infos based on registered data in
-        ``sys.handler``. This data is saved at server startup and provides the
-        following attributes:
+        ``sys.handler`` (see :class:`.CoreHandlerDirectory`). This data is
+        saved at server startup and provides the following attributes:
 
         * title
         * subtitle (str) - defaults to ``qual_name`` if subtitle is not set
@@ -316,28 +401,22 @@ class CoreApiContainer(CoreBase, QueryMixin):
 
         If no parameter ``rsc_id`` is passed, then a list for all alive
         request handlers is returned. If a parameter ``rsc_id`` is passed to
-        the method, then the attributes for this resource is returned.
+        the method, then the attributes for this resource is returned. If the
+        resource is not found, then the directory is refreshed once before
+        the method raises :class:`tornado.web.HTTPError` 404.
 
         :param rsc_id: filter for
         :return: dict or list of ``rsc_id`` is provided.
         """
-        alive = [(d["routing"], d["hostname"], d["port"])
-                 for d in await self.get_daemon_async(kind="app")]
+        directory = CoreHandlerDirectory()
+        found = await directory.get(rsc_id)
+        if rsc_id is not None and not found:
+            # the directory might be stale, e.g. the handler started recently
+            await directory.refresh()
+            found = await directory.get(rsc_id)
         handler = {}
-        inactive = 0
-        if rsc_id is None:
-            query = {}
-        else:
-            query = {"rsc_id": rsc_id}
-        async for doc in self.config.sys.handler.find(query):
-            if ((doc["routing"], doc["hostname"], doc["port"]) in alive) \
-                    and (doc["started_at"] is not None):
-                del doc["_id"]
-                handler.setdefault(doc["rsc_id"], []).append(doc)
-            else:
-                inactive += 1
-        self.logger.debug("found [%d] handler alive, [%d] inactive",
-                          len(handler), inactive)
+        for doc in found:
+            handler.setdefault(doc["rsc_id"], []).append(doc)
         ret = []
         detail = ("hostname", "port", "routing", "container")
         for data in handler.values():
@@ -363,13 +442,17 @@ class CoreApiContainer(CoreBase, QueryMixin):
                 first["tag"] = []
             elif isinstance(first["tag"], str):
                 first["tag"] = first["tag"].split()
+            else:
+                first["tag"] = list(first["tag"])
             if date_range:
                 first["tag"].append(date_range)
             first["subtitle"] = first["subtitle"] or first["qual_name"]
             ret.append(first)
         ret.sort(key=lambda r: (str(r["title"]), r["qual_name"]))
         if rsc_id is not None:
-            assert len(ret) == 1
+            if not ret:
+                raise tornado.web.HTTPError(
+                    404, "resource [%s] not found", rsc_id)
             return ret[0]
         return ret
 
@@ -31,8 +31,9 @@ from tornado.web import RequestHandler, HTTPError
 import core4.const
 import core4.error
 import core4.util.node
-from core4.api.v1.request.role.model import CoreRole
-from core4.base.main import CoreBase
+from core4.api.v1.request.role.model import CoreRole, CoreRoleCache
+from core4.api.v1.request.token import CoreTokenCache
+from core4.base.main import CoreBase, set_identifier
 from core4.util.data import parse_boolean, json_encode, json_decode, rst2html
 from core4.util.pager import PageResult
 
@@ -148,12 +149,14 @@ class CoreBaseHandler(CoreBase):
         """
         Prepares the handler with
 
-        * setting the request ``.identifier``
+        * setting the request ``.identifier`` which is inherited by all
+          :class:`.CoreBase` objects created while handling the request
         * authentication and authorization
 
         Raises 401 error if authentication and authorization fails.
         """
         self.identifier = ObjectId()
+        set_identifier(self.identifier)
         if self.request.method in ('OPTIONS'):
             # preflight / OPTIONS should always pass
             return
@@ -201,6 +204,12 @@ class CoreBaseHandler(CoreBase):
         token is created and sent with the HTTP header (field ``token``).
         This refresh time can be configured with setting ``api.token.refresh``.
 
+        Verified tokens are cached with :class:`.CoreTokenCache`. The token
+        cookie is set with each request which does not authenticate by
+        cookie. Requests authenticated by cookie re-issue the cookie only if
+        the token is refreshed or expires within ``api.token.refresh``
+        seconds.
+
         :return: verified username
         """
         auth_header = self.request.headers.get('Authorization')
@@ -230,10 +239,10 @@ class CoreBaseHandler(CoreBase):
                 source = ("token", "cookie")
                 token = self.get_secure_cookie("token")
         if token:
-            payload = self.parse_token(token)
+            payload = CoreTokenCache().parse(token, self.parse_token)
             username = payload.get("name")
             if username:
-                user = await CoreRole().find_one(name=username)
+                user = await CoreRoleCache().find_one(username)
                 if user is None:
                     self.logger.warning(
                         "failed to load [%s] by [%s] from [%s]", username,
@@ -242,16 +251,21 @@ class CoreBaseHandler(CoreBase):
                     self.token_exp = datetime.datetime.fromtimestamp(
                         payload["exp"])
                     renew = self.config.api.token.refresh
+                    expires_in = (datetime.datetime.utcfromtimestamp(
+                        payload["exp"]) - core4.util.node.now()).total_seconds()
                     if (core4.util.node.now()
                         - datetime.datetime.fromtimestamp(
                                 payload["timestamp"])).total_seconds() > renew:
                         token = self.create_token(username)
                         self.logger.debug("refresh token [%s] to [%s]",
                                           username, self.token_exp)
+                    elif source[1] != "cookie" or expires_in < renew:
+                        # the cookie already carries an unchanged token,
+                        #   re-issue near expiry only
+                        self.set_secure_cookie("token", token)
                     self.logger.debug(
                         "successfully loaded [%s] by [%s] from [%s] "
                         "expiring [%s]", username, *source, self.token_exp)
-                    self.set_secure_cookie("token", token)
                     # self.set_header("token", token)
                     return user
         elif username and password:
@@ -261,7 +275,8 @@ class CoreBaseHandler(CoreBase):
                 self.logger.warning(
                     "failed to load [%s] by [%s] from [%s]", username, *source)
             else:
-                if user and user.verify_password(password):
+                if user and await user.authenticate(
+                        password, cache=source[1] == "Auth Basic"):
                     self.token_exp = None
                     self.logger.debug(
                         "successfully loaded [%s] by [%s] from [%s]",
@@ -1072,7 +1087,6 @@ class CoreRequestHandler(CoreBaseHandler, RequestHandler):
                     await tornado.gen.sleep(0.000000001)  # 1 nanosecond
         self.finish()
 
-    # todo: fix required
     async def reverse_url(self, name, *args):
         """
         Returns a URL path for handler named ``name``
@@ -1081,52 +1095,20 @@ class CoreRequestHandler(CoreBaseHandler, RequestHandler):
         They will be converted to strings if necessary, encoded as utf8,
         and url-escaped.
 
+        The lookup uses the in-memory :class:`.CoreHandlerDirectory` of all
+        alive handlers.
+
         :param name: handler name as defined in :class:`.CoreApiContainer`
         :param args: arguments for capturing groups
         :return: fully qualified url path (str) including protocl, hostname,
             port and path
         """
-        handler = self.config.sys.handler
-        worker = self.config.sys.worker
-        timeout = self.config.daemon.alive_timeout
-        found = []
-        pipeline = [
-            {
-                "$unwind": "$pattern"
-            },
-            {
-                "$match": {
-                    "pattern.0": name,
-                    "started_at": {
-                        "$ne": None
-                    }
-                }
-            }
-        ]
-        async for doc in handler.aggregate(pipeline):
-            alive = await worker.count_documents({
-                "kind": "app",
-                "hostname": doc["hostname"],
-                "port": doc["port"],
-                "protocol": doc["protocol"],
-                "heartbeat": {"$exists": True},
-                "phase.shutdown": None,
-                "$or": [
-                    {"heartbeat": None},
-                    dict(heartbeat={
-                        "$gte": (core4.util.node.mongo_now() -
-                                 datetime.timedelta(seconds=timeout))
-                    })
-                ]
-            })
-            if alive > 0:
-                found.append(doc)
-        if len(found) > 0:
-            route = found[0]
-            matcher = tornado.routing.PathMatches(route["pattern"][1])
-            url = matcher.reverse(*args)
-            return "{}://{}:{}{}".format(route["protocol"], route["hostname"],
-                                         route["port"], url)
+        from core4.api.v1.application import CoreHandlerDirectory
+        found = await CoreHandlerDirectory().reverse(name)
+        if found is not None:
+            (routing, pattern) = found
+            matcher = tornado.routing.PathMatches(pattern)
+            return routing + matcher.reverse(*args)
         raise KeyError("%s not found or not unique in named urls" % name)
 
     def json(self):
@@ -5,21 +5,26 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
+import asyncio
 import sys
+import time
 import traceback
 import pymongo
 import pymongo.errors
 from bson.objectid import ObjectId
-from tornado import gen
+from tornado.ioloop import IOLoop
 from tornado.iostream import StreamClosedError
 from tornado.web import HTTPError
 
 import core4.const
 import core4.error
 import core4.queue.job
+import core4.queue.main
 import core4.queue.query
 import core4.util.node
 from core4.api.v1.request.main import CoreRequestHandler
+from core4.api.v1.request.queue.watch import CoreJobWatch, apply
+from core4.logger.tail import CoreLogTail
 from core4.queue.main import CoreQueue
 from core4.util.data import json_encode
 from core4.util.pager import CorePager
@@ -51,6 +56,16 @@ class JobHandler(CoreRequestHandler, core4.queue.query.QueryMixin):
         self.queue = CoreQueue()
         self._collection = {}
 
+    def queue_state(self):
+        """
+        Returns the state of job state count snapshots shared with
+        :class:`.CoreQueue` of the current process, see
+        :meth:`.QueryMixin.queue_state`.
+
+        :return: dict
+        """
+        return self.queue.queue_state()
+
     def collection(self, name):
         """
         Singleton connect and return async MongoDB connection.
@@ -231,7 +246,10 @@ class JobHandler(CoreRequestHandler, core4.queue.query.QueryMixin):
     async def get_listing(self):
         """
         Retrieve job listing from ``sys.queue``. Only jobs with read/execute
-        access permissions granted to the current user are returned.
+        access permissions granted to the current user are returned. The
+        permissions are translated into a MongoDB query (see
+        :meth:`.CoreRole.job_filter`), so paging and counting happen in
+        MongoDB.
 
         :return: :class:`.PageResult`
         """
@@ -242,24 +260,30 @@ class JobHandler(CoreRequestHandler, core4.queue.query.QueryMixin):
         sort_by = self.get_argument("sort", default="_id")
         sort_order = self.get_argument("order", default=1)
 
-        data = []
-        async for doc in self.collection("queue").find(query_filter).sort(
-                [(sort_by, int(sort_order))]):
-            if await self.user.has_job_access(doc["name"]):
-                data.append(doc)
+        access = await self.user.job_filter()
 
-        async def _length(*args, **kwargs):
-            return len(data)
+        def _restrict(filter):
+            # apply job access permissions also to the unfiltered total count
+            if access is None:
+                return filter
+            if filter:
+                return {"$and": [filter, access]}
+            return access
 
-        async def _query(skip, limit, *args, **kwargs):
-            return data[skip:(skip + limit)]
+        async def _length(filter):
+            return await self.collection("queue").count_documents(
+                _restrict(filter))
+
+        async def _query(skip, limit, filter, sort_by):
+            cur = self.collection("queue").find(_restrict(filter)).sort(
+                [sort_by]).skip(skip).limit(limit)
+            return await cur.to_list(length=limit)
 
         pager = CorePager(per_page=int(per_page),
                           current_page=int(current_page),
                           length=_length, query=_query,
-                          #sort_by=[sort_by, int(sort_order)],
-                          #filter=query_filter
-        )
+                          sort_by=(sort_by, int(sort_order)),
+                          filter=query_filter)
         return await pager.page()
 
     async def get_detail(self, _id):
@@ -566,7 +590,7 @@ class JobHandler(CoreRequestHandler, core4.queue.query.QueryMixin):
             "username": self.current_user
         }
 
-    async def get_queue_count(self):
+    async def get_queue_count(self, max_age=None):
         """
         Retrieves aggregated information about ``sys.queue`` state. This is
 
@@ -575,24 +599,60 @@ class JobHandler(CoreRequestHandler, core4.queue.query.QueryMixin):
         * ``flags`` - job flags ``zombie``, ``wall``, ``removed`` and
           ``killed``
 
+        See :meth:`.QueryMixin.get_queue_count` about ``max_age``.
+
+        :param max_age: max. age of the snapshot in seconds, defaults to
+                        ``None`` (no snapshot)
         :return: dict
         """
-        cur = self.collection("queue").aggregate(self.pipeline_queue_count())
-        ret = {}
-        async for doc in cur:
-            ret[doc["state"]] = doc["n"]
+        coll = self.collection("queue")
+        ret = self.get_queue_snapshot(coll, max_age)
+        if ret is None:
+            cur = coll.aggregate(self.pipeline_queue_count())
+            ret = {}
+            async for doc in cur:
+                ret[doc["state"]] = doc["n"]
+            self.set_queue_snapshot(coll, ret)
         return ret
 
-    async def make_stat(self, event, _id):
+    async def make_stat(self, event, _id, n=None):
         """
         Collects current job state counts from ``sys.queue`` and inserts a
         record into ``sys.event``. See also :meth:`.CoreQueue.make_stat`.
+        If the job state counts have been reused from a snapshot, then a
+        trailing refresh is scheduled, see :meth:`.flush_stat`.
 
         :param event: to log
-        :param _id: job _id
+        :param _id: job _id or list of job _id
+        :param n: number of jobs, defaults to ``None`` (not recorded)
+        """
+        if event in core4.queue.query.FINAL_EVENT:
+            max_age = None
+        else:
+            max_age = self.config.event.queue_count_interval
+        data = {"_id": _id,
+                "queue": await self.get_queue_count(max_age=max_age)}
+        if n is not None:
+            data["n"] = n
+        self.trigger(name=event, channel=core4.const.QUEUE_CHANNEL, data=data)
+        coll = self.collection("queue")
+        trailing = self.queue_state()["trailing"]
+        at = self.get_queue_reuse(coll)
+        if at is not None and coll.info_url not in trailing:
+            trailing.add(coll.info_url)
+            IOLoop.current().call_later(
+                max(0, at + max_age - time.monotonic()), self.flush_stat)
+
+    async def flush_stat(self):
+        """
+        Inserts a ``queue_count`` record with current job state counts into
+        ``sys.event`` if :meth:`.make_stat` reused a snapshot of job state
+        counts. See also :meth:`.CoreQueue.flush_stat`.
         """
-        self.trigger(name=event, channel=core4.const.QUEUE_CHANNEL,
-                     data={"_id": _id, "queue": await self.get_queue_count()})
+        coll = self.collection("queue")
+        self.queue_state()["trailing"].discard(coll.info_url)
+        if self.get_queue_reuse(coll) is not None:
+            await self.make_stat("queue_count", None)
 
 
 class JobPost(JobHandler):
@@ -717,6 +777,122 @@ class JobPost(JobHandler):
         return job
 
 
+class JobBulkPost(JobPost):
+    """
+    Post multiple jobs of the same name with different arguments.
+    """
+
+    author = "mra"
+    title = "enqueue jobs"
+    tag = "api jobs"
+
+    async def post(self, _id=None):
+        """
+        Only jobs with execute access permissions granted to the current user
+        can be posted. See also :meth:`.CoreQueue.enqueue_many`.
+
+        Methods:
+            POST /core4/api/v1/jobs/enqueue_many - enqueue multiple jobs
+
+        Parameters:
+            name (str): qual_name of the job
+            args (list of dict): arguments and job properties (see
+                                 :class:`.JobPost`) of each job
+
+        Returns:
+            data element with a list of
+
+            - **_id**: of the enqueued job or ``None`` if the job exists
+            - **name**: of the enqueued job
+            - **error**: if the job exists with args
+
+        Raises:
+            400: invalid args
+            401: Unauthorized
+            403: Forbidden
+            404: cannot instantiate job
+
+        Examples:
+            >>> from requests import post, get
+            >>> url = "http://localhost:5001/core4/api/v1"
+            >>> signin = get(url + "/login?username=admin&password=hans")
+            >>> token = signin.json()["data"]["token"]
+            >>> h = {"Authorization": "Bearer " + token}
+            >>> name = "core4.queue.helper.job.example.DummyJob"
+            >>> rv = post(url + "/jobs/enqueue_many", headers=h, json={
+            ...     "name": name, "args": [{"i": 1}, {"i": 2}, {"i": 1}]})
+            >>> rv.json()["data"]
+            [
+                {
+                    '_id': '5bdb554fde8b6925830b8b3e',
+                    'name': 'core4.queue.helper.job.example.DummyJob'
+                },
+                {
+                    '_id': '5bdb554fde8b6925830b8b3f',
+                    'name': 'core4.queue.helper.job.example.DummyJob'
+                },
+                {
+                    '_id': None,
+                    'name': 'core4.queue.helper.job.example.DummyJob',
+                    'error': "job exists with args {'i': 1}"
+                }
+            ]
+        """
+        name = self.get_argument("name")
+        args = self.get_argument("args", as_type=list)
+        self.reply(await self.enqueue_many(name, args))
+
+    async def enqueue_many(self, name, args):
+        """
+        Enqueue jobs with name and list of arguments.
+
+        :return: list of dict with ``_id`` and ``name`` of each job and
+                 ``error`` if the job exists
+        """
+        try:
+            proto = self.queue.job_factory(name)
+        except Exception:
+            exc_info = sys.exc_info()
+            raise HTTPError(404, "cannot instantiate job [%s]: %s:\n%s",
+                            name, repr(exc_info[1]),
+                            traceback.format_exception(*exc_info))
+        if not await self.user.has_job_exec_access(proto.qual_name()):
+            raise HTTPError(403)
+        jobs = []
+        for kwargs in args:
+            try:
+                job = proto.clone(**kwargs)
+                job.validate()
+            except Exception as exc:
+                raise HTTPError(400, "invalid args %s: %s", kwargs, repr(exc))
+            jobs.append(job)
+        if not jobs:
+            return []
+        docs = self.queue.prepare_jobs(jobs, by=self.who())
+        error = None
+        try:
+            await self.collection("queue").insert_many(docs, ordered=False)
+        except pymongo.errors.BulkWriteError as exc:
+            error = exc
+        ret = []
+        for job, res in zip(jobs, self.queue.collect_jobs(jobs, docs, error)):
+            if isinstance(res, core4.error.CoreJobExists):
+                ret.append({
+                    "_id": None,
+                    "name": job.qual_name(),
+                    "error": "job exists with args {}".format(job.args)
+                })
+            else:
+                ret.append({"_id": job._id, "name": job.qual_name()})
+        _id = [str(r["_id"]) for r in ret if r["_id"] is not None]
+        self.logger.info(
+            'successfully enqueued [%d] of [%d] [%s]', len(_id), len(jobs),
+            proto.qual_name())
+        await self.make_stat(
+            "enqueue_many", _id[:core4.queue.main.MAX_EVENT_ID], n=len(_id))
+        return ret
+
+
 class JobStream(JobPost):
     """
     Stream job attributes until job reached final state (``ERROR``,
@@ -730,6 +906,9 @@ class JobStream(JobPost):
     def initialise_object(self):
         super().initialise_object()
         self.last_log = None
+        self.log_queue = None
+        self.log_pending = []
+        self.log_seen = set()
 
     async def enter(self):
         raise HTTPError(400, "You cannot directly enter this endpoint. "
@@ -780,21 +959,45 @@ class JobStream(JobPost):
         self.set_header('cache-control', 'no-cache')
         self.set_header('X-Accel-Buffering', 'no')
         oid = self.parse_id(_id)
-        last = None
-        exit = False
-        while not exit:
+        watch = CoreJobWatch()
+        tail = CoreLogTail()
+        # subscribe before reading the job and log history to miss no change
+        subscription = watch.subscribe(oid)
+        self.log_queue = tail.subscribe(identifier=str(oid))
+        timeout = self.config.api.job_stream.timeout
+        try:
             doc = await self.get_detail(oid)
+            changed = True
             exit = await self.get_log(oid)
-            if doc["state"] in STATE_FINAL:
-                exit = True
-                await self.sse("state", doc)
-                await self.sse("close", {})
-                self.finish()
-            elif last is None or doc != last:
-                last = doc
-                exit = exit or await self.sse("state", doc)
-            await gen.sleep(1.)
-        await self.get_log(oid)
+            while not exit:
+                if doc["state"] in STATE_FINAL:
+                    await self.pop_log()
+                    # catch up with records not delivered by the tail, yet
+                    await self.get_log(oid)
+                    await self.sse("state", doc)
+                    await self.sse("close", {})
+                    self.finish()
+                    break
+                if changed and await self.sse("state", doc):
+                    break
+                notified = await self.wait_change(subscription, timeout)
+                if await self.pop_log():
+                    break
+                if not notified:
+                    changed = None
+                elif subscription.event.is_set():
+                    (reload, delta) = await subscription.get()
+                    changed = None if reload else apply(doc, delta)
+                else:
+                    changed = False
+                if changed is None:
+                    # reload after timeout, journal or unknown delta
+                    last = doc
+                    doc = await self.get_detail(oid)
+                    changed = doc != last
+        finally:
+            watch.unsubscribe(subscription)
+            tail.unsubscribe(self.log_queue)
 
     async def sse(self, event, doc):
         js = json_encode(doc, indent=None, separators=(',', ':'))
@@ -814,11 +1017,59 @@ class JobStream(JobPost):
         return False
 
     async def get_log(self, _id):
+        """
+        Streams the log history of the job.
+
+        :param _id: job _id
+        :return: ``True`` if the stream has been closed
+        """
         query = {"identifier": str(_id)}
         if self.last_log:
             query["_id"] = {"$gt": self.last_log}
         cur = self.collection("log").find(filter=query)
         async for line in cur:
+            self.log_seen.add(line["_id"])
+            if await self.sse("log", line):
+                return True
+            self.last_log = line["_id"]
+        return False
+
+    async def wait_change(self, subscription, timeout):
+        """
+        Waits up to ``timeout`` seconds for new log records of the job from
+        :class:`.CoreLogTail` or for job changes from :class:`.CoreJobWatch`.
+
+        :param subscription: :class:`.JobSubscription` of the job
+        :param timeout: seconds to wait
+        :return: ``False`` if nothing happened within ``timeout`` seconds
+        """
+        if self.log_queue.empty() and not subscription.event.is_set():
+            log = asyncio.ensure_future(self.log_queue.get())
+            state = asyncio.ensure_future(subscription.event.wait())
+            (done, pending) = await asyncio.wait(
+                (log, state), timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED)
+            for future in pending:
+                future.cancel()
+            if log in done:
+                self.log_pending.append(log.result())
+            return bool(done)
+        return True
+
+    async def pop_log(self):
+        """
+        Streams all pending log records of the job received from
+        :class:`.CoreLogTail`.
+
+        :return: ``True`` if the stream has been closed
+        """
+        lines = self.log_pending
+        self.log_pending = []
+        while not self.log_queue.empty():
+            lines.append(self.log_queue.get_nowait())
+        for line in lines:
+            if line["_id"] in self.log_seen:
+                continue
             if await self.sse("log", line):
                 return True
             self.last_log = line["_id"]
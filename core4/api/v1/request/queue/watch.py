@@ -0,0 +1,315 @@
+#
+# Copyright 2018 Plan.Net Business Intelligence GmbH & Co. KG
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+This module delivers :class:`.CoreJobWatch` to share the observation of job
+states in ``sys.queue`` and ``sys.journal`` among all :class:`.JobStream`
+clients of a process.
+"""
+
+import asyncio
+import time
+
+import pymongo.errors
+
+import core4.util.tool
+from core4.base.main import CoreBase
+from core4.queue.query import QueryMixin
+
+#: job attributes updated with each progress report, see
+#: :meth:`.CoreJob.progress`
+PROGRESS = ("prog", "locked")
+
+#: marker of removed job attributes in a delta
+UNSET = object()
+
+#: collections watched with change streams
+WATCH = ("queue", "journal")
+
+#: maximum number of seconds before a failed change stream is reopened
+MAX_RETRY = 60.
+
+
+def apply(doc, delta):
+    """
+    Applies the passed delta to the job document. The keys of the delta are
+    attribute paths in dot notation as delivered by MongoDB change streams.
+    Removed attributes carry the value :data:`UNSET`.
+
+    :param doc: job document to be modified in place
+    :param delta: dict of attribute paths and values
+    :return: ``True`` if the document changed, ``False`` if not and ``None``
+             if an attribute path could not be resolved
+    """
+    changed = False
+    for key, value in delta.items():
+        *path, attr = key.split(".")
+        node = doc
+        for step in path:
+            if node.get(step) is None:
+                node[step] = {}
+            node = node[step]
+            if not isinstance(node, dict):
+                return None
+        if value is UNSET:
+            if attr in node:
+                del node[attr]
+                changed = True
+        elif attr not in node or node[attr] != value:
+            node[attr] = value
+            changed = True
+    return changed
+
+
+class JobSubscription:
+    """
+    Subscription of a single client to the changes of a job, see
+    :meth:`.CoreJobWatch.subscribe`. Pending changes are merged into one
+    delta until the client collects them with :meth:`.get`.
+    """
+
+    def __init__(self, _id, coalesce):
+        self._id = _id
+        self.coalesce = coalesce
+        self.event = asyncio.Event()
+        self.delta = {}
+        self.reload = False
+        self.delivered = 0.
+
+    def push(self, delta=None):
+        """
+        Merges the passed delta into the pending changes. Without delta the
+        client is requested to reload the job document.
+
+        :param delta: dict of attribute paths and values, see :func:`apply`
+        """
+        if delta is None:
+            self.reload = True
+            self.delta.clear()
+        elif not self.reload:
+            for key, value in delta.items():
+                # re-insert to keep the order of updates
+                self.delta.pop(key, None)
+                self.delta[key] = value
+        self.event.set()
+
+    async def get(self):
+        """
+        Collects the pending changes. Progress updates (attributes
+        :data:`PROGRESS`) are coalesced and delivered at most once every
+        ``api.job_stream.coalesce`` seconds.
+
+        :return: tuple of reload flag and the merged delta
+        """
+        if not self.reload and all(k.split(".")[0] in PROGRESS
+                                   for k in self.delta):
+            wait = self.delivered + self.coalesce - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        reload, delta = self.reload, self.delta
+        self.reload = False
+        self.delta = {}
+        self.event.clear()
+        self.delivered = time.monotonic()
+        return reload, delta
+
+
+class CoreJobWatch(CoreBase, QueryMixin,
+                   metaclass=core4.util.tool.Singleton):
+    """
+    Process-wide observer of the job states in ``sys.queue`` and
+    ``sys.journal``. Changes of the job attributes of
+    :meth:`.project_job_listing` are pushed as deltas to the subscriptions
+    of the job only, see :meth:`.subscribe`.
+
+    With ``api.job_stream.change_stream`` the observer watches ``sys.queue``
+    and ``sys.journal`` with MongoDB change streams. Otherwise, and while a
+    change stream is not available, all jobs with subscriptions are queried
+    with a single query every ``api.job_stream.interval`` seconds. Failed
+    change streams are reopened with an exponential backoff up to
+    :data:`MAX_RETRY` seconds.
+    """
+    concurr = True
+
+    def __init__(self):
+        super().__init__()
+        self.subscriber = {}
+        self.snapshot = {}
+        self.projection = set(self.project_job_listing().keys())
+        self.watcher = {}
+        self.streaming = set()
+        self.poller = None
+
+    def subscribe(self, _id):
+        """
+        Subscribes to the changes of the job with the passed ``_id``.
+
+        :param _id: job _id (:class:`bson.objectid.ObjectId`)
+        :return: :class:`.JobSubscription`
+        """
+        setting = self.config.api.job_stream
+        subscription = JobSubscription(_id, setting.coalesce)
+        self.subscriber.setdefault(_id, set()).add(subscription)
+        if setting.change_stream:
+            self.watch()
+        if not self._streaming():
+            self.poll()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Removes the passed subscription, see :meth:`.subscribe`. The change
+        streams are closed with the last subscription.
+
+        :param subscription: :class:`.JobSubscription`
+        """
+        subscriber = self.subscriber.get(subscription._id)
+        if subscriber is not None:
+            subscriber.discard(subscription)
+            if not subscriber:
+                del self.subscriber[subscription._id]
+                self.snapshot.pop(subscription._id, None)
+        if not self.subscriber:
+            self.stop()
+
+    def _publish(self, _id, delta=None):
+        # internal method to push the delta to all subscriptions of the job
+        for subscription in self.subscriber.get(_id, ()):
+            subscription.push(delta)
+
+    def _publish_all(self):
+        # internal method to request all subscriptions to reload
+        for _id in list(self.subscriber.keys()):
+            self._publish(_id)
+
+    def watch(self):
+        """
+        Spawns the change streams watching ``sys.queue`` and ``sys.journal``
+        if not running, yet. The change streams run until the last
+        subscription is removed, see :meth:`.unsubscribe`.
+        """
+        for name in WATCH:
+            task = self.watcher.get(name)
+            if task is None or task.done():
+                self.watcher[name] = asyncio.ensure_future(self._watch(name))
+
+    def stop(self):
+        """
+        Cancels the change streams spawned with :meth:`.watch`.
+        """
+        for task in self.watcher.values():
+            task.cancel()
+        self.watcher.clear()
+        self.streaming.clear()
+
+    def poll(self):
+        """
+        Spawns the polling of all jobs with subscriptions if not running,
+        yet. Polling stops without subscriptions and if all change streams
+        are open.
+        """
+        if self.subscriber and (self.poller is None or self.poller.done()):
+            self.poller = asyncio.ensure_future(self._poll())
+
+    def _streaming(self):
+        # internal method to verify all change streams are open
+        return self.streaming.issuperset(WATCH)
+
+    def _stream(self, name):
+        # internal method to open the change stream of sys.queue or
+        #   sys.journal
+        coll = getattr(self.config.sys, name).connect_async()
+        return coll.watch([{"$project": {"fullDocument": 0}}])
+
+    async def _watch(self, name):
+        # internal method to dispatch the changes of sys.queue or sys.journal
+        #   and to reopen the change stream after failure
+        delay = 1.
+        warn = True
+        while True:
+            try:
+                async with self._stream(name) as stream:
+                    self.streaming.add(name)
+                    self.logger.debug("watching [sys.%s]", name)
+                    delay = 1.
+                    warn = True
+                    # changes before the stream opened are lost
+                    self._publish_all()
+                    async for change in stream:
+                        self._dispatch(change)
+            except pymongo.errors.PyMongoError:
+                if warn:
+                    self.logger.warning(
+                        "failed to watch [sys.%s], polling", name,
+                        exc_info=True)
+                warn = False
+            finally:
+                self.streaming.discard(name)
+            # fall back to polling until the change stream is reopened
+            self.poll()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2., MAX_RETRY)
+
+    def _dispatch(self, change):
+        # internal method to translate a change event into a delta
+        _id = change.get("documentKey", {}).get("_id")
+        if _id not in self.subscriber:
+            return
+        if change["operationType"] != "update":
+            # replaced, moved to sys.journal or removed
+            self._publish(_id)
+            return
+        update = change["updateDescription"]
+        delta = {}
+        for key, value in update.get("updatedFields", {}).items():
+            if key.split(".")[0] in self.projection:
+                delta[key] = value
+        for key in update.get("removedFields", []):
+            if key.split(".")[0] in self.projection:
+                delta[key] = UNSET
+        if delta:
+            self._publish(_id, delta)
+
+    async def _poll(self):
+        # internal method to query all jobs with subscriptions while there
+        #   are subscriptions
+        coll = self.config.sys.queue.connect_async()
+        projection = self.project_job_listing()
+        self.logger.debug("start polling [sys.queue]")
+        while self.subscriber and not self._streaming():
+            nxt = asyncio.sleep(self.config.api.job_stream.interval)
+            _id = list(self.subscriber.keys())
+            cur = coll.find({"_id": {"$in": _id}}, projection=projection)
+            found = {}
+            async for doc in cur:
+                found[doc["_id"]] = doc
+            for i in _id:
+                self._compare(i, found.get(i))
+            await nxt
+        self.logger.debug("stop polling [sys.queue]")
+
+    def _compare(self, _id, doc):
+        # internal method to publish the difference of the job document to
+        #   the last snapshot
+        if _id not in self.subscriber:
+            return
+        last = self.snapshot.get(_id, {})
+        self.snapshot[_id] = doc
+        if doc is None:
+            if last is not None:
+                # moved to sys.journal or removed
+                self._publish(_id)
+            return
+        if last is None:
+            last = {}
+        delta = {}
+        for key in self.projection:
+            value = doc.get(key, UNSET)
+            if value != last.get(key, UNSET):
+                delta[key] = value
+        if delta:
+            self._publish(_id, delta)
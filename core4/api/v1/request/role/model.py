@@ -9,12 +9,20 @@
 This module delivers the :class:`.CoreRole` to manage users and roles.
 """
 
+import asyncio
+import collections
+import hashlib
 import json
+import time
+
+import pymongo.errors
 
 import core4.error
 import core4.util.crypt
 import core4.util.node
+import core4.util.tool
 from core4.api.v1.request.role.field import *
+from core4.api.v1.request.role.perm import CorePermMatcher
 from core4.base.main import CoreBase
 
 ALPHANUM = re.compile(r'^[a-zA-Z0-9_.-]+$')
@@ -55,6 +63,9 @@ class CoreRole(CoreBase):
         ArgumentParsingError - role must be loaded before delete
     """
 
+    #: process-wide cache of verified credentials, see :meth:`.authenticate`
+    _credential = collections.OrderedDict()
+
     def __init__(self, **kwargs):
         super().__init__()
         fields = [
@@ -84,6 +95,9 @@ class CoreRole(CoreBase):
                 raise KeyError("unknown field [{}]".format(field))
         self._role_collection = None
         self._casc_role = None
+        self._casc_perm = None
+        self._casc_seen = None
+        self._matcher = None
 
     @property
     def role_collection(self):
@@ -143,6 +157,42 @@ class CoreRole(CoreBase):
             field.validate_type()
             field.validate_value()
 
+    async def authenticate(self, plain, cache=False):
+        """
+        Verifies the password with :meth:`.verify_password` in the thread
+        pool of :func:`core4.util.crypt.get_executor`. The number of
+        concurrent verifications is limited by ``api.password.max_workers``.
+
+        With ``cache`` verified credentials are kept for
+        ``api.password.cache_ttl`` seconds. The cache key includes the
+        password hash of the role, so a password change invalidates the
+        cached credentials.
+
+        :param plain: clear text password
+        :param cache: use the verified credential cache
+        :return: ``True`` if the role is active, and the password matches
+        """
+        setting = self.config.api.password
+        key = None
+        if cache and setting.cache_ttl and self.is_active:
+            key = hashlib.sha256("\0".join(
+                (self.name, str(self.password), plain)).encode(
+                "utf-8")).digest()
+            expire = self._credential.get(key)
+            if expire is not None:
+                if time.monotonic() < expire:
+                    return True
+                del self._credential[key]
+        loop = asyncio.get_event_loop()
+        verified = await loop.run_in_executor(
+            core4.util.crypt.get_executor(setting.max_workers),
+            self.verify_password, plain)
+        if verified and key is not None:
+            self._credential[key] = time.monotonic() + setting.cache_ttl
+            while len(self._credential) > setting.cache_size:
+                self._credential.popitem(last=False)
+        return verified
+
     def verify_password(self, plain):
         """
         :param plain: clear text password
@@ -199,6 +249,9 @@ class CoreRole(CoreBase):
         """
         # await self.create_index()
         await self.resolve_roles()
+        self._casc_role = None
+        self._casc_perm = None
+        self._matcher = None
         self.validate(initial)
         if self._id is None:
             saved = await self._create()
@@ -252,6 +305,7 @@ class CoreRole(CoreBase):
         ret = await self.role_collection.insert_one(self.to_doc())
         if ret.inserted_id is None:
             raise RuntimeError("failed to insert role [{}]".format(self.name))
+        CoreRoleCache().clear()
         self._id = ret.inserted_id
         self.logger.info("created role [%s] with _id [%s]", self.name,
                          self._id)
@@ -284,6 +338,7 @@ class CoreRole(CoreBase):
             raise core4.error.Core4ConflictError(
                 "update [{}] with etag [{}] failed".format(
                     self._id, curr_etag))
+        CoreRoleCache().clear()
         self.logger.info("updated role [%s] with _id [%s]", self.name,
                          self._id)
         return True
@@ -388,10 +443,12 @@ class CoreRole(CoreBase):
 
         :return: list of permission str
         """
-        perm = self.perm
-        for role in await self.casc_role():
-            perm += role.perm
-        return sorted(list(set(perm)))
+        if self._casc_perm is None:
+            perm = list(self.perm or [])
+            for role in await self.casc_role():
+                perm += role.perm
+            self._casc_perm = sorted(list(set(perm)))
+        return self._casc_perm
 
     async def casc_role(self):
         """
@@ -415,6 +472,7 @@ class CoreRole(CoreBase):
 
             self._casc_role = []
             await traverse(self.data["role"]._id, self._casc_role)
+            self._casc_seen = seen
 
         return self._casc_role
 
@@ -440,23 +498,26 @@ class CoreRole(CoreBase):
                 "role": self._id
             }
         })
+        CoreRoleCache().clear()
         self.logger.info("deleted role [%s] with _id [%s]", self.name,
                          self._id)
         self._id = None
         self.data["etag"].set(None)
         return True
 
+    async def matcher(self):
+        """
+        :return: :class:`.CorePermMatcher` of the combined permissions of the
+                 role (see :meth:`.casc_perm`)
+        """
+        if self._matcher is None:
+            self._matcher = CorePermMatcher(await self.casc_perm())
+        return self._matcher
+
     async def _job_access(self, qual_name, access):
         # verify access (r|x) to the passed qual_name
-        if await self.is_admin():
-            return True
-        for p in await self.casc_perm():
-            (*proto, qn, acc) = p.split("/")
-            if proto[0] == "job:":
-                if re.match(qn, qual_name):
-                    if acc.lower() in access:
-                        return True
-        return False
+        matcher = await self.matcher()
+        return matcher.admin or matcher.has_job(qual_name, access)
 
     async def has_job_access(self, qual_name):
         """
@@ -468,6 +529,17 @@ class CoreRole(CoreBase):
         return await self._job_access(
             qual_name, (JOB_EXECUTION_RIGHT, JOB_READ_RIGHT))
 
+    async def job_filter(self):
+        """
+        Translates read/execute access to jobs into a MongoDB query on the
+        job ``name`` (see :meth:`.CorePermMatcher.job_filter`).
+
+        :return: MongoDB query dict or ``None`` if the role has access to all
+                 jobs
+        """
+        return (await self.matcher()).job_filter(
+            (JOB_EXECUTION_RIGHT, JOB_READ_RIGHT))
+
     async def has_job_exec_access(self, qual_name):
         """
         Verify execute access to the passed job ``qual_name``
@@ -482,7 +554,7 @@ class CoreRole(CoreBase):
         """
         :return: ``True`` if the role as a ``perm`` record of ``cop``.
         """
-        return COP in await self.casc_perm()
+        return (await self.matcher()).admin
 
     async def has_api_access(self, qual_name):
         """
@@ -492,16 +564,13 @@ class CoreRole(CoreBase):
         :param qual_name: to verify
         :return: bool
         """
-        if await self.is_admin():
+        matcher = await self.matcher()
+        if matcher.admin:
+            return True
+        if matcher.has_api(qual_name):
+            self.logger.debug("approved api permission [%s] for user [%s]",
+                              qual_name, self.name)
             return True
-        for p in await self.casc_perm():
-            (*proto, qn) = p.split("/")
-            if proto[0] == "api:":
-                if re.match(qn, qual_name):
-                    self.logger.debug(
-                        "approved api permission [%s] for user [%s]",
-                        self.name, qn)
-                    return True
         self.logger.debug("no appropriate api permission found for user [%s]",
                           self.name)
         return False
@@ -513,17 +582,12 @@ class CoreRole(CoreBase):
         :param client: client (str) extracted from the URL
         :return: ``True`` for success, else ``False``
         """
-        if await self.is_admin():
+        matcher = await self.matcher()
+        if matcher.admin:
+            return True
+        if matcher.has_client(client):
+            self.logger.debug("grant access to client [%s]", client)
             return True
-        for p in await self.casc_perm():
-            parts = p.split("/")
-            if len(parts) > 3:
-                if parts[0] == "app:":
-                    if parts[2] == "client":
-                        if "/".join(parts[3:]) == client:
-                            self.logger.debug("grant access to client [%s]",
-                                              client)
-                            return True
         return False
 
     async def login(self):
@@ -621,3 +685,107 @@ class CoreRole(CoreBase):
 
     async def distinct_roles(self):
         return await self.role_collection.distinct("name")
+
+
+class CoreRoleCache(CoreBase, metaclass=core4.util.tool.Singleton):
+    """
+    Process-wide LRU cache of users and roles with their cascaded roles and
+    flattened permissions (see :meth:`.CoreRole.casc_role` and
+    :meth:`.CoreRole.casc_perm`). The cache is used by
+    :meth:`.CoreRequestHandler.verify_user` to authorize requests without
+    querying ``sys.role``.
+
+    Cached roles are keyed by name and are valid for ``api.role_cache.ttl``
+    seconds. Expired roles are revalidated with a single query comparing the
+    ``etag`` of the role and all cascaded roles. With
+    ``api.role_cache.change_stream`` the cache is cleared with each change in
+    ``sys.role`` and roles do not expire. Any change to a role through
+    :class:`.CoreRole` clears the cache of the current process.
+
+    .. note:: cached :class:`.CoreRole` objects are shared and must not be
+              modified.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cache = collections.OrderedDict()
+        self.watcher = None
+        self.streaming = False
+
+    def clear(self):
+        """
+        Clears the cache.
+        """
+        self.cache.clear()
+
+    async def find_one(self, name):
+        """
+        Retrieve the role with the passed ``name`` from the cache or from
+        ``sys.role`` (see :meth:`.CoreRole.find_one`).
+
+        :param name: of the role
+        :return: :class:`.CoreRole` with resolved cascaded roles and
+                 permissions or ``None`` if not found
+        """
+        setting = self.config.api.role_cache
+        if setting.change_stream:
+            self.watch()
+        entry = self.cache.get(name)
+        now = time.monotonic()
+        if entry is not None:
+            if (self.streaming
+                    or now - entry["timestamp"] < setting.ttl
+                    or await self._validate(entry)):
+                entry["timestamp"] = now
+                self.cache.move_to_end(name)
+                return entry["role"]
+            self.logger.debug("role [%s] changed", name)
+        role = await CoreRole.find_one(name=name)
+        if role is None:
+            self.cache.pop(name, None)
+            return None
+        await role.casc_perm()
+        self.cache[name] = {
+            "role": role,
+            "etag": await self._etag([role._id] + role._casc_seen),
+            "timestamp": now
+        }
+        self.cache.move_to_end(name)
+        while len(self.cache) > setting.size:
+            self.cache.popitem(last=False)
+        return role
+
+    async def _etag(self, _id):
+        # internal method to retrieve the current etag of the roles with the
+        #   passed _id
+        cur = self.config.sys.role.connect_async().find(
+            {"_id": {"$in": _id}}, projection=["etag"])
+        return dict([(doc["_id"], doc.get("etag"))
+                     for doc in await cur.to_list(length=None)])
+
+    async def _validate(self, entry):
+        # internal method to compare the etag of the cached role and all
+        #   cascaded roles with sys.role
+        return entry["etag"] == await self._etag(list(entry["etag"].keys()))
+
+    def watch(self):
+        """
+        Spawns the change stream watching ``sys.role`` if not running, yet.
+        """
+        if self.watcher is None or self.watcher.done():
+            self.watcher = asyncio.ensure_future(self._watch())
+
+    async def _watch(self):
+        # internal method to clear the cache with any change in sys.role
+        coll = self.config.sys.role.connect_async()
+        try:
+            async with coll.watch() as stream:
+                self.clear()
+                self.streaming = True
+                self.logger.debug("watching [sys.role]")
+                async for _ in stream:
+                    self.clear()
+        except pymongo.errors.PyMongoError:
+            self.logger.warning("failed to watch [sys.role]", exc_info=True)
+        finally:
+            self.streaming = False
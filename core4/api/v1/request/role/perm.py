@@ -0,0 +1,113 @@
+#
+# Copyright 2018 Plan.Net Business Intelligence GmbH & Co. KG
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+This module delivers :class:`.CorePermMatcher` to verify ``job://``,
+``api://`` and ``app://`` permissions of a :class:`.CoreRole`.
+"""
+
+import re
+
+from bson.regex import Regex
+
+from core4.const import COP
+
+#: maximum number of memoized verdicts per matcher
+MEMO_SIZE = 100000
+
+
+class CorePermMatcher:
+    """
+    Compiled matcher of a list of permissions (see :class:`.PermField`). The
+    matcher combines all ``api://`` permissions and all ``job://``
+    permissions with the same access right into one regular expression.
+    Client permissions ``app://client/[client]`` are kept in a set.
+    Verdicts are memoized per qualified name.
+    """
+
+    def __init__(self, perm):
+        self.admin = COP in perm
+        api = []
+        job = {}
+        self.client = set()
+        for p in perm:
+            parts = p.split("/")
+            if parts[0] == "api:":
+                api.append(parts[-1])
+            elif parts[0] == "job:" and len(parts) > 2:
+                job.setdefault(parts[-1].lower(), []).append(parts[-2])
+            elif (parts[0] == "app:" and len(parts) > 3
+                  and parts[2] == "client"):
+                self.client.add("/".join(parts[3:]))
+        self.api = self._compile(api)
+        self.job_pattern = job
+        self.job = dict([(k, self._compile(v)) for k, v in job.items()])
+        self.memo = {}
+
+    @staticmethod
+    def _compile(pattern):
+        # internal method to compile the list of patterns into one regular
+        #   expression or into a list of regular expressions if the patterns
+        #   cannot be combined
+        try:
+            return [re.compile("|".join(
+                ["(?:{})".format(p) for p in pattern]))] if pattern else []
+        except re.error:
+            return [re.compile(p) for p in pattern]
+
+    def _memoize(self, key, func):
+        # internal method to memoize the verdict of func with key
+        if key not in self.memo:
+            if len(self.memo) >= MEMO_SIZE:
+                self.memo.clear()
+            self.memo[key] = func()
+        return self.memo[key]
+
+    def has_api(self, qual_name):
+        """
+        :param qual_name: of the handler
+        :return: ``True`` if any ``api://`` permission matches the passed
+                 ``qual_name``
+        """
+        return self._memoize(
+            ("api", qual_name),
+            lambda: any(r.match(qual_name) for r in self.api))
+
+    def has_job(self, qual_name, access):
+        """
+        :param qual_name: of the job
+        :param access: job access rights to check, e.g. ``("x", "r")``
+        :return: ``True`` if any ``job://`` permission with one of the passed
+                 access rights matches the passed ``qual_name``
+        """
+        return self._memoize(
+            ("job", qual_name, access),
+            lambda: any(r.match(qual_name)
+                        for acc, regex in self.job.items() if acc in access
+                        for r in regex))
+
+    def job_filter(self, access):
+        """
+        Translates the ``job://`` permissions with one of the passed access
+        rights into a MongoDB query on attribute ``name``.
+
+        :param access: job access rights to check, e.g. ``("x", "r")``
+        :return: MongoDB query dict or ``None`` for administrators
+        """
+        if self.admin:
+            return None
+        pattern = [Regex("^(?:{})".format(p))
+                   for acc, patterns in self.job_pattern.items()
+                   if acc in access for p in patterns]
+        return {"name": {"$in": pattern}}
+
+    def has_client(self, client):
+        """
+        :param client: name
+        :return: ``True`` if an ``app://client/[client]`` permission exists
+        """
+        return client in self.client
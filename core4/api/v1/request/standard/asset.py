@@ -13,6 +13,7 @@ from tornado.web import StaticFileHandler, HTTPError
 import core4
 import core4.const
 from core4.api.v1.request.main import CoreRequestHandler
+from core4.base.main import set_identifier
 
 
 class CoreAssetHandler(CoreRequestHandler, StaticFileHandler):
@@ -81,6 +82,7 @@ class CoreAssetHandler(CoreRequestHandler, StaticFileHandler):
                 self.logger.error(
                     "static file not found [%s]", full_path)
         self.identifier = ObjectId()
+        set_identifier(self.identifier)
         await self.prepare_protection()
 
     async def enter(self):
@@ -6,10 +6,12 @@
 # file, You can obtain one at https://mozilla.org/MPL/2.0/.
 
 from tornado import gen
+from tornado.websocket import WebSocketClosedError
 
 import core4.const
 import core4.util.node
 from core4.api.v1.request.main import CoreRequestHandler
+from core4.api.v1.request.role.model import CoreRoleCache
 from core4.api.v1.request.websocket import CoreWebSocketHandler
 from core4.base.main import CoreBase
 from core4.queue.query import QueryMixin
@@ -38,7 +40,8 @@ class EventWatch(CoreBase):
 class QueueWatch(CoreBase, QueryMixin):
     """
     Continuously queries ``sys.queue`` and forwards to :class:`.EventHandler`
-    using :meth:`on_queue <.EventHandler.on_queue>` method.
+    using :meth:`on_queue <.EventHandler.on_queue>` method. The aggregation
+    is skipped if no client is interested in channel *queue*.
     """
 
     stop = False
@@ -50,11 +53,10 @@ class QueueWatch(CoreBase, QueryMixin):
         interval = self.config.event.queue_interval
         while not QueueWatch.stop:
             nxt = gen.sleep(interval)
-            cursor = coll.aggregate(pipeline)
-            data = []
-            async for doc in cursor:
-                data.append(doc)
-            await EventHandler.on_queue(data)
+            if EventHandler.has_interest(core4.const.QUEUE_CHANNEL):
+                cursor = coll.aggregate(pipeline)
+                data = await cursor.to_list(length=None)
+                await EventHandler.on_queue(data)
             await nxt
 
 
@@ -72,13 +74,15 @@ class EventHandler(CoreWebSocketHandler):
     author = "mra"
     title = "event web socket"
     waiters = {}
-    last = []
+    summary = {}
 
     def open(self):
         """
         Connects and registers a client in ``.waiters``.
         """
         self.logger.info("connected client %s", self.request.remote_ip)
+        self.last = None
+        self.perm_key = None
         EventHandler.waiters[self] = []
 
     def on_close(self):
@@ -184,26 +188,89 @@ class EventHandler(CoreWebSocketHandler):
             if channel in interest:
                 waiter.write_message(data)
 
+    @classmethod
+    def has_interest(cls, channel):
+        """
+        :param channel: name
+        :return: ``True`` if any client is interested in the passed channel
+        """
+        return any(channel in interest for interest in cls.waiters.values())
+
     @classmethod
     async def on_queue(cls, change):
-        data = {
-            "created": core4.util.node.mongo_now(),
-            "name": "summary",
-            "author": core4.util.node.get_username(),
-            "channel": core4.const.QUEUE_CHANNEL,
-        }
-        for waiter, interest in cls.waiters.items():
-            if core4.const.QUEUE_CHANNEL in interest:
-                data["data"] = []
-                for line in change:
-                    qn = line["name"]
-                    if not await waiter.user.has_api_access(qn):
-                        line["name"] = "UnauthorizedJob"
-                    data["data"].append(line)
-                if data["data"] != waiter.last:
-                    js = json_encode(data)
-                    waiter.write_message(js)
-                    waiter.last = data["data"]
+        """
+        Broadcasts the job state summary to all clients interested in channel
+        *queue*. Clients are grouped by their combined permissions (see
+        :meth:`.CoreRole.casc_perm`). The summary is built and JSON encoded
+        once per group and sent only to clients which did not receive the
+        same summary, yet.
+
+        The role of each client is resolved with :class:`.CoreRoleCache` once
+        per broadcast and user. The permissions of a client are recomputed
+        if the cache delivers a changed role. Clients of removed or inactive
+        users receive no summary.
+
+        :param change: list of job states from
+                       :meth:`.QueryMixin.pipeline_queue_state`
+        """
+        cache = CoreRoleCache()
+        role = {}
+        group = {}
+        for waiter, interest in list(cls.waiters.items()):
+            if core4.const.QUEUE_CHANNEL not in interest:
+                continue
+            name = waiter.user.name
+            if name not in role:
+                role[name] = await cache.find_one(name)
+            user = role[name]
+            if user is None or not user.is_active:
+                continue
+            if waiter.perm_key is None or waiter.user is not user:
+                waiter.user = user
+                waiter.perm_key = tuple(await user.casc_perm())
+            group.setdefault(waiter.perm_key, []).append(waiter)
+        summary = {}
+        for perm_key, waiters in group.items():
+            data = await cls.make_summary(waiters[0].user, change)
+            (last, js) = cls.summary.get(perm_key, (None, None))
+            if data != last:
+                js = json_encode({
+                    "created": core4.util.node.mongo_now(),
+                    "name": "summary",
+                    "author": core4.util.node.get_username(),
+                    "channel": core4.const.QUEUE_CHANNEL,
+                    "data": data
+                })
+            summary[perm_key] = (data, js)
+            for waiter in waiters:
+                if waiter.last is not js:
+                    try:
+                        waiter.write_message(js)
+                    except WebSocketClosedError:
+                        continue
+                    waiter.last = js
+        cls.summary = summary
+
+    @staticmethod
+    async def make_summary(user, change):
+        """
+        Masks the job names of the passed job states without access
+        permission of the passed user with ``UnauthorizedJob``.
+
+        :param user: :class:`.CoreRole`
+        :param change: list of job states
+        :return: list of job states
+        """
+        access = {}
+        data = []
+        for line in change:
+            qn = line["name"]
+            if qn not in access:
+                access[qn] = await user.has_api_access(qn)
+            if not access[qn]:
+                line = dict(line, name="UnauthorizedJob")
+            data.append(line)
+        return data
 
 
 class EventHistoryHandler(CoreRequestHandler):
@@ -0,0 +1,90 @@
+#
+# Copyright 2018 Plan.Net Business Intelligence GmbH & Co. KG
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+This module delivers :class:`.CoreTokenCache` to skip repeated JSON web token
+verification of :meth:`.CoreRequestHandler.verify_user`.
+"""
+
+import collections
+import hashlib
+import time
+
+import core4.util.tool
+from core4.base.main import CoreBase
+
+
+class CoreTokenCache(CoreBase, metaclass=core4.util.tool.Singleton):
+    """
+    Process-wide LRU cache of verified JSON web token payloads keyed by the
+    SHA-256 digest of the token, the token secret and the algorithm. Cached
+    payloads are valid until the token expires (see ``api.token.expiration``).
+    The size of the cache is limited by ``api.token_cache.size``.
+
+    The cache does not keep the role of the token. Roles are resolved with
+    :class:`.CoreRoleCache` which revalidates the role's ``etag``.
+
+    The hit rate of the cache is tracked with ``.hit`` and ``.miss``, see
+    :meth:`.hit_rate`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cache = collections.OrderedDict()
+        self.hit = 0
+        self.miss = 0
+
+    def clear(self):
+        """
+        Clears the cache and resets the hit rate.
+        """
+        self.cache.clear()
+        self.hit = 0
+        self.miss = 0
+
+    @property
+    def hit_rate(self):
+        """
+        :return: ratio of cache hits to all token verifications of the
+                 current process or ``None`` if no token has been verified
+        """
+        total = self.hit + self.miss
+        if total == 0:
+            return None
+        return self.hit / total
+
+    def parse(self, token, parse_token):
+        """
+        Returns the cached payload of the passed ``token`` or verifies the
+        token with the passed ``parse_token`` callable, e.g.
+        :meth:`.CoreRequestHandler.parse_token`. Only payloads with a
+        username and an expiration time are cached.
+
+        :param token: JWT (str or bytes)
+        :param parse_token: callable to verify and decode the token
+        :return: decoded JWT payload
+        """
+        if isinstance(token, bytes):
+            token = token.decode("utf-8")
+        setting = self.config.api.token
+        key = hashlib.sha256("\0".join(
+            (setting.algorithm, setting.secret, token)).encode(
+            "utf-8")).digest()
+        payload = self.cache.get(key)
+        if payload is not None:
+            if time.time() <= payload["exp"]:
+                self.hit += 1
+                self.cache.move_to_end(key)
+                return payload
+            del self.cache[key]
+        self.miss += 1
+        payload = parse_token(token)
+        if payload.get("name") and payload.get("exp") is not None:
+            self.cache[key] = payload
+            while len(self.cache) > self.config.api.token_cache.size:
+                self.cache.popitem(last=False)
+        return payload
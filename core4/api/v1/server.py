@@ -13,6 +13,7 @@ and provides the following endpoints:
 * ``/core4/api/v1/jobs`` - :class:`.JobHandler`
 * ``/core4/api/v1/jobs/poll`` - :class:`.JobStream`
 * ``/core4/api/v1/enqueue`` - :class:`.JobPost`
+* ``/core4/api/v1/enqueue_many`` - :class:`.JobBulkPost`
 * ``/core4/api/v1/roles`` - :class:`.RoleHandler`
 * ``/core4/api/v1/access`` - :class:`.AcceHandlerr`
 
@@ -30,6 +31,7 @@ from tornado.ioloop import IOLoop
 from core4.api.v1.application import CoreApiContainer
 from core4.api.v1.request.queue.history import JobHistoryHandler
 from core4.api.v1.request.queue.history import QueueHistoryHandler
+from core4.api.v1.request.queue.job import JobBulkPost
 from core4.api.v1.request.queue.job import JobHandler
 from core4.api.v1.request.queue.job import JobPost
 from core4.api.v1.request.queue.job import JobStream
@@ -88,6 +90,7 @@ class CoreApiServer(CoreApiContainer):
         (r'/jobs/history', JobHistoryHandler),
         (r'/jobs/history/(.*)', JobHistoryHandler, None, "JobHistory"),
         (r'/jobs/enqueue/?', JobPost),
+        (r'/jobs/enqueue_many/?', JobBulkPost),
         (r'/jobs', JobHandler),
         (r'/jobs/(.*)', JobHandler, None, "JobHandler"),
 
@@ -14,7 +14,7 @@ from core4.api.v1.tool.serve import CoreApiServerTool
 
 
 def serve(*args, port=None, address=None, name=None, reuse_port=True,
-          routing=None, core4api=True, **kwargs):
+          routing=None, core4api=True, processes=1, **kwargs):
     """
     Serve one or multiple :class:`.CoreApiContainer` classes.
 
@@ -73,15 +73,18 @@ def serve(*args, port=None, address=None, name=None, reuse_port=True,
     :param core4api: add the core4 standard api containers
                      :class:`.CoreApiContainer` and
                      :class:`.CoreWidgetContainer`, defaults to ``True``
+    :param processes: number of server processes sharing the listening socket,
+                      defaults to ``1``, ``0`` forks one process per CPU
     :param kwargs: passed to the :class:`tornado.web.Application` objects
     """
     CoreApiServerTool().serve(*args, port=port, address=address, name=name,
                               reuse_port=reuse_port, routing=routing,
-                              core4api=core4api, **kwargs)
+                              core4api=core4api, processes=processes,
+                              **kwargs)
 
 
 def serve_all(project=None, filter=None, port=None, address=None, name=None,
-              reuse_port=True, routing=None, **kwargs):
+              reuse_port=True, routing=None, processes=1, **kwargs):
     """
     Serve all core :class:`.CoreApiContainer` classes of a given project and
     one or more filters. All :class:`.CoreApiContainer` with a
@@ -104,7 +107,9 @@ def serve_all(project=None, filter=None, port=None, address=None, name=None,
     :param routing: URL including the protocol and hostname of the server,
                     defaults to the protocol depending on SSL settings, the
                     node hostname or address and port
+    :param processes: number of server processes sharing the listening socket,
+                      defaults to ``1``, ``0`` forks one process per CPU
     :param kwargs: passed to the :class:`tornado.web.Application` objects
     """
     CoreApiServerTool().serve_all(project, filter, port, address, name,
-                                  reuse_port, routing, **kwargs)
+                                  reuse_port, routing, processes, **kwargs)
@@ -12,17 +12,24 @@ Implements :class:`.CoreApiServerTool to serve one or multiple
 
 import importlib
 
+import pymongo
 import tornado.httpserver
 import tornado.ioloop
+import tornado.netutil
+import tornado.process
 import tornado.routing
 from tornado import gen
 
 import core4.api.v1.server
+import core4.base.connector.mongo
+import core4.base.main
+import core4.config.main
 import core4.const
 import core4.error
 import core4.service
 import core4.service.setup
 import core4.util.node
+from core4.api.v1.application import CoreHandlerDirectory
 from core4.api.v1.request.main import CoreBaseHandler
 from core4.api.v1.server import CoreApiServer, CoreAppManager
 from core4.base import CoreBase
@@ -38,6 +45,8 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
 
     def initialise_object(self):
         self.container = []
+        self.sockets = None
+        self.task_id = None
 
     def prepare(self, name=None, address=None, port=None, routing=None):
         """
@@ -61,7 +70,10 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
         key_file = self.config.api.key_file
         # global settings
         name = name or "app"
+        if self.task_id is not None:
+            name = "{}-{}".format(name, self.task_id)
         self.identifier = "@".join([name, core4.util.node.get_hostname()])
+        core4.base.main.set_identifier(self.identifier)
         self.port = int(port or self.config.api.port)
         self.address = address or "0.0.0.0"
         self.hostname = core4.util.node.get_hostname()
@@ -89,15 +101,19 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
         :return: HTTP server instance
         """
         server = tornado.httpserver.HTTPServer(router, **http_args)
-        server.bind(self.port, address=self.address, reuse_port=reuse_port)
-        server.start()
+        if self.sockets is None:
+            server.bind(self.port, address=self.address,
+                        reuse_port=reuse_port)
+            server.start()
+        else:
+            server.add_sockets(self.sockets)
         self.logger.info("open %ssecure socket on port [%s:%d] routed at [%s]",
                          "" if http_args.get("ssl_options") else "NOT ",
                          self.address, self.port, self.routing)
         return server
 
     def serve(self, *args, port=None, address=None, name=None, reuse_port=True,
-              routing=None, core4api=True, **kwargs):
+              routing=None, core4api=True, processes=1, **kwargs):
         """
         Starts the tornado HTTP server listening on the specified port and
         enters tornado's IOLoop.
@@ -115,14 +131,51 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
         :param routing: URL including the protocol and hostname of the server,
                         defaults to the protocol depending on SSL settings, the
                         node hostname or address and port
+        :param processes: number of server processes sharing the listening
+                          socket, defaults to ``1``, ``0`` or ``None`` forks
+                          one process per CPU, see :meth:`.fork`
         :param kwargs: to be passed to all :class:`CoreApiApplication`
         """
+        if processes != 1:
+            self.fork(processes, port=port, address=address,
+                      reuse_port=reuse_port)
         self.create_routes(*args, port=port, address=address, name=name,
                            reuse_port=reuse_port, routing=routing,
                            core4api=core4api, **kwargs)
         self.init_callback()
         self.start_loop()
 
+    def fork(self, processes, port=None, address=None, reuse_port=True):
+        """
+        Binds the listening socket and forks the passed number of server
+        processes with :func:`tornado.process.fork_processes`. The parent
+        process monitors and restarts its children and does not return. Each
+        child continues with its own MongoDB clients, logging and
+        configuration, a ``task_id`` starting at ``0``, and its own identity
+        in ``sys.worker``. Only the child with ``task_id == 0`` registers and
+        unregisters the handlers in ``sys.handler``.
+
+        :param processes: number of processes, ``0`` or ``None`` forks one
+                          process per CPU
+        :param port: to listen, defaults to core4 config ``api.port``
+        :param address: IP address or hostname to listen to
+        :param reuse_port: tells the kernel to reuse a local socket in
+                           ``TIME_WAIT`` state, defaults to ``True``
+        """
+        port = int(port or self.config.api.port)
+        self.sockets = tornado.netutil.bind_sockets(
+            port, address=address or "0.0.0.0", reuse_port=reuse_port)
+        self.logger.info("forking [%s] server processes on port [%d]",
+                         processes or "cpu count", port)
+        self.task_id = tornado.process.fork_processes(processes or 0)
+        # MongoDB clients, configuration and logging of the parent must not
+        #   be used in the child process; CoreCollection objects and the
+        #   logging handler created before the fork reconnect in the child
+        core4.base.connector.mongo.reset()
+        core4.config.main.CoreConfig._snapshot.clear()
+        self.config._config_cache = None
+        CoreLoggerMixin.completed = False
+
     def init_callback(self):
         """
         Adds :meth:`.heartbeat` to the ioloop.
@@ -216,7 +269,8 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
     async def heartbeat(self):
         """
         Sets the heartbeat of the tornado server/container in ``sys.worker`` as
-        defined by core4 configuration key ``daemon.heartbeat``.
+        defined by core4 configuration key ``daemon.heartbeat`` and refreshes
+        the :class:`.CoreHandlerDirectory`.
         """
         sys_worker = self.config.sys.worker.connect_async()
         sleep = self.config.daemon.heartbeat
@@ -229,6 +283,7 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
                 "address": self.address,
                 "port": self.port,
                 "kind": "app",
+                "task_id": self.task_id,
                 "pid": core4.util.node.get_pid(),
                 "phase": {
                     "startup": self.startup,
@@ -239,7 +294,9 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
             }},
             upsert=True
         )
+        directory = CoreHandlerDirectory()
         while True:
+            await directory.refresh()
             nxt = gen.sleep(sleep)
             cnt = await sys_worker.count_documents(
                 {"_id": "__halt__", "timestamp": {"$gte": self.startup}})
@@ -262,7 +319,12 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
     def register(self, router):
         """
         Registers all endpoints of the tornado server in ``sys.handler``.
+        With multiple server processes (see :meth:`.fork`) only the process
+        with ``task_id == 0`` registers.
         """
+        if self.task_id:
+            self.logger.info("server [%s] skips registration", self.identifier)
+            return
         self.logger.info("registering server [%s] at [%s]", self.identifier,
                          self.routing)
         coll = self.config.sys.handler
@@ -305,8 +367,8 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
                          rule.matcher.regex.pattern,
                          app.target.container.get_root(),
                          rule.name))
-        for rsc_id, doc in data.items():
-            ret = coll.update_one(
+        requests = [
+            pymongo.UpdateOne(
                 filter={
                     "hostname": self.hostname,
                     "port": self.port,
@@ -320,10 +382,12 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
                 },
                 upsert=True
             )
-            if ret.upserted_id:
-                created += 1
-            else:
-                updated += 1
+            for rsc_id, doc in data.items()
+        ]
+        if requests:
+            ret = coll.bulk_write(requests, ordered=False)
+            created = ret.upserted_count
+            updated = ret.matched_count
 
         self.logger.info("found [%s] application, handlers registered [%d], "
                          "reset [%d], updated [%d], created [%d]",
@@ -344,15 +408,20 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
         """
         Spawns :meth:`.CoreApiContainer.exit` for each registered api container
         and Unregisters all endpoints of the tornado server in ``sys.handler``.
+        With multiple server processes (see :meth:`.fork`) only the process
+        with ``task_id == 0`` unregisters.
         """
-        total, reset = self.reset_handler()
         for obj in self.container:
             obj.on_exit()
+        if self.task_id:
+            return
+        total, reset = self.reset_handler()
         self.logger.info("unregistering server [%s] with [%d] handlers, "
                          "[%d] reset", self.identifier, total, reset)
 
     def serve_all(self, project=None, filter=None, port=None, address=None,
-                  name=None, reuse_port=True, routing=None, **kwargs):
+                  name=None, reuse_port=True, routing=None, processes=1,
+                  **kwargs):
         """
         Starts the tornado HTTP server listening on the specified port and
         enters tornado's IOLoop.
@@ -373,6 +442,7 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
         :param routing: URL including the protocol and hostname of the server,
                         defaults to the protocol depending on SSL settings, the
                         node hostname or address and port
+        :param processes: number of server processes, see :meth:`.serve`
         """
         if not filter:
             filter = [None]
@@ -391,6 +461,7 @@ class CoreApiServerTool(CoreBase, CoreLoggerMixin):
                 name=name,
                 reuse_port=reuse_port,
                 routing=routing,
+                processes=processes
             )
             args.update(kwargs)
             if project:
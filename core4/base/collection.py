@@ -12,6 +12,8 @@ access and :class:`.CoreJobCollection` derived from
 access for :class:`.CoreJob`.
 """
 
+import os
+
 import pymongo.collection
 
 import core4.error
@@ -40,9 +42,12 @@ class CoreCollection:
     * ``password``
     * ``async_conn``
     * :meth:`connection`
+    * :meth:`handle`
     * :meth:`info_url`
     """
     _cache = {}
+    _handle = None
+    _pid = None
 
     def __init__(
             self, scheme, hostname, database, collection, username=None,
@@ -65,6 +70,8 @@ class CoreCollection:
         self.username = username
         self.password = password
         self._connection = None
+        self._handle = None
+        self._pid = None
         self.async_conn = async_conn
         if self.scheme not in SCHEME:
             raise core4.error.Core4ConfigurationError(
@@ -87,11 +94,15 @@ class CoreCollection:
 
             mongodb://  # MongoDB
 
+        The connection is re-established in forked child processes.
+
         :return: database connection
         """
-        if self._connection is None:
+        if self._connection is None or self._pid != os.getpid():
             connector = SCHEME[self.scheme]['connector']
             self._connection = connector(self)
+            self._handle = None
+            self._pid = os.getpid()
         return self._connection
 
     @property
@@ -112,11 +123,23 @@ class CoreCollection:
             loc += "/" + self.collection
         return loc
 
+    @property
+    def handle(self):
+        """
+        Resolves the database collection object once.
+
+        :return: :class:`pymongo.collection.Collection` or
+                 :class:`motor.motor_asyncio.AsyncIOMotorCollection`
+        """
+        if self._handle is None or self._pid != os.getpid():
+            self._handle = self.connection[self.database][self.collection]
+        return self._handle
+
     def __getattr__(self, item):
         """
         Delegates all methods and attributes to the database object.
         """
-        return getattr(self.connection[self.database][self.collection], item)
+        return getattr(self.handle, item)
 
 
 class CoreJobCollection(CoreCollection):
@@ -10,6 +10,8 @@ Delivers MongoDB cached database connectivity using :mod:`pymongo` and
 :mod:`motor`.
 """
 
+import os
+
 import motor
 import pymongo
 
@@ -17,6 +19,8 @@ CACHE = {
     'sync': {},
     "async": {}
 }
+#: process which created the cached clients
+PID = os.getpid()
 
 
 def make_connection(connection):
@@ -30,6 +34,9 @@ def make_connection(connection):
              object has ``connection.async_conn == True``.
     """
     global CACHE
+    if os.getpid() != PID:
+        # forked child process
+        reset()
     url = 'mongodb://'
     if connection.username:
         url += connection.username
@@ -50,3 +57,16 @@ def make_connection(connection):
         CACHE[mode][url] = pymongo.MongoClient(
             url, tz_aware=False, connect=False)
     return CACHE[mode][url]
+
+
+def reset():
+    """
+    Drops all cached MongoDB clients. This happens automatically with the
+    first connection of a forked child process, since
+    :class:`pymongo.MongoClient` is not fork-safe. :class:`.CoreCollection`
+    objects created before the fork reconnect in the child process, too.
+    """
+    global CACHE, PID
+    for mode in CACHE.values():
+        mode.clear()
+    PID = os.getpid()
@@ -18,6 +18,7 @@ import logging.handlers
 import os
 import re
 import sys
+import threading
 
 import pymongo
 
@@ -28,9 +29,68 @@ import core4.logger.filter
 import core4.util.node
 from core4.const import CORE4, PREFIX
 
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
 _except_hook = None
 
 
+class _ThreadIdentifier(threading.local):
+    # fallback of contextvars.ContextVar for Python < 3.7
+
+    value = None
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token = self.value
+        self.value = value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+
+if contextvars is not None:
+    _identifier = contextvars.ContextVar("core4_identifier", default=None)
+else:
+    _identifier = _ThreadIdentifier()
+
+
+def set_identifier(identifier):
+    """
+    Sets the ``identifier`` inherited by all :class:`.CoreBase` objects
+    created in the current context. The context is the current
+    :mod:`asyncio` task or the current thread. Request handlers, daemons and
+    job processes set their identifier with this function.
+
+    :param identifier: to set, e.g. the job ``_id``
+    :return: token to restore the previous identifier with
+             :func:`reset_identifier`
+    """
+    return _identifier.set(identifier)
+
+
+def reset_identifier(token):
+    """
+    Restores the identifier of the current context, see
+    :func:`set_identifier`.
+
+    :param token: as returned by :func:`set_identifier`
+    """
+    _identifier.reset(token)
+
+
+def get_identifier():
+    """
+    :return: identifier of the current context, see :func:`set_identifier`
+    """
+    return _identifier.get()
+
+
 def is_core4_project(body):
     """
     returns ``True`` if the passed string is considered the file content of an
@@ -102,28 +162,31 @@ class CoreBase:
     _raw_config = None
 
     def __init__(self):
-        # query identifier from instantiating object
-        if self.identifier is None:
-            identifier = None
-            current_frames = inspect.getouterframes(inspect.currentframe())
-            for frame_info in current_frames:
-                locals = list(frame_info.frame.f_locals.values())
-                for v in locals:
-                    if issubclass(v.__class__, CoreBase):
-                        ident = v.identifier
-                        if ident is not None:
-                            identifier = ident
-                            break
-                if identifier is not None:
-                    break
-            self.identifier = identifier
         self._progress = None
         self.project = self.get_project()
         self._open_config()
+        # inherit identifier from context or from instantiating object
+        if self.identifier is None:
+            identifier = get_identifier()
+            if identifier is None and self.config.base.inspect_identifier:
+                identifier = self._inspect_identifier()
+            self.identifier = identifier
         self._open_logging()
         self._event = None
         self.initialise_object()
 
+    def _inspect_identifier(self):
+        # query identifier from instantiating object with frame inspection
+        frame = inspect.currentframe()
+        while frame is not None:
+            for v in list(frame.f_locals.values()):
+                if isinstance(v, CoreBase) and v is not self:
+                    ident = v.identifier
+                    if ident is not None:
+                        return ident
+            frame = frame.f_back
+        return None
+
     def initialise_object(self):
         """
         Called after object instantiation. This method can be overwritten by
@@ -14,6 +14,7 @@ import collections.abc
 import os
 import pprint
 import copy
+import time
 
 import dateutil.parser
 import pkg_resources
@@ -58,6 +59,41 @@ def type_ident(a, b):
     return True
 
 
+def freeze(data):
+    """
+    Internal helper method to translate the passed nested dict into a
+    hashable representation.
+
+    :param data: dict or value
+    :return: nested tuple of sorted ``(key, value)`` pairs or the value
+    """
+    if isinstance(data, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in data.items()))
+    return data
+
+
+def _copy_dict(data):
+    # internal helper to copy nested dicts and to share all other values,
+    #   e.g. ConnectTag objects
+    return dict([(k, _copy_dict(v) if isinstance(v, dict) else v)
+                 for k, v in data.items()])
+
+
+def _copy_source(source, section=None):
+    # internal helper to copy the configuration sources before parsing,
+    #   optionally limited to the passed top-level sections
+    (standard_data, extra, local_data) = source
+
+    def select(data):
+        if section is not None:
+            data = dict([(k, v) for k, v in data.items() if k in section])
+        return _copy_dict(data)
+
+    if extra is not None:
+        extra = (extra[0], _copy_dict(extra[1]))
+    return (select(standard_data), extra, select(local_data))
+
+
 class CoreConfig(collections.MutableMapping):
     """
     :class:`.CoreConfig` is the gateway into core4 configuration. Please note
@@ -71,6 +107,10 @@ class CoreConfig(collections.MutableMapping):
     access to configuration data stored in the ``._config_cache`` attribute,
     accessible through :meth:`._config`. This attribute implements the
     :class:`.ConfigMap`.
+
+    With ``.cache`` the parsed configuration data is shared by all
+    :class:`.CoreConfig` objects of the process with the same project, config
+    files and core4 environment variables (see :meth:`._load_snapshot`).
     """
     cache = True
     standard_config = STANDARD_CONFIG
@@ -79,6 +119,7 @@ class CoreConfig(collections.MutableMapping):
 
     _config_cache = None
     _file_cache = {}
+    _snapshot = {}
     _db_cache = None
     db_info = None
 
@@ -119,9 +160,21 @@ class CoreConfig(collections.MutableMapping):
 
     def __getattr__(self, item):
         """
-        See :meth:`.__getitem__`.
+        See :meth:`.__getitem__`. Public configuration sections and keys are
+        resolved once into the instance ``__dict__``. The resolved attributes
+        are dropped if ``._config_cache`` is replaced.
         """
-        return self._config[item]
+        value = self._config[item]
+        if not item.startswith("_"):
+            self.__dict__[item] = value
+            self.__dict__.setdefault("_resolved", []).append(item)
+        return value
+
+    def __setattr__(self, key, value):
+        if key == "_config_cache":
+            for item in self.__dict__.pop("_resolved", []):
+                self.__dict__.pop(item, None)
+        super().__setattr__(key, value)
 
     def __repr__(self):
         """
@@ -169,9 +222,82 @@ class CoreConfig(collections.MutableMapping):
         :return: :class:`.ConfigMap`
         """
         if self._config_cache is None:
-            self._config_cache = self._load()
+            if self.cache:
+                self._config_cache = self._load_snapshot()
+            else:
+                self._config_cache = self._load()
         return self._config_cache
 
+    def _load_snapshot(self):
+        """
+        Returns the process-wide configuration snapshot. The snapshot is
+        identified by the project configuration, the local configuration
+        file, the concurrency mode, and all core4 environment variables.
+        Configuration data from ``sys.conf`` is reloaded after
+        ``base.config_ttl`` seconds.
+
+        The extra configuration of each class is applied as an overlay on
+        the shared snapshot (see :meth:`._overlay`).
+
+        :return: :class:`.ConfigMap`
+        """
+        environ = tuple(sorted((k, v) for k, v in os.environ.items()
+                               if k.startswith("CORE4_")))
+        key = (self.__class__, self.standard_config, self.user_config,
+               self.system_config, self.project_config, self._config_file,
+               self.concurr, environ)
+        snapshot = self._snapshot.get(key)
+        if (snapshot is not None and snapshot["expire"] is not None
+                and time.monotonic() > snapshot["expire"]):
+            snapshot = None
+        if snapshot is None:
+            source = self._read_source()
+            data = core4.config.map.ConfigMap(
+                self._parse(*_copy_source(source)))
+            ttl = data.get("base", {}).get("config_ttl")
+            if self.db_info is None or ttl is None:
+                expire = None
+            else:
+                expire = time.monotonic() + ttl
+            snapshot = {
+                "source": source,
+                "data": data,
+                "overlay": {},
+                "db_info": self.db_info,
+                "expire": expire
+            }
+            self._snapshot[key] = snapshot
+        self.db_info = snapshot["db_info"]
+        return self._overlay(snapshot)
+
+    def _overlay(self, snapshot):
+        """
+        Applies the extra configuration of the class to the passed snapshot.
+        Only the top-level sections of the extra configuration are parsed
+        again. All other sections are shared with the snapshot. Overlays are
+        cached with the snapshot.
+
+        :param snapshot: as created by :meth:`._load_snapshot`
+        :return: :class:`.ConfigMap`
+        """
+        if not self.extra_dict:
+            return snapshot["data"]
+        key = freeze(self.extra_dict)
+        data = snapshot["overlay"].get(key)
+        if data is None:
+            section = set(self.extra_dict.keys())
+            (standard_data, extra, local_data) = _copy_source(
+                snapshot["source"], section | {DEFAULT})
+            if extra is not None and extra[0] not in section:
+                extra = None
+            parsed = self._parse(standard_data, extra, local_data,
+                                 self.extra_dict)
+            data = dict(snapshot["data"])
+            data.update((k, parsed[k]) for k in section if k in parsed)
+            data = core4.config.map.ConfigMap(data)
+            snapshot["overlay"][key] = data
+        return data
+
     def _verify_dict(self, variable, message):
         """
         Verifies the passed variable is a Python dict. Raises
@@ -532,9 +658,9 @@ class CoreConfig(collections.MutableMapping):
                 return conv(upd)
         return value
 
-    def _load(self, apply_default_section=True):
+    def _read_source(self):
         """
-        Loads the configuration from
+        Reads the configuration sources from
 
         #. core4 standard configuration file
         #. project configuration file
@@ -544,8 +670,9 @@ class CoreConfig(collections.MutableMapping):
         #. MongoDB collection ``sys.conf``
         #. environment variables
 
-        :param apply_default_section :boolean: load raw config parameters or parameters with defaults recursively applied
-        :return: :class:`.ConfigMap`
+        :return: tuple of standard configuration, project name and project
+                 configuration, and the local configuration merged with
+                 ``sys.conf`` and environment variables
         """
         # extra config
         if self.project_config and os.path.exists(self.project_config[1]):
@@ -584,9 +711,19 @@ class CoreConfig(collections.MutableMapping):
         local_data = core4.util.tool.dict_merge(
             local_data, self._read_db(standard_data, local_data))
 
+        # merge OS environ
         local_data = core4.util.tool.dict_merge(local_data, environ)
+        return (standard_data, extra, local_data)
 
-        # merge OS environ
+    def _load(self, apply_default_section=True):
+        """
+        Loads and parses the configuration sources, see
+        :meth:`._read_source`.
+
+        :param apply_default_section :boolean: load raw config parameters or parameters with defaults recursively applied
+        :return: :class:`.ConfigMap`
+        """
+        (standard_data, extra, local_data) = self._read_source()
         data = core4.config.map.ConfigMap(
             self._parse(standard_data, extra, local_data, self.extra_dict, apply_default_section)
         )
@@ -17,7 +17,13 @@ import core4.error
 class ConfigMap(dict):
     """
     A read-only dictionary that supports dot notation as well as dictionary
-    access notation.
+    access notation. Nested :class:`.ConfigMap` objects are read-only and
+    therefore shared, not copied.
+
+    All keys which do not collide with :class:`dict` attributes are resolved
+    once into the instance ``__dict__``. Dot notation access therefore is a
+    plain attribute load. All other keys are delegated to
+    :meth:`dict.__getitem__`.
     """
 
     __getattr__ = dict.__getitem__
@@ -25,17 +31,28 @@ class ConfigMap(dict):
     def __init__(self, dct):
         self.__dict__["__ro__"] = False
         for key, value in dct.items():
-            if isinstance(value, collections.MutableMapping):
+            if (isinstance(value, collections.MutableMapping)
+                    and not isinstance(value, ConfigMap)):
                 value = ConfigMap(value)
             self[key] = value
+            if isinstance(key, str) and not hasattr(ConfigMap, key):
+                self.__dict__[key] = value
         self.__dict__["__ro__"] = True
 
+    def _readonly(self, *args, **kwargs):
+        raise core4.error.Core4ConfigurationError(
+            "core4.config.map.Map is readonly")
+
     def __setitem__(self, key, value):
         if self.__dict__["__ro__"]:
-            raise core4.error.Core4ConfigurationError(
-                "core4.config.map.Map is readonly")
+            self._readonly()
         super().__setitem__(key, value)
 
-    def __setattr__(self, key, value):
-        raise core4.error.Core4ConfigurationError(
-            "core4.config.map.Map is readonly")
+    __setattr__ = _readonly
+    __delitem__ = _readonly
+    __delattr__ = _readonly
+    clear = _readonly
+    pop = _readonly
+    popitem = _readonly
+    setdefault = _readonly
+    update = _readonly
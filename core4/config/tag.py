@@ -106,7 +106,7 @@ class ConnectTag(yaml.YAMLObject):
                 "malformed connection string [{}]".format(conn_str))
         self.conn_str = conn_str
         self.concurr = None
-        self._mongo = None
+        self._mongo = {}
 
     def __repr__(self):
         """
@@ -140,20 +140,24 @@ class ConnectTag(yaml.YAMLObject):
         Used to lazily establish the MongoDB connection when requested. Uses
         :func:`connect_database` to connect.
 
+        The connection is kept separately for :mod:`motor` and
+        :mod:`pymongo`, since tags are shared by all objects of a class (see
+        :meth:`.CoreConfig._load_snapshot`).
+
         :param concurr: if ``True`` connects with :mod:`motor`, else with
                       :mod:`pymongo` (default).
         :return: :class:`.CoreCollection`
         """
-        if self._mongo is None:
+        if concurr is None:
+            concurr = self.concurr
+        if concurr not in self._mongo:
             params = {"mongo_url": self.config.get("mongo_url"),
                       "mongo_database": self.config.get("mongo_database")}
             if concurr is not None:
                 params["concurr"] = concurr
-            else:
-                params["concurr"] = self.concurr
-            self._mongo = connect_database(self.conn_str, self.init_collection,
-                                           **params)
-        return self._mongo
+            self._mongo[concurr] = connect_database(
+                self.conn_str, self.init_collection, **params)
+        return self._mongo[concurr]
 
     def connect_async(self):
         """
@@ -221,5 +225,5 @@ class JobConnectTag(ConnectTag):
         :param job: :class:`.CoreJob` object
         """
         self.job = job
-        if self._mongo is not None:
-            self._mongo.set_job(job)
+        for mongo in self._mongo.values():
+            mongo.set_job(job)
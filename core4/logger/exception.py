@@ -23,6 +23,11 @@ class CoreExceptionHandler(logging.Handler):
     This handler stacks all :attr:`logging.DEBUG` log records. If a log record
     with log level :attr:`logging.CRITICAL` appears, then all memorised log
     records are fed into ``sys.log`` MongoDB collection.
+
+    The buffer keeps the :class:`logging.LogRecord` objects. These are
+    translated with :func:`.make_record` only if a :attr:`logging.CRITICAL`
+    log record appears. Records carrying exception information are translated
+    immediately to release the traceback.
     """
 
     def __init__(self, *args, level, size, target, **kwargs):
@@ -39,14 +44,17 @@ class CoreExceptionHandler(logging.Handler):
         :attr:`logging.CRITICAL` or above appears.
         """
         if record.levelno < self.mongo_level:
-            doc = make_record(record)
-            self.queue.append(doc)
+            if record.exc_info:
+                self.queue.append(make_record(record))
+            else:
+                self.queue.append(record)
         if record.levelno >= FLUSH_LEVEL:
             self.acquire()
             try:
-                if self.target:
-                    for doc in self.queue:
-                        self.target.insert_one(doc)
+                if self.target and self.queue:
+                    self.target.insert_many(
+                        [r if isinstance(r, dict) else make_record(r)
+                         for r in self.queue])
             finally:
                 self.release()
                 self.flush()
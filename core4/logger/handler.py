@@ -12,11 +12,15 @@ the logging record.
 """
 import logging.config
 import os
+import queue
+import threading
 import traceback
 
 import datetime
 import time
 
+import pymongo.errors
+
 from core4.util.tool import Singleton
 
 
@@ -62,19 +66,72 @@ def make_record(record):
     return doc
 
 
+#: queue marker to write the current batch
+_FLUSH = object()
+#: queue marker to write the current batch and to stop the background thread
+_STOP = object()
+
+
 class MongoLoggingHandler(logging.Handler, metaclass=Singleton):
     """
     This class implements logging into a MongoDB database/collection.
+
+    With ``maxsize > 0`` records are not written on the calling thread. They
+    are buffered in a bounded queue and a background thread writes them with
+    :meth:`insert_many <pymongo.collection.Collection.insert_many>` in
+    batches of at most ``batch`` records or after ``interval`` seconds. If
+    the buffer is full the record is dropped, or the calling thread waits
+    with ``block=True``. The buffer is flushed with each ``CRITICAL``
+    record and at :func:`logging.shutdown`.
+
+    The handler counts ``.written`` and ``.dropped`` records.
     """
 
-    def __init__(self, connection):
+    def __init__(self, connection, maxsize=0, batch=500, interval=1.,
+                 block=False, write_concern=None):
         """
         Connects the logging handler with the passed MongoDB connection.
 
-        :param connection: :class:`pymongo.collection.Collection` object
+        :param connection: :class:`.CoreCollection` or
+                           :class:`pymongo.collection.Collection` object
+        :param maxsize: size of the record buffer, defaults to ``0`` which
+                        writes each record synchronously
+        :param batch: maximum number of records per write
+        :param interval: maximum number of seconds a record is buffered
+        :param block: wait if the buffer is full, defaults to ``False``
+                      which drops the record
+        :param write_concern: :class:`pymongo.write_concern.WriteConcern`
         """
         super(MongoLoggingHandler, self).__init__()
-        self._collection = connection
+        self._connection = connection
+        self._collection = None
+        self.write_concern = write_concern
+        self.maxsize = maxsize
+        self.batch = batch
+        self.interval = interval
+        self.block = block
+        self.written = 0
+        self.dropped = 0
+        self.queue = None
+        self.thread = None
+        self._pid = None
+
+    @property
+    def collection(self):
+        """
+        Resolves the collection with the write concern once per process. A
+        forked child process resolves the collection again from the
+        :class:`.CoreCollection`, which reconnects with its own client.
+
+        :return: :class:`pymongo.collection.Collection`
+        """
+        pid = os.getpid()
+        if self._collection is None or self._collection[0] != pid:
+            coll = self._connection
+            if self.write_concern is not None:
+                coll = coll.with_options(write_concern=self.write_concern)
+            self._collection = (pid, coll)
+        return self._collection[1]
 
     def handle(self, record):
         """
@@ -99,4 +156,83 @@ class MongoLoggingHandler(logging.Handler, metaclass=Singleton):
         :param record: the log record (:class:`logging.LogRecord`)
         """
         doc = make_record(record)
-        self._collection.insert_one(doc)
+        if not self.maxsize:
+            self.collection.insert_one(doc)
+            self.written += 1
+            return
+        self._start()
+        try:
+            self.queue.put(doc, block=self.block)
+        except queue.Full:
+            self.dropped += 1
+        if record.levelno >= logging.CRITICAL:
+            self.flush()
+
+    def _start(self):
+        # internal method to start the background thread, in forked child
+        #   processes the buffer of the parent is discarded
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            self.thread = None
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(
+                target=self._drain, name="core4-log", daemon=True)
+            self.thread.start()
+
+    def _drain(self):
+        # internal method of the background thread to write batches
+        while True:
+            docs = []
+            marker = []
+            deadline = time.monotonic() + self.interval
+            while len(docs) < self.batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    doc = self.queue.get(timeout=max(timeout, 0.001))
+                except queue.Empty:
+                    break
+                if doc is _FLUSH or doc is _STOP:
+                    marker.append(doc)
+                    break
+                docs.append(doc)
+            self._write(docs)
+            for _ in range(len(docs) + len(marker)):
+                self.queue.task_done()
+            if _STOP in marker:
+                break
+
+    def _write(self, docs):
+        # internal method to write a batch of records
+        if not docs:
+            return
+        try:
+            self.collection.insert_many(docs, ordered=False)
+        except pymongo.errors.BulkWriteError as exc:
+            written = exc.details.get("nInserted", 0)
+            self.written += written
+            self.dropped += len(docs) - written
+        except Exception:
+            self.dropped += len(docs)
+        else:
+            self.written += len(docs)
+
+    def flush(self):
+        """
+        Waits until all buffered records are written.
+        """
+        if self.thread is not None and self.thread.is_alive() \
+                and self._pid == os.getpid():
+            self.queue.put(_FLUSH)
+            self.queue.join()
+
+    def close(self):
+        """
+        Writes all buffered records and stops the background thread.
+        """
+        if self.thread is not None and self.thread.is_alive() \
+                and self._pid == os.getpid():
+            self.queue.put(_STOP)
+            self.thread.join()
+        self.thread = None
+        super().close()
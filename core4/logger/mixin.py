@@ -98,10 +98,11 @@ class CoreLoggerMixin:
                         self.logger.warning("failed to create [sys.log]")
                 level = getattr(logging, mongodb)
                 write_concern = self.config.logging.write_concern
+                setting = self.config.logging.queue
                 handler = core4.logger.handler.MongoLoggingHandler(
-                    conn.with_options(write_concern=pymongo.WriteConcern(
-                        w=write_concern
-                    )))
+                    conn, maxsize=setting.maxsize, batch=setting.batch,
+                    interval=setting.interval, block=setting.block,
+                    write_concern=pymongo.WriteConcern(w=write_concern))
                 handler.setLevel(level)
                 logger.addHandler(handler)
                 self._setup_tornado(handler, level)
@@ -0,0 +1,163 @@
+#
+# Copyright 2018 Plan.Net Business Intelligence GmbH & Co. KG
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+Implements :func:`follow` and :class:`.CoreLogTail` to tail the capped
+collection ``sys.log`` with a tailable await cursor instead of polling.
+:func:`follow` serves the synchronous ``chist --follow`` session.
+:class:`.CoreLogTail` serves all asynchronous subscribers of a process, e.g.
+:class:`.JobStream` clients, with a single cursor.
+"""
+
+import asyncio
+import re
+import time
+
+import pymongo
+
+import core4.util.tool
+from core4.base.main import CoreBase
+
+#: maximum number of pending log records per subscriber
+QUEUE_SIZE = 10000
+
+PATTERN = type(re.compile(""))
+
+
+def follow(collection, query=None, offset=None, interval=1.):
+    """
+    Yields all new documents of the passed capped collection matching the
+    passed query. A tailable await cursor opened at the natural end of the
+    collection signals new documents. The matching documents are then
+    retrieved with a single query on the ``_id`` index. This way neither
+    opening nor reopening the tailable cursor scans the collection with the
+    query. The cursor is reopened after ``interval`` seconds if it dies,
+    e.g. with an empty collection.
+
+    :param collection: :class:`pymongo.collection.Collection`, ``sys.log``
+    :param query: list of MongoDB filters combined with ``$and``
+    :param offset: ``_id`` of the last known document
+    :param interval: seconds to wait before the cursor is reopened
+    :return: generator of documents
+    """
+    query = list(query or [])
+    while True:
+        cursor = collection.find(
+            projection=["_id"], skip=collection.estimated_document_count(),
+            cursor_type=pymongo.CursorType.TAILABLE_AWAIT)
+        check = True
+        while check or cursor.alive:
+            if check:
+                filter = list(query)
+                if offset is not None:
+                    filter.append({"_id": {"$gt": offset}})
+                for doc in collection.find(
+                        filter={"$and": filter} if filter else {},
+                        sort=[("_id", pymongo.ASCENDING)]):
+                    offset = doc["_id"]
+                    yield doc
+                check = False
+            for doc in cursor:
+                # skip documents retrieved already
+                if offset is None or doc["_id"] > offset:
+                    check = True
+                    break
+        cursor.close()
+        time.sleep(interval)
+
+
+class CoreLogTail(CoreBase, metaclass=core4.util.tool.Singleton):
+    """
+    Process-wide tail of ``sys.log``. One tailable await cursor fans out new
+    log records to all subscribers (see :meth:`.subscribe`). The cursor is
+    started with the first subscriber and stops with the last. Records which
+    do not fit into the queue of a slow subscriber are counted in
+    ``.dropped``.
+    """
+    concurr = True
+
+    def __init__(self):
+        super().__init__()
+        self.subscriber = {}
+        self.task = None
+        self.dropped = 0
+
+    def subscribe(self, **filter):
+        """
+        Subscribes to new log records. Each keyword argument filters the
+        records by the value of the attribute, e.g. ``identifier`` or
+        ``qual_name``. Values are compared for equality or searched if they
+        are compiled regular expressions.
+
+        :param filter: attribute filters
+        :return: :class:`asyncio.Queue` receiving the log records
+        """
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.subscriber[queue] = filter
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self._tail())
+        return queue
+
+    def unsubscribe(self, queue):
+        """
+        Removes the subscription of the passed queue, see :meth:`.subscribe`.
+
+        :param queue: as returned by :meth:`.subscribe`
+        """
+        self.subscriber.pop(queue, None)
+
+    @staticmethod
+    def _match(doc, filter):
+        # internal method to match a log record against subscriber filters
+        for attr, value in filter.items():
+            actual = doc.get(attr)
+            if isinstance(value, PATTERN):
+                if actual is None or value.search(actual) is None:
+                    return False
+            elif actual != value:
+                return False
+        return True
+
+    def _publish(self, doc):
+        # internal method to fan out a log record to all subscribers
+        for queue, filter in list(self.subscriber.items()):
+            if self._match(doc, filter):
+                try:
+                    queue.put_nowait(doc)
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+    async def _tail(self):
+        # internal method running the tailable await cursor while there are
+        #   subscribers, the cursor is opened at the natural end of sys.log,
+        #   records missed before are retrieved with the _id index
+        coll = self.config.sys.log.connect_async()
+        last = await coll.find_one(
+            sort=[("$natural", pymongo.DESCENDING)], projection=["_id"])
+        offset = None if last is None else last["_id"]
+        self.logger.debug("start tailing [sys.log] after [%s]", offset)
+        while self.subscriber:
+            cursor = coll.find(
+                skip=await coll.estimated_document_count(),
+                cursor_type=pymongo.CursorType.TAILABLE_AWAIT)
+            seen = set()
+            filter = {} if offset is None else {"_id": {"$gt": offset}}
+            async for doc in coll.find(
+                    filter, sort=[("_id", pymongo.ASCENDING)]):
+                offset = doc["_id"]
+                seen.add(offset)
+                self._publish(doc)
+            while cursor.alive and self.subscriber:
+                async for doc in cursor:
+                    if doc["_id"] in seen:
+                        continue
+                    offset = doc["_id"]
+                    self._publish(doc)
+            await cursor.close()
+            if self.subscriber:
+                await asyncio.sleep(1.)
+        self.logger.debug("stop tailing [sys.log]")
@@ -13,6 +13,7 @@ This module implements :class:`.CoreDaemon` which is the base class for
 import datetime
 import time
 
+import core4.base.main
 import core4.queue.main
 import core4.util.node
 from core4.base.main import CoreBase
@@ -64,6 +65,7 @@ class CoreDaemon(CoreBase):
         processing :meth:`.loop` to :meth:`.shutdown`.
         :return:
         """
+        core4.base.main.set_identifier(self.identifier)
         try:
             self.startup()
             self.loop()
@@ -208,7 +210,14 @@ class CoreDaemon(CoreBase):
                     self.heartbeat()
                     heartbeat = self.at + heartbeat_delta
                 self.run_step()
-            time.sleep(self.wait_time)
+            self.wait()
+
+    def wait(self):
+        """
+        Pauses the main :meth:`.loop` between two cycles for ``.wait_time``
+        seconds.
+        """
+        time.sleep(self.wait_time)
 
     def heartbeat(self):
         """
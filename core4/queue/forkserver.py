@@ -0,0 +1,271 @@
+#
+# Copyright 2018 Plan.Net Business Intelligence GmbH & Co. KG
+#
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""
+This module implements :class:`.CoreForkServer` used by :class:`.CoreWorker`
+to launch jobs from a warm Python interpreter.
+
+Without fork server each job launch spawns a new Python interpreter of the
+project's virtual environment (see :meth:`.CoreIntrospector.exec_project`)
+which imports core4, the project package and all its dependencies before
+job execution starts. With ``worker.fork_server.enabled`` the worker keeps
+one fork server per project. The fork server runs :func:`.serve` in the
+project's Python interpreter, preloads the required modules once, and forks
+a child process per job. The child process continues with
+:meth:`.CoreWorkerProcess.start` exactly as the spawned interpreter does.
+Fork servers preload in the background. Jobs launched meanwhile are spawned
+in a new interpreter.
+
+.. note:: The fork server only imports modules. It must not open any MongoDB
+          connection before forking, since :class:`pymongo.MongoClient` is
+          not fork-safe.
+
+.. note:: Modules preloaded by the fork server are not reloaded. Restart the
+          worker after the release of a new project version.
+"""
+
+import importlib
+import logging
+import os
+import select
+import signal
+import subprocess
+import sys
+import traceback
+
+import core4.base
+import core4.service.introspect.main
+from core4.service.introspect.command import FORK_SERVER
+
+#: modules preloaded by each fork server in addition to the project package
+PRELOAD = ("core4.queue.process",)
+
+
+class CoreForkServer(core4.base.CoreBase):
+    """
+    Manages the fork servers of :class:`.CoreWorker`, one per project.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.server = {}
+        self.ready = set()
+
+    def launch(self, name, job_id):
+        """
+        Launches the job with the passed ``job_id`` from the fork server of
+        the job's project.
+
+        The fork server is spawned in the background if it does not exist or
+        if it died. Jobs are passed to the fork server only after it
+        signalled completion of the preload. Until then the launch fails and
+        the worker falls back to launch the job in a new Python interpreter,
+        see :meth:`.CoreWorker.start_job`.
+
+        If the fork server does not answer with the process id of the job
+        within ``worker.fork_server.timeout`` seconds or if it quits, then
+        the fork server is killed immediately, so that it cannot fork the job
+        later, and the launch fails.
+
+        :param name: qual_name of the job
+        :param job_id: str representing the job's
+                       :class:`bson.objectid.ObjectId`
+        :return: process id of the job or ``None`` if the launch failed
+        """
+        project = name.split(".")[0]
+        proc = self.server.get(project)
+        if proc is None or proc.poll() is not None:
+            self.kill(project)
+            self.spawn(name)
+            return None
+        if not self.is_ready(project):
+            self.logger.debug("fork server of [%s] not ready, yet", project)
+            return None
+        timeout = self.config.worker.fork_server.timeout
+        try:
+            proc.stdin.write(job_id + "\n")
+            proc.stdin.flush()
+            if not select.select([proc.stdout], [], [], timeout)[0]:
+                raise TimeoutError(
+                    "no answer within [{}] sec.".format(timeout))
+            line = proc.stdout.readline()
+            if not line:
+                raise EOFError("fork server quit")
+            pid = int(line)
+        except (OSError, EOFError, ValueError) as exc:
+            self.logger.warning(
+                "fork server of [%s] failed to launch [%s]: [%s], killed",
+                project, job_id, exc)
+            self.kill(project)
+            return None
+        self.logger.debug("forked [%s] with pid [%d]", job_id, pid)
+        return pid
+
+    def is_ready(self, project):
+        """
+        Verifies without blocking that the fork server of the passed
+        ``project`` has signalled completion of the preload. A fork server
+        which quits during preload is killed.
+
+        :param project: project name
+        :return: ``True`` if the fork server accepts jobs, else ``False``
+        """
+        if project in self.ready:
+            return True
+        proc = self.server.get(project)
+        if proc is None:
+            return False
+        try:
+            if not select.select([proc.stdout], [], [], 0)[0]:
+                return False
+            line = proc.stdout.readline()
+        except (OSError, ValueError):
+            line = ""
+        if line.strip() != "ready":
+            self.logger.warning(
+                "fork server of [%s] failed to preload, killed", project)
+            self.kill(project)
+            return False
+        self.ready.add(project)
+        self.logger.info("fork server of [%s] ready", project)
+        return True
+
+    def spawn(self, name):
+        """
+        Spawns the fork server for the project of the passed ``name`` with the
+        Python interpreter of the project's virtual environment (see
+        :meth:`.CoreIntrospector.get_python`). The fork server preloads in
+        the background and signals ``ready`` on ``STDOUT``.
+
+        :param name: qual_name to extract project name
+        :return: :class:`subprocess.Popen` object of the fork server
+        """
+        project = name.split(".")[0]
+        intro = core4.service.introspect.main.CoreIntrospector()
+        python_path = intro.get_python(name)
+        preload = list(PRELOAD) + list(
+            self.config.worker.fork_server.preload or [])
+        cmd = FORK_SERVER.format(project=project, preload=repr(preload))
+        proc = subprocess.Popen(
+            [python_path, "-c", cmd], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env=os.environ.copy(), universal_newlines=True, bufsize=1)
+        self.server[project] = proc
+        self.ready.discard(project)
+        self.logger.info("spawned fork server of [%s] with pid [%d]",
+                         project, proc.pid)
+        return proc
+
+    def kill(self, project):
+        """
+        Kills the fork server of the passed ``project`` immediately. Job ids
+        not yet processed by the fork server are discarded. Running jobs are
+        not affected.
+
+        :param project: project name
+        """
+        self.ready.discard(project)
+        proc = self.server.pop(project, None)
+        if proc is None:
+            return
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        for stream in (proc.stdin, proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def stop(self, project=None):
+        """
+        Stops the fork server of the passed ``project`` or all fork servers.
+        Running jobs are not affected.
+
+        :param project: project name, defaults to ``None`` (all projects)
+        """
+        if project is None:
+            project = list(self.server.keys())
+        else:
+            project = [project]
+        for p in project:
+            self.ready.discard(p)
+            proc = self.server.pop(p, None)
+            if proc is None:
+                continue
+            try:
+                proc.stdin.close()
+                proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                proc.kill()
+                proc.wait()
+            self.logger.info("stopped fork server of [%s]", p)
+
+
+def serve(project, preload=()):
+    """
+    Main loop of the fork server executed in the project's Python interpreter.
+    The method preloads the project package and all modules in ``preload``,
+    and signals ``ready`` on ``STDOUT``. Then it reads job ids from ``STDIN``
+    line by line, forks a child process per job and answers with the child's
+    process id on ``STDOUT``. The fork server quits if ``STDIN`` is closed.
+
+    :param project: project name
+    :param preload: list of additional modules to import
+    """
+    # children are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    # answers go to a private copy of STDOUT, so that output of preloaded
+    #   modules cannot break the protocol
+    reply = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    for module in [project] + list(preload):
+        try:
+            importlib.import_module(module)
+        except Exception:
+            traceback.print_exc()
+    reply.write("ready\n")
+    reply.flush()
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        job_id = line.strip()
+        if not job_id:
+            continue
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            reply.close()
+            _execute(job_id)
+        reply.write("{}\n".format(pid))
+        reply.flush()
+
+
+def _execute(job_id):
+    # internal method executed in the forked child process, this mirrors
+    #   core4.service.introspect.command.EXECUTE with STDOUT and STDERR
+    #   redirected to /dev/null
+    code = 0
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        for fd in (0, 1, 2):
+            os.dup2(devnull, fd)
+        os.close(devnull)
+        from core4.queue.process import CoreWorkerProcess
+        CoreWorkerProcess().start(job_id)
+    except BaseException:
+        code = 1
+    finally:
+        logging.shutdown()
+        try:
+            sys.stdout.flush()
+        except Exception:
+            pass
+        os._exit(code)
@@ -8,6 +8,7 @@
 """
 This module delivers the :class:`.CoreJob`.
 """
+import copy
 import hashlib
 import json
 import os
@@ -50,6 +51,7 @@ JOB_ARGS = {
     "attempts_left": (SERIALISE,),
     "author": (PROPERTY,),
     "chain": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
+    "cpu": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
     "defer_max": (ENQUEUE, CONFIG, PROPERTY, SERIALISE),
     "defer_time": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
     "dependency": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
@@ -62,6 +64,7 @@ JOB_ARGS = {
     "last_error": (SERIALISE,),
     "locked": (SERIALISE,),
     "max_parallel": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
+    "memory": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
     "name": (SERIALISE,),
     "priority": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
     "progress_interval": (ENQUEUE, CONFIG, PROPERTY, SERIALISE,),
@@ -99,12 +102,14 @@ JOB_VALIDATION = {
     "attempts": is_int_gt0,
     "author": is_str,
     "chain": is_job,
+    "cpu": is_num_gt0,
     "defer_max": is_int_gt0,
     "defer_time": is_int_gt0,
     "dependency": is_job,
     "error_time": is_int_gt0,
     "force": is_bool_null,
     "max_parallel": is_int_gt0_null,
+    "memory": is_int_gt0_null,
     "priority": is_int,
     "progress_interval": is_int_gt0,
     "schedule": is_cron,
@@ -147,6 +152,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
     * ``defer_time`` - seconds to wait before restart after defer
     * ``dependency`` - list of jobs which need complete before execution
     * ``chain`` - list of jobs to be enqueued after successful job completion
+    * ``cpu`` - number of CPU slots allocated by the job on the worker
     * ``enqueued`` - dict with information about job enqueuing
     * ``enqueued.at`` - datetime when the job has been enqueued
     * ``enqueued.hostname`` - from where the job has been enqueued
@@ -172,6 +178,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
     * ``locked.worker`` - which locked the job
     * ``locked.username`` - running the worker which locked the job
     * ``max_parallel`` - max. number jobs to run in parallel on the same node
+    * ``memory`` - MB of memory allocated by the job on the worker
     * ``name`` - short fully qualified name of the job
     * ``priority`` - to execute the job with >0 higher and <0 lower priority
     * ``prog.message`` - last progress message
@@ -225,6 +232,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
      attempts_left   False  False False      True      na
             author   False  False  True     False      na str
              chain    True   True  True      True    ([]) list of jobs, None
+               cpu    True   True  True      True       1 int/float > 0
          defer_max    True   True  True      True     60' int > 0
         defer_time    True   True  True      True      5' int > 0
         dependency    True   True  True      True    ([]) list of jobs, None
@@ -237,6 +245,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
         last_error   False  False False      True      na
             locked   False  False False      True      na
       max_parallel    True   True  True      True    None int > 0, None
+            memory    True   True  True      True    None int > 0, None
           priority    True   True  True      True       0 int
  progress_interval    True   True  True      True       5 int > 0
               name   False  False False      True      na
@@ -316,6 +325,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
     author = None
     attempts = None
     chain = None
+    cpu = None
     dependency = None
     priority = None
     tag = None
@@ -326,6 +336,7 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
     force = None
     wall_time = None
     max_parallel = None
+    memory = None
     schedule = None
     progress_interval = None
     zombie_time = None
@@ -374,12 +385,43 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
         self.overload_property()
         self.overload_config()
         self.overload_args(**kwargs)
+        self._hash = self.make_hash()
+        self.identifier = self._id
+        self._frozen_ = True
 
+    def make_hash(self):
+        """
+        Returns the md5 hash of the job arguments which identifies the job
+        together with its :meth:`.qual_name`.
+
+        :return: hash (str) or ``None`` if the job has no arguments
+        """
         if self.args:
             js = pformat(self.args)
-            self._hash = hashlib.md5(js.encode("utf-8")).hexdigest()
-        self.identifier = self._id
-        self._frozen_ = True
+            return hashlib.md5(js.encode("utf-8")).hexdigest()
+        return None
+
+    def clone(self, **kwargs):
+        """
+        Returns a copy of the job with the passed enqueueing arguments. The
+        copy shares the configuration with this job and skips the expensive
+        job instantiation. See :meth:`.CoreQueue.enqueue_many`.
+
+        :param kwargs: arguments given by the user while enqueueing.
+        :return: :class:`.CoreJob`
+        """
+        obj = copy.copy(self)
+        obj.__dict__["_frozen_"] = False
+        obj.args = {}
+        obj.sources = []
+        obj.prog = {
+            "value": None,
+            "message": None
+        }
+        obj.overload_args(**kwargs)
+        obj._hash = obj.make_hash()
+        obj._frozen_ = True
+        return obj
 
     def _open_config(self):
         # internal method to open and attach core4 cascading configuration
@@ -400,7 +442,10 @@ class CoreJob(CoreBase, core4.logger.mixin.CoreExceptionLoggerMixin):
 
         target = {}
         traverse(self.config, target)
-        config = core4.util.tool.dict_merge(self.config._config, target)
+        # sections without tags are shared with the configuration snapshot
+        config = dict(self.config._config)
+        for k, v in target.items():
+            config[k] = core4.util.tool.dict_merge(config[k], v)
         self.config._config_cache = core4.config.map.ConfigMap(config)
 
     def set_source(self, filename):
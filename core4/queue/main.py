@@ -12,6 +12,7 @@ example by :mod:`core4.queue.worker` and :mod:`core4.queue.process`.
 
 import importlib
 import sys
+import time
 import traceback
 from datetime import timedelta
 
@@ -29,9 +30,19 @@ import core4.util.tool
 from core4.base import CoreBase
 from core4.queue.helper.job.base import CoreAbstractJobMixin
 from core4.queue.job import STATE_PENDING
-from core4.queue.query import QueryMixin
+from core4.queue.query import QueryMixin, FINAL_EVENT
 from core4.service.introspect.command import RESTART, KILL
 
+#: MongoDB error code of duplicate key errors
+DUPLICATE_KEY = 11000
+
+#: max. number of job ``_id`` recorded with event ``enqueue_many``
+MAX_EVENT_ID = 100
+
+#: minimum MongoDB wire version supporting multi-document transactions on
+#: replica sets (MongoDB 4.0) and sharded clusters (MongoDB 4.2)
+TRANSACTION_WIRE_VERSION = {"replica": 7, "sharded": 8}
+
 STATE_WAITING = (core4.queue.job.STATE_DEFERRED,
                  core4.queue.job.STATE_FAILED)
 STATE_STOPPED = (core4.queue.job.STATE_KILLED,
@@ -68,6 +79,9 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
               queue.
     """
 
+    def initialise_object(self):
+        self._transaction = None
+
     def enqueue(self, cls=None, name=None, by=None, **kwargs):
         """
         Enqueues the passed job identified by it's :meth:`.qual_name`. The job
@@ -81,17 +95,7 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
         # update job properties
         job.__dict__["attempts_left"] = getattr(job, "attempts")
         job.__dict__["state"] = STATE_PENDING
-        enqueued_from = {
-            "at": lambda: core4.util.node.mongo_now(),
-            "hostname": lambda: core4.util.node.get_hostname(),
-            "parent_id": lambda: None,
-            "username": lambda: core4.util.node.get_username()
-        }
-        if by is None:
-            by = {}
-        job.__dict__["enqueued"] = {}
-        for k in ("at", "hostname", "parent_id", "username"):
-            job.__dict__["enqueued"][k] = by.get(k, enqueued_from[k]())
+        job.__dict__["enqueued"] = self._enqueued_by(by)
         # save
         doc = job.serialise()
         try:
@@ -109,6 +113,125 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
         self.make_stat('enqueue_job', str(job._id))
         return job
 
+    def enqueue_many(self, cls=None, args=None, name=None, by=None):
+        """
+        Enqueues the passed job identified by it's :meth:`.qual_name` once for
+        each set of job arguments in ``args``. The job is instantiated only
+        once and cloned for each set of arguments (see
+        :meth:`.CoreJob.clone`). All jobs are inserted into ``sys.queue`` with
+        a single unordered bulk insert and one ``enqueue_many`` event is
+        recorded in ``sys.event``.
+
+        :param args: list of dict with the enqueueing arguments of each job
+        :return: list of the enqueued job objects in order of ``args``; jobs
+                 which already exist are represented by a
+                 :class:`.CoreJobExists` exception
+        """
+        if not args:
+            return []
+        proto = self.job_factory(name or cls)
+        jobs = []
+        for kwargs in args:
+            job = proto.clone(**kwargs)
+            job.validate()
+            jobs.append(job)
+        return self.enqueue_jobs(jobs, by=by)
+
+    def enqueue_jobs(self, jobs, by=None):
+        """
+        Enqueues the passed list of validated job objects, e.g. created with
+        :meth:`.job_factory`. The jobs may be of different classes. All jobs
+        are inserted into ``sys.queue`` with a single unordered bulk insert
+        and one ``enqueue_many`` event is recorded in ``sys.event``.
+
+        :param jobs: list of :class:`.CoreJob` objects
+        :return: list of the enqueued job objects in order of ``jobs``; jobs
+                 which already exist are represented by a
+                 :class:`.CoreJobExists` exception
+        """
+        if not jobs:
+            return []
+        core4.service.setup.CoreSetup().make_queue()
+        docs = self.prepare_jobs(jobs, by=by)
+        error = None
+        try:
+            self.config.sys.queue.insert_many(docs, ordered=False)
+        except pymongo.errors.BulkWriteError as exc:
+            error = exc
+        ret = self.collect_jobs(jobs, docs, error)
+        _id = [str(job._id) for job in ret
+               if not isinstance(job, Exception)]
+        self.logger.info(
+            'successfully enqueued [%d] of [%d] jobs', len(_id), len(jobs))
+        self.make_stat('enqueue_many', _id[:MAX_EVENT_ID], n=len(_id))
+        return ret
+
+    def prepare_jobs(self, jobs, by=None):
+        """
+        Sets the initial state of the passed validated job objects and
+        returns their documents for the bulk insert into ``sys.queue``, see
+        :meth:`.enqueue_jobs` and :meth:`.collect_jobs`.
+
+        :param jobs: list of :class:`.CoreJob` objects
+        :param by: dict with ``at``, ``hostname``, ``parent_id`` and
+                   ``username`` of the job's ``enqueued`` attribute, missing
+                   keys default to the current process
+        :return: list of job documents
+        """
+        enqueued = self._enqueued_by(by)
+        for job in jobs:
+            job.__dict__["attempts_left"] = getattr(job, "attempts")
+            job.__dict__["state"] = STATE_PENDING
+            job.__dict__["enqueued"] = dict(enqueued)
+        return [job.serialise() for job in jobs]
+
+    def collect_jobs(self, jobs, docs, error=None):
+        """
+        Assigns the ``_id`` of the inserted documents to the passed job
+        objects after the bulk insert of the documents of
+        :meth:`.prepare_jobs`.
+
+        :param jobs: list of :class:`.CoreJob` objects
+        :param docs: list of job documents
+        :param error: :class:`pymongo.errors.BulkWriteError` raised by the
+                      bulk insert, errors other than duplicate keys are
+                      re-raised
+        :return: list of the enqueued job objects in order of ``jobs``; jobs
+                 which already exist are represented by a
+                 :class:`.CoreJobExists` exception
+        """
+        failed = set()
+        if error is not None:
+            for write_error in error.details["writeErrors"]:
+                if write_error["code"] != DUPLICATE_KEY:
+                    raise error
+                failed.add(write_error["index"])
+        ret = []
+        for i, (job, doc) in enumerate(zip(jobs, docs)):
+            if i in failed:
+                ret.append(core4.error.CoreJobExists(
+                    "job [{}] exists with args {}".format(
+                        job.qual_name(), job.args)))
+            else:
+                job.__dict__["_id"] = doc["_id"]
+                job.__dict__["identifier"] = doc["_id"]
+                ret.append(job)
+        return ret
+
+    def _enqueued_by(self, by=None):
+        # internal method to create the enqueued attribute of a job from the
+        #   passed dict with defaults for missing keys
+        enqueued_from = {
+            "at": lambda: core4.util.node.mongo_now(),
+            "hostname": lambda: core4.util.node.get_hostname(),
+            "parent_id": lambda: None,
+            "username": lambda: core4.util.node.get_username()
+        }
+        if by is None:
+            by = {}
+        return dict([(k, by.get(k, enqueued_from[k]()))
+                     for k in ("at", "hostname", "parent_id", "username")])
+
     def job_factory(self, job, **kwargs):
         """
         Takes the fully qualified job name, identifies and imports the job
@@ -468,6 +591,85 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
             raise
         return False
 
+    def move_journal(self, docs):
+        """
+        Moves the passed MongoDB documents from collection ``sys.queue`` into
+        ``sys.journal`` with one bulk insert and one bulk delete. If the
+        deployment supports multi-document transactions (see
+        :meth:`.supports_transaction`), then both writes are executed in one
+        transaction.
+
+        Documents which already exist in ``sys.journal`` are not removed from
+        ``sys.queue``.
+
+        :param docs: list of dict (MongoDB documents)
+        :return: list of ``_id`` moved into ``sys.journal``
+        """
+        if not docs:
+            return []
+        if self.supports_transaction():
+            client = self.config.sys.queue.connection
+            with client.start_session() as session:
+                with session.start_transaction():
+                    return self._move_journal(docs, session)
+        return self._move_journal(docs)
+
+    def _move_journal(self, docs, session=None):
+        # internal method used by .move_journal
+        ids = [doc["_id"] for doc in docs]
+        if session is None:
+            exists = set()
+        else:
+            # a duplicate key error would abort the transaction
+            exists = set([d["_id"] for d in self.config.sys.journal.find(
+                {"_id": {"$in": ids}}, projection=["_id"], session=session)])
+            docs = [doc for doc in docs if doc["_id"] not in exists]
+        if docs:
+            try:
+                self.config.sys.journal.insert_many(
+                    docs, ordered=False, session=session)
+            except pymongo.errors.BulkWriteError as exc:
+                for error in exc.details["writeErrors"]:
+                    if error["code"] != DUPLICATE_KEY:
+                        raise
+                    exists.add(error["op"]["_id"])
+        for _id in exists:
+            self.logger.error("failed to journal job [%s]", _id)
+        moved = [_id for _id in ids if _id not in exists]
+        if moved:
+            ret = self.config.sys.queue.delete_many(
+                {"_id": {"$in": moved}}, session=session)
+            if ret.deleted_count != len(moved):
+                raise RuntimeError(
+                    "failed to remove [{}] of [{}] jobs from queue".format(
+                        len(moved) - ret.deleted_count, len(moved)))
+        return moved
+
+    def supports_transaction(self):
+        """
+        Tests if collections ``sys.queue`` and ``sys.journal`` share one
+        MongoDB connection which supports multi-document transactions, i.e. a
+        replica set with MongoDB 4.0 or a sharded cluster with MongoDB 4.2.
+        The result is cached.
+
+        :return: ``True`` if transactions are supported, else ``False``
+        """
+        if self._transaction is None:
+            self._transaction = False
+            client = self.config.sys.queue.connection
+            if client is self.config.sys.journal.connection:
+                info = client.admin.command("ismaster")
+                wire = info.get("maxWireVersion", 0)
+                if info.get("setName"):
+                    self._transaction = (
+                            wire >= TRANSACTION_WIRE_VERSION["replica"])
+                elif info.get("msg") == "isdbgrid":
+                    self._transaction = (
+                            wire >= TRANSACTION_WIRE_VERSION["sharded"])
+            self.logger.debug("multi-document transactions supported [%s]",
+                              self._transaction)
+        return self._transaction
+
     def _find_job(self, _id, collection):
         # internal method used by .load_job and .find_job
         doc = collection.find_one({"_id": _id})
@@ -540,7 +742,9 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
 
         This process updates the job ``state``, ``finished_at`` timestamp, the
         ``runtime``, increases the number of ``trial``s and resets the
-        ``locked`` property.
+        ``locked`` property. The journal document is created from the updated
+        ``sys.queue`` document without reloading the job and moved with
+        :meth:`.move_journal`.
 
         Finally, the job lock is removed from ``sys.lock``
 
@@ -550,16 +754,23 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
             "updating job [%s] to [%s]", job._id,
             core4.queue.job.STATE_COMPLETE)
         runtime = self._finish(job, core4.queue.job.STATE_COMPLETE)
-        self._update_job(job, "state", "finished_at", "runtime", "locked",
-                         "trial")
+        doc = self.config.sys.queue.find_one_and_update(
+            filter={"_id": job._id},
+            update={"$set": dict([
+                (k, getattr(job, k)) for k in (
+                    "state", "finished_at", "runtime", "locked", "trial")])},
+            return_document=pymongo.collection.ReturnDocument.AFTER)
+        if doc is None:
+            raise RuntimeError(
+                "failed to update job [{}] state [{}]".format(
+                    job._id, job.state))
         self.logger.debug("journaling job [%s]", job._id)
-        job = self.load_job(job._id)
-        if self.journal(job.serialise()):
-            self.logger.debug("removing completed job [%s]", job._id)
-            ret = self.config.sys.queue.delete_one(filter={"_id": job._id})
-            if ret.deleted_count != 1:
-                raise RuntimeError(
-                    "failed to remove job [{}] from queue".format(job._id))
+        # attributes modified by others, e.g. wall_at and zombie_at, are
+        #   taken from sys.queue, all others from the job object
+        doc = dict([(k, doc[k] if k in doc else getattr(job, k))
+                    for k in core4.queue.job.SERIALISE_ARGS])
+        if self.move_journal([doc]):
+            self.logger.debug("removed completed job [%s]", job._id)
             self.make_stat('complete_job', str(job._id))
             if unlock:
                 self.unlock_job(job._id)
@@ -685,14 +896,21 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
         job.logger.error("done execution with [%s] after [%d] sec.",
                          job.state, runtime)
 
-    def make_stat(self, event, _id):
+    def make_stat(self, event, _id, n=None):
         """
         Collects current job state counts from ``sys.queue`` and inserts a
-        record into ``sys.event``.
+        record into ``sys.event``. The job state counts are aggregated at most
+        once per ``event.queue_count_interval`` seconds in each process, see
+        :meth:`.get_queue_count`. Events of :data:`.FINAL_EVENT` always
+        aggregate the exact counts. Long-lived processes record stale counts
+        of a burst of events with a trailing ``queue_count`` event, see
+        :meth:`.flush_stat`.
 
         The following events are tracked in ``sys.event``:
 
         * ``enqueue_job``
+        * ``enqueue_many`` - with the number ``n`` of enqueued jobs and the
+          first :data:`.MAX_EVENT_ID` job ``_id``
         * ``request_start_job``
         * ``start_job``
         * ``failed_start``
@@ -708,6 +926,30 @@ class CoreQueue(CoreBase, QueryMixin, metaclass=core4.util.tool.Singleton):
         * ``request_kill_job``
         * ``kill_job``
         * ``remove_job``
+        * ``queue_count`` - trailing refresh without job ``_id``
+
+        :param event: to log
+        :param _id: job _id or list of job _id
+        :param n: number of jobs, defaults to ``None`` (not recorded)
         """
-        self.trigger(name=event, channel=core4.const.QUEUE_CHANNEL,
-                     data={"_id": _id, "queue": self.get_queue_count()})
+        if event in FINAL_EVENT:
+            max_age = None
+        else:
+            max_age = self.config.event.queue_count_interval
+        data = {"_id": _id, "queue": self.get_queue_count(max_age=max_age)}
+        if n is not None:
+            data["n"] = n
+        self.trigger(name=event, channel=core4.const.QUEUE_CHANNEL, data=data)
+
+    def flush_stat(self):
+        """
+        Inserts a ``queue_count`` record with current job state counts into
+        ``sys.event`` if :meth:`.make_stat` reused a snapshot of job state
+        counts which is now older than ``event.queue_count_interval``
+        seconds. This makes the last record of a burst of events carry
+        current counts. The method is called with each cycle of the worker.
+        """
+        at = self.get_queue_reuse(self.config.sys.queue)
+        if (at is not None and time.monotonic() - at
+                >= self.config.event.queue_count_interval):
+            self.make_stat("queue_count", None)
@@ -48,6 +48,7 @@ class CoreWorkerProcess(core4.base.main.CoreBase,
         """
         _id = ObjectId(job_id)
         self.identifier = _id
+        core4.base.main.set_identifier(_id)
         self.setup_logging()
         self.queue = core4.queue.main.CoreQueue()
         now = core4.util.node.mongo_now()
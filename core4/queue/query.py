@@ -13,10 +13,34 @@ based on :class:`.CoreBase`.
 """
 
 import datetime
+import os
+import time
 from collections import OrderedDict
 
+import pymongo
+
+import core4.queue.job
 import core4.util.node
 
+#: job states waiting for execution
+STATE_WAITING = (
+    core4.queue.job.STATE_PENDING,
+    core4.queue.job.STATE_DEFERRED,
+    core4.queue.job.STATE_FAILED
+)
+
+#: sort order to query the next job from ``sys.queue``
+SORT_NEXT_JOB = [
+    ('force', pymongo.DESCENDING),
+    ('priority', pymongo.DESCENDING),
+    ('_id', pymongo.ASCENDING)
+]
+
+#: events which end the processing of a job and always record exact job
+#: state counts, see :meth:`.CoreQueue.make_stat`
+FINAL_EVENT = ("complete_job", "error_job", "failed_job", "inactivate_job",
+               "kill_job", "remove_job", "hard_remove_job")
+
 
 class QueryMixin:
     """
@@ -338,7 +362,26 @@ class QueryMixin:
             }
         ]
 
-    def get_queue_count(self):
+    def pipeline_worker_slot(self, identifier):
+        """
+        Returns the aggregation pipeline to sum up the number of jobs, the
+        CPU and the memory of all jobs locked by the passed worker
+        ``identifier`` by job name, see :meth:`.CoreWorker.get_next_job`.
+
+        :param identifier: worker identifier
+        :return: list of aggregation pipeline stages
+        """
+        return [
+            {"$match": {"locked.worker": identifier}},
+            {"$group": {
+                "_id": "$name",
+                "n": {"$sum": 1},
+                "cpu": {"$sum": {"$ifNull": ["$cpu", 1]}},
+                "memory": {"$sum": {"$ifNull": ["$memory", 0]}}
+            }}
+        ]
+
+    def get_queue_count(self, max_age=None):
         """
         Retrieves aggregated information about ``sys.queue`` state. This is
 
@@ -347,8 +390,204 @@ class QueryMixin:
         * ``flags`` - job flags ``zombie``, ``wall``, ``removed`` and
           ``killed``
 
+        If ``max_age`` is specified, then the aggregation runs at most once per
+        ``max_age`` seconds in the current process. Meanwhile the last snapshot
+        is returned. The snapshot only pays off in long-lived processes like
+        the worker and the API server. Short-lived job processes always start
+        with an empty snapshot.
+
+        :param max_age: max. age of the snapshot in seconds, defaults to
+                        ``None`` (no snapshot)
+        :return: dict
+        """
+        coll = self.config.sys.queue
+        data = self.get_queue_snapshot(coll, max_age)
+        if data is None:
+            cur = coll.aggregate(self.pipeline_queue_count())
+            data = dict([(s["state"], s["n"]) for s in cur])
+            self.set_queue_snapshot(coll, data)
+        return data
+
+    def get_queue_snapshot(self, coll, max_age):
+        """
+        Returns the snapshot of job state counts for the passed ``sys.queue``
+        collection if it is younger than ``max_age`` seconds, else ``None``.
+
+        :param coll: :class:`.CoreCollection` of ``sys.queue``
+        :param max_age: max. age of the snapshot in seconds
+        :return: dict or ``None``
+        """
+        if not max_age:
+            return None
+        count = self.queue_state()["count"]
+        snapshot = count.get(coll.info_url)
+        if snapshot and time.monotonic() - snapshot[0] < max_age:
+            count[coll.info_url] = (snapshot[0], snapshot[1], True)
+            return dict(snapshot[1])
+        return None
+
+    def set_queue_snapshot(self, coll, data):
+        """
+        Saves the snapshot of job state counts for the passed ``sys.queue``
+        collection.
+
+        :param coll: :class:`.CoreCollection` of ``sys.queue``
+        :param data: job state counts as returned by :meth:`.get_queue_count`
+        """
+        self.queue_state()["count"][coll.info_url] = (
+            time.monotonic(), dict(data), False)
+
+    def get_queue_reuse(self, coll):
+        """
+        Returns the time (see :func:`time.monotonic`) of the snapshot of job
+        state counts for the passed ``sys.queue`` collection if it has been
+        reused since the last aggregation. Events recorded with a reused
+        snapshot might miss later changes and require a trailing refresh, see
+        :meth:`.CoreQueue.flush_stat`.
+
+        :param coll: :class:`.CoreCollection` of ``sys.queue``
+        :return: time of the snapshot or ``None``
+        """
+        snapshot = self.queue_state()["count"].get(coll.info_url)
+        if snapshot and snapshot[2]:
+            return snapshot[0]
+        return None
+
+    def queue_state(self):
+        """
+        Returns the state of job state count snapshots of the current
+        process. The state is kept with the object and is reset in forked
+        processes. It is a dict with key
+
+        * ``count`` - snapshots of job state counts by ``sys.queue``
+          collection, see :meth:`.get_queue_count`
+        * ``trailing`` - set of ``sys.queue`` collections with a scheduled
+          trailing refresh, see :meth:`.JobHandler.make_stat`
+
         :return: dict
         """
-        cur = self.config.sys.queue.aggregate(self.pipeline_queue_count())
-        data = list(cur)
-        return dict([(s["state"], s["n"]) for s in data])
+        if getattr(self, "_queue_pid", None) != os.getpid():
+            self._queue_pid = os.getpid()
+            self._queue_state = {"count": {}, "trailing": set()}
+        return self._queue_state
+
+    def filter_next_job(self, identifier, at):
+        """
+        Returns the filter statements to query the next job from
+        ``sys.queue`` for the passed worker ``identifier`` at date/time
+        ``at``. The statements are to be combined with ``$and``, see
+        :meth:`.CoreWorker.get_next_job`.
+
+        :param identifier: of the worker
+        :param at: :class:`datetime.datetime` of the worker
+        :return: list of MongoDB query statements
+        """
+        return [
+            {'locked': None},
+            {'attempts_left': {'$gt': 0}},
+            {'state': {'$in': list(STATE_WAITING)}},
+            {'$or': [{'worker': identifier},
+                     {'worker': None}]},
+            {'removed_at': None},
+            {'killed_at': None},
+            {'$or': [{'query_at': {'$lte': at}},
+                     {'query_at': None}]},
+        ]
+
+    def filter_running_jobs(self, identifier):
+        """
+        Returns the filter to query all jobs locked by the passed worker
+        ``identifier``.
+
+        :param identifier: of the worker
+        :return: MongoDB query dict
+        """
+        return {
+            "state": core4.queue.job.STATE_RUNNING,
+            "locked.worker": identifier
+        }
+
+    def filter_removed_jobs(self):
+        """
+        Returns the filter to query all jobs requested to be removed.
+
+        :return: MongoDB query dict
+        """
+        return {"removed_at": {"$type": "date"}}
+
+    def filter_killed_jobs(self):
+        """
+        Returns the filter to query all jobs in waiting state or ``running``
+        requested to be killed.
+
+        :return: MongoDB query dict
+        """
+        return {
+            "state": {"$in": list(STATE_WAITING)
+                             + [core4.queue.job.STATE_RUNNING]},
+            "killed_at": {"$type": "date"}
+        }
+
+    def explain_queue(self, identifier="__explain__"):
+        """
+        Runs :meth:`explain <pymongo.cursor.Cursor.explain>` on all hot
+        queries and aggregation pipelines against ``sys.queue`` and reports
+        the winning query plan.
+        Use this method to identify missing or unused indices, see also
+        :meth:`.CoreSetup.make_queue`.
+
+        The following queries are explained:
+
+        * ``next_job`` - see :meth:`.CoreWorker.get_next_job`
+        * ``max_parallel`` - see :meth:`.CoreWorker.get_next_job`
+        * ``running_jobs`` - see :meth:`.CoreWorker.flag_jobs`
+        * ``removed_jobs`` - see :meth:`.CoreWorker.remove_jobs`
+        * ``killed_jobs`` - see :meth:`.CoreWorker.check_kill`
+
+        :param identifier: worker identifier used in queries
+        :return: list of dict with ``query``, ``stage`` (list of plan stages),
+                 ``index`` (list of index names) and ``collscan`` (bool)
+        """
+        coll = self.config.sys.queue
+        now = core4.util.node.mongo_now()
+        queries = [
+            ("next_job", coll.find(
+                {"$and": self.filter_next_job(identifier, now)},
+                sort=SORT_NEXT_JOB).limit(1).explain()),
+            ("max_parallel", coll.connection[coll.database].command(
+                "aggregate", coll.collection,
+                pipeline=self.pipeline_worker_slot(identifier),
+                explain=True)),
+            ("running_jobs", coll.find(
+                self.filter_running_jobs(identifier)).explain()),
+            ("removed_jobs", coll.find(self.filter_removed_jobs()).explain()),
+            ("killed_jobs", coll.find(self.filter_killed_jobs()).explain())
+        ]
+        data = []
+        for name, explain in queries:
+            if "queryPlanner" not in explain:
+                # aggregation pipeline with a $cursor stage
+                explain = explain["stages"][0]["$cursor"]
+            plan = explain["queryPlanner"]["winningPlan"]
+            stage = []
+            index = []
+
+            def traverse(node):
+                if "stage" in node:
+                    stage.append(node["stage"])
+                if "indexName" in node:
+                    index.append(node["indexName"])
+                for key in ("inputStage", "queryPlan"):
+                    if key in node:
+                        traverse(node[key])
+                for sub in node.get("inputStages", []):
+                    traverse(sub)
+
+            traverse(plan)
+            data.append({
+                "query": name,
+                "stage": stage,
+                "index": index,
+                "collscan": "COLLSCAN" in stage
+            })
+        return data
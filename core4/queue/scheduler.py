@@ -29,6 +29,8 @@ To stop the worker start a new Python interpreter and go with::
 """
 
 import datetime
+import heapq
+import time
 
 from croniter import croniter
 
@@ -49,8 +51,19 @@ class CoreScheduler(CoreDaemon):
     https://en.wikipedia.org/wiki/Cron). core4 uses :mod:`croniter` to parse
     and to calculate schedules.
 
+    The scheduler keeps a heap of the precomputed next fire times of all
+    scheduled jobs. The fire time of a job is only recomputed if the job has
+    been due or if its schedule changed. Jobs and their schedules are
+    collected every ``scheduler.reload`` seconds, see :meth:`.reload`.
+
     Note that the scheduler keeps track of the last scheduling time and catches
-    up with all missed enqueuing, e.g. if the scheduler was down.
+    up with missed enqueuing, e.g. if the scheduler was down. Config setting
+    ``scheduler.catch_up`` controls how missed intervals are handled:
+
+    * ``skip`` - missed intervals are dropped
+    * ``once`` - jobs with one or more missed intervals are enqueued once
+    * ``all`` - jobs are enqueued once for each missed interval, one interval
+      after the other
     """
     kind = "scheduler"
 
@@ -60,16 +73,45 @@ class CoreScheduler(CoreDaemon):
         self.next = None
         self.previous = None
         self.job = None
+        self.heap = []
+        self.cron = {}
+        self.cursor = None
+        self.reload_at = None
 
     def startup(self):
         """
         Implements the **startup** phase of the scheduler. The method is based
-        on :class:`.CoreDaemon` implementation and additionally spawns
-        :meth:`.collect_job`.
+        on :class:`.CoreDaemon` implementation and additionally collects the
+        jobs, see :meth:`.reload`.
         """
         super().startup()
+        self.reload()
+
+    def reload(self):
+        """
+        Collects all known jobs (see :meth:`.CoreIntrospector.collect_job`)
+        and synchronises their schedules with :meth:`.load_schedule`.
+        """
         intro = core4.service.introspect.main.CoreIntrospector()
         self.job = intro.collect_job()
+        self.load_schedule()
+        self.reload_at = time.monotonic() + self.config.scheduler.reload
+
+    def load_schedule(self):
+        """
+        Synchronises the heap of next fire times with the collected jobs.
+        Jobs which have been removed or which changed their schedule are
+        dropped. New jobs and jobs with a changed schedule are added.
+        """
+        for name in list(self.cron.keys()):
+            doc = self.job.get(name)
+            if doc is None or doc["schedule"] != self.cron[name]["schedule"]:
+                self.logger.debug("unschedule [%s]", name)
+                del self.cron[name]
+        if self.cursor is not None:
+            for name, doc in self.job.items():
+                if name not in self.cron:
+                    self._push(name, doc["schedule"], self.cursor)
 
     def loop(self):
         """
@@ -77,9 +119,10 @@ class CoreScheduler(CoreDaemon):
         """
         self.wait_time = 1
         self.previous = None
-        doc = self.config.sys.job.find_one({"_id": "__schedule__"})
-        if doc:
-            self.previous = doc.get("schedule_at", None)
+        if self.config.scheduler.catch_up != "skip":
+            doc = self.config.sys.job.find_one({"_id": "__schedule__"})
+            if doc:
+                self.previous = doc.get("schedule_at", None)
         super().loop()
 
     def run_step(self):
@@ -87,26 +130,19 @@ class CoreScheduler(CoreDaemon):
         The scheduler consists of one step. This time interval of this step
         can be configured by core4 config setting ``scheduler.interval`` and
         defaults to 1 second.
-        :return:
+
+        If the jobs cannot be enqueued, then they are due again with the next
+        step and the scheduling time in ``sys.job`` is not advanced.
+
+        :return: number of enqueued jobs
         """
-        jobs = self.get_next(self.previous, self.at)
-        n = 0
-        for job, schedule in jobs:
-            self.logger.info("enqueue [%s] at [%s]", job, schedule)
-            # todo: improve no try/except required if functool.enqueue used
-            try:
-                self.queue.enqueue(name=job)._id
-            except ImportError:
-                core4.service.introspect.main.exec_project(
-                    job, ENQUEUE, qual_name=job)
-            except core4.error.CoreJobExists:
-                self.logger.error("job [%s] exists", job)
-            except Exception:
-                self.logger.critical("failed to enqueue [%s]", job,
-                                     exc_info=True)
-            else:
-                n += 1
+        if self.reload_at is not None and time.monotonic() >= self.reload_at:
+            self.reload()
+        due = self.get_next(self.previous, self.at)
+        n = self.enqueue(due)
         self.previous = self.at
+        if n is None:
+            return 0
         self.config.sys.job.update_one(
             {
                 "_id": "__schedule__"
@@ -120,22 +156,91 @@ class CoreScheduler(CoreDaemon):
         )
         return n
 
+    def enqueue(self, due):
+        """
+        Enqueues the passed jobs with a single bulk insert (see
+        :meth:`.CoreQueue.enqueue_jobs`). Jobs which cannot be imported by the
+        scheduler are enqueued in the context of their project.
+
+        :param due: list of tuples with ``(name, schedule, at)`` as returned
+                    by :meth:`.get_next`
+        :return: number of enqueued jobs or ``None`` if the bulk enqueue
+                 failed and the jobs are due again
+        """
+        jobs = []
+        for job_name, schedule, at in due:
+            self.logger.info("enqueue [%s] at [%s]", job_name, schedule)
+            try:
+                jobs.append((self.queue.job_factory(job_name), at))
+            except ImportError:
+                core4.service.introspect.main.exec_project(
+                    job_name, ENQUEUE, qual_name=job_name)
+            except Exception:
+                self.logger.critical("failed to enqueue [%s]", job_name,
+                                     exc_info=True)
+        try:
+            ret = self.queue.enqueue_jobs([job for job, _ in jobs])
+        except Exception:
+            self.logger.critical("failed to enqueue [%d] jobs", len(jobs),
+                                 exc_info=True)
+            for job, at in jobs:
+                self._push(job.qual_name(), None, at, due=True)
+            return None
+        n = 0
+        for (job, at), result in zip(jobs, ret):
+            if isinstance(result, core4.error.CoreJobExists):
+                self.logger.error("job [%s] exists", job.qual_name())
+                if self.config.scheduler.catch_up == "all":
+                    self._push(job.qual_name(), None, at, due=True)
+            else:
+                n += 1
+        return n
+
     def get_next(self, start, end):
         """
         Returns the jobs to be enqueued between ``start`` and ``end``
-        date/time.
+        date/time and advances their next fire time.
 
         :param start: :class:`datetime.datetime` when last scheduling has been
                       executed. Pass ``None`` for the very first schedule.
         :param end: :class:`datetime.datetime` of now
-        :return: list of tuples with ``(name, schedule)`` of the job
+        :return: list of tuples with ``(name, schedule, at)`` of the job with
+                 ``at`` the job's fire time
         """
         ret = []
         if start is None:
             start = end
-        for job_name, doc in self.job.items():
-            cron = croniter(doc["schedule"], start)
-            next_time = cron.get_next(datetime.datetime)
-            if next_time <= end:
-                ret.append((job_name, doc["schedule"]))
+        if start != self.cursor:
+            # the heap is based on a different point in time
+            self.heap = []
+            self.cron = {}
+            for job_name, doc in self.job.items():
+                self._push(job_name, doc["schedule"], start)
+        seen = set()
+        while self.heap and self.heap[0][0] <= end:
+            at, job_name = heapq.heappop(self.heap)
+            entry = self.cron.get(job_name)
+            if entry is None or entry["next"] != at or job_name in seen:
+                # stale heap entry of a changed schedule or of a retry
+                continue
+            seen.add(job_name)
+            ret.append((job_name, entry["schedule"], at))
+        # with catch up "all" the next missed interval is due with next step
+        catch_up = self.config.scheduler.catch_up
+        for job_name, schedule, at in ret:
+            self._push(job_name, schedule, at if catch_up == "all" else end)
+        self.cursor = end
         return ret
+
+    def _push(self, name, schedule, base, due=False):
+        # internal method to calculate the next fire time of the job after
+        #   the passed base date/time, or at base if due, and to push the job
+        #   on the heap
+        if schedule is None:
+            schedule = self.cron[name]["schedule"]
+        if due:
+            at = base
+        else:
+            at = croniter(schedule, base).get_next(datetime.datetime)
+        self.cron[name] = {"schedule": schedule, "next": at}
+        heapq.heappush(self.heap, (at, name))
@@ -23,6 +23,16 @@ def is_int_gt0(key, val, msg=None):
     assert val > 0, msg or "[{}] > 0 expected".format(key)
 
 
+def is_num_gt0(key, val):
+    """
+    Check integer or float and greater than zero.
+    """
+    assert (isinstance(val, (int, float))
+            and not isinstance(val, bool)), "[{}] expected int or float".format(
+        key)
+    assert val > 0, "[{}] > 0 expected".format(key)
+
+
 def is_job(key, val):
     """
     Check this is a :class:`.CoreJob`.
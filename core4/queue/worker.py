@@ -31,12 +31,18 @@ To stop the worker start a new Python interpreter and go with::
 """
 
 import collections
+import os
+import re
+import select
 import signal
+import threading
+import time
 from datetime import timedelta
 
 import psutil
 import pymongo
 
+import core4.queue.forkserver
 import core4.queue.job
 import core4.queue.process
 import core4.queue.query
@@ -48,10 +54,21 @@ from core4.service.introspect.command import EXECUTE
 #: processing steps in the main loop of :class:`.CoreWorker`
 STEPS = (
     "work_jobs",
+    "supervise_jobs",
     "remove_jobs",
     "flag_jobs",
     "collect_stats")
 
+#: max. number of jobs journaled at once by :meth:`.CoreWorker.remove_jobs`
+REMOVE_BATCH = 500
+
+#: processing steps of :class:`.CoreWorker` triggered by :meth:`.watch_queue`
+WAKEUP_STEPS = ("work_jobs", "supervise_jobs")
+
+#: max. time in milliseconds the change stream of :class:`.CoreWorker` awaits
+#: new events before checking the worker's exit state
+CHANGE_STREAM_AWAIT = 1000
+
 
 class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
     """
@@ -76,11 +93,37 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
             (min(psutil.cpu_percent(percpu=True)),
              psutil.virtual_memory()[4] / 2. ** 20))
         self.job = None
+        self.wakeup = threading.Event()
+        self.watcher = None
+        self.fork_server = None
+        self.process = {}
+        self.poller = select.poll() if hasattr(os, "pidfd_open") else None
+        self.slot = self.create_slot()
         self.handle_signal()
 
+    def create_slot(self):
+        """
+        Creates the CPU and memory slots of the worker from
+        ``worker.slot.cpu`` and ``worker.slot.memory``. The CPU slots default
+        to the number of CPUs of the node. The memory slots default to the
+        total memory of the node in MB less ``worker.min_free_ram``.
+
+        :return: dict with ``cpu`` and ``memory`` slots
+        """
+        cpu = self.config.worker.slot.cpu
+        if cpu is None:
+            cpu = psutil.cpu_count()
+        memory = self.config.worker.slot.memory
+        if memory is None:
+            memory = (psutil.virtual_memory().total / 2. ** 20
+                      - self.config.worker.min_free_ram)
+        self.logger.debug("create [%s] cpu and [%d] MB memory slots", cpu,
+                          memory)
+        return {"cpu": cpu, "memory": memory}
+
     def handle_signal(self):
-        # ignore signal from children to avoid defunct zombies
-        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        # job processes are reaped by reap_jobs with os.waitpid
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
 
     def startup(self):
         """
@@ -91,6 +134,90 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         super().startup()
         intro = core4.service.introspect.main.CoreIntrospector()
         self.job = intro.collect_job()
+        if self.config.worker.change_stream:
+            self.watcher = threading.Thread(
+                target=self.watch_queue, name="watch_queue", daemon=True)
+            self.watcher.start()
+        if self.config.worker.fork_server.enabled:
+            self.fork_server = core4.queue.forkserver.CoreForkServer()
+
+    def shutdown(self):
+        """
+        Stops the change stream :meth:`.watch_queue` and all fork servers
+        and continues with the **shutdown** phase of :class:`.CoreDaemon`.
+        """
+        self.exit = True
+        if self.watcher is not None:
+            self.watcher.join()
+            self.watcher = None
+        if self.fork_server is not None:
+            self.fork_server.stop()
+            self.fork_server = None
+        super().shutdown()
+
+    def watch_queue(self):
+        """
+        Subscribes to a change stream on collection ``sys.queue`` if
+        ``worker.change_stream`` is ``True``. Inserted jobs, all state
+        transitions except ``running`` and kill requests wake up
+        :meth:`.wait` so that :meth:`.work_jobs` and :meth:`.supervise_jobs`
+        are processed immediately. Polling with the ``worker.execution_plan``
+        interval remains as a backstop.
+
+        .. note:: MongoDB change streams require a replica set. If the change
+                  stream is not supported, then the worker falls back to
+                  polling.
+        """
+        pipeline = [{"$match": {"$or": [
+            {"operationType": {"$in": ["insert", "replace"]}},
+            {
+                "operationType": "update",
+                "updateDescription.updatedFields.state": {
+                    "$exists": True,
+                    "$ne": core4.queue.job.STATE_RUNNING
+                }
+            },
+            {
+                "operationType": "update",
+                "updateDescription.updatedFields.killed_at": {"$ne": None}
+            }
+        ]}}]
+        token = None
+        while not self.exit:
+            try:
+                with self.config.sys.queue.watch(
+                        pipeline=pipeline, resume_after=token,
+                        max_await_time_ms=CHANGE_STREAM_AWAIT) as stream:
+                    self.logger.info("watching sys.queue change stream")
+                    while stream.alive and not self.exit:
+                        change = stream.try_next()
+                        if change is not None:
+                            token = stream.resume_token
+                            self.wakeup.set()
+            except pymongo.errors.OperationFailure as exc:
+                self.logger.warning(
+                    "change stream not available, fall back to polling: "
+                    "[%s]", exc)
+                return
+            except pymongo.errors.PyMongoError as exc:
+                self.logger.error("change stream failed: [%s]", exc)
+                time.sleep(self.wait_time)
+
+    def wait(self):
+        """
+        Pauses the main :meth:`.loop` between two cycles for ``.wait_time``
+        seconds. If a job has been inserted, changed state or has been
+        requested to be killed in the meantime (see :meth:`.watch_queue`),
+        then the worker wakes up and processes :meth:`.work_jobs` and
+        :meth:`.supervise_jobs` with the next cycle.
+        """
+        if self.watcher is None:
+            return super().wait()
+        if self.wakeup.wait(self.wait_time):
+            self.wakeup.clear()
+            for step in self.plan:
+                if step["name"] in WAKEUP_STEPS and self.at is not None:
+                    step["next"] = min(step["next"], self.at)
 
     def cleanup(self):
         """
@@ -105,6 +232,7 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         Creates the worker's execution plan in the main processing loop:
 
         #. :meth:`.work_jobs` - get next job, inactivate or execute
+        #. :meth:`.supervise_jobs` - handle died jobs and kill requests
         #. :meth:`.remove_jobs` - remove jobs
         #. :meth:`.flag_jobs` - flag jobs as non-stoppers, zombies, killed
         #. :meth:`.collect_stats` - collect and save general sever metrics
@@ -135,7 +263,8 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
     def run_step(self):
         """
         This method implements the steps of the worker.
-        See :meth:`.create_plan` for further details.
+        See :meth:`.create_plan` for further details. Each cycle finally
+        records stale job state counts, see :meth:`.CoreQueue.flush_stat`.
         """
         for step in self.plan:
             interval = timedelta(seconds=step["interval"])
@@ -146,35 +275,39 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
                 self.logger.debug("exit [%s] at cycle [%s]",
                                   step["name"], self.cycle["total"])
                 step["next"] = self.at + interval
+        self.queue.flush_stat()
 
     def work_jobs(self):
         """
         This method is part of the main
         :meth:`loop <core4.queue.daemon.CoreDaemon.loop>` phase of the worker.
 
-        The step queries and handles the best next job from ``sys.queue`` (see
-        :meth:`.get_next_job` and :meth:`.start_job`). Furthermore this method
+        The step queries and handles the best next jobs from ``sys.queue``
+        (see :meth:`.get_next_job` and :meth:`.start_job`) as long as free
+        slots are available. The number of jobs launched with one step is
+        limited by the number of CPU slots. Furthermore this method
         *inactivates* jobs.
         """
-        doc = self.get_next_job()
-        if doc is None:
-            return
-        if not self.inactivate(doc):
-            self.start_job(doc)
+        for _ in range(max(1, int(self.slot["cpu"]))):
+            doc = self.get_next_job()
+            if doc is None:
+                return
+            if not self.inactivate(doc):
+                self.start_job(doc, claimed=True)
 
     def inactivate(self, doc):
         """
         This method is called by :meth:`.work_jobs` to mark jobs which have
         reached ``inactive_at`` as ``inactive``.
 
-        :param doc: job document to inactivate
+        :param doc: job document to inactivate as returned by
+                    :meth:`.get_next_job`
         """
         if doc["state"] == core4.queue.job.STATE_DEFERRED:
             if doc.get("inactive_at", None):
                 if doc["inactive_at"] <= self.at:
-                    update = {
-                        "state": core4.queue.job.STATE_INACTIVE
-                    }
+                    update = self._release_update(doc)
+                    update["state"] = core4.queue.job.STATE_INACTIVE
                     ret = self.config.sys.queue.update_one(
                         filter={"_id": doc["_id"]}, update={"$set": update})
                     if ret.raw_result["n"] != 1:
@@ -187,7 +320,7 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
                     return True
         return False
 
-    def start_job(self, doc, run_async=True):
+    def start_job(self, doc, run_async=True, claimed=False):
         """
         This method is called by :meth:`.work_jobs` and encapsulated for
         testing purposes, only.
@@ -195,13 +328,48 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         :param doc: job document to launch
         :param run_async: run asynchronous (default) wait for process to
                           complete
-        """
+        :param claimed: ``True`` if the job has been set ``running`` already
+                        by :meth:`.get_next_job`, defaults to ``False``
+
+        With ``worker.fork_server.enabled`` asynchronous jobs are forked from
+        a warm project interpreter (see :mod:`core4.queue.forkserver`). If
+        this fails, the job is launched in a new Python interpreter.
+        """
+        if not claimed:
+            update = self._claim_update()
+            update["trial"] = doc["trial"] + 1
+            ret = self.config.sys.queue.update_one(
+                filter={"_id": doc["_id"]}, update={"$set": update})
+            if ret.raw_result["n"] != 1:
+                raise RuntimeError(
+                    "failed to update job [{}] state [starting]".format(
+                        doc["_id"]))
+        self.queue.make_stat('request_start_job', str(doc["_id"]))
+        self.logger.info("launching [%s] with _id [%s]", doc["name"],
+                         doc["_id"])
+        if run_async:
+            pid = None
+            if self.fork_server is not None:
+                pid = self.fork_server.launch(doc["name"], str(doc["_id"]))
+                if pid is None:
+                    self.logger.warning(
+                        "fork server failed, spawning [%s]", doc["_id"])
+            if pid is None:
+                proc = core4.service.introspect.main.exec_project(
+                    doc["name"], EXECUTE, wait=False, job_id=str(doc["_id"]))
+                pid = proc.pid
+            self.register_process(doc["_id"], pid)
+        else:
+            from core4.queue.process import CoreWorkerProcess
+            CoreWorkerProcess().start(doc["_id"], redirect=False, manual=True)
+
+    def _claim_update(self):
+        # internal method to create the job attributes set with job start
         now = self.at
-        update = {
+        return {
             "state": core4.queue.job.STATE_RUNNING,
             "started_at": now,
             "query_at": None,
-            "trial": doc["trial"] + 1,
             "locked": {
                 "at": now,
                 "heartbeat": now,
@@ -210,26 +378,22 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
                 "worker": self.identifier
             }
         }
-        ret = self.config.sys.queue.update_one(
-            filter={"_id": doc["_id"]}, update={"$set": update})
-        if ret.raw_result["n"] != 1:
-            raise RuntimeError(
-                "failed to update job [{}] state [starting]".format(
-                    doc["_id"]))
-        self.queue.make_stat('request_start_job', str(doc["_id"]))
-        self.logger.info("launching [%s] with _id [%s]", doc["name"],
-                         doc["_id"])
-        if run_async:
-            core4.service.introspect.main.exec_project(
-                doc["name"], EXECUTE, wait=False, job_id=str(doc["_id"]))
-        else:
-            from core4.queue.process import CoreWorkerProcess
-            CoreWorkerProcess().start(doc["_id"], redirect=False, manual=True)
+
+    def _release_update(self, doc):
+        # internal method to reset the job attributes modified by the claim
+        #   of .get_next_job from the original job document
+        return {
+            "state": doc["state"],
+            "started_at": doc.get("started_at", None),
+            "query_at": doc.get("query_at", None),
+            "trial": doc["trial"],
+            "locked": None
+        }
 
     def get_next_job(self):
         """
-        Queries the best next job from collection ``sys.queue``. This method
-        filters and orders jobs with the following properties:
+        Queries and claims the best next job from collection ``sys.queue``.
+        This method filters and orders jobs with the following properties:
 
         **filter:**
 
@@ -240,6 +404,11 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         * not removed, yet (``.removed_at``)
         * not killed, yet (``.killed_at``)
         * with no or past query time (``.query_at``)
+        * not in project maintenance
+        * not exceeding ``max_parallel`` on this worker
+        * not exceeding the free ``cpu`` and ``memory`` slots of this worker
+          unless ``force``
+        * ``force`` only if system resources are exhausted
 
         **sort order:**
 
@@ -247,115 +416,139 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         * ``.priority``
         * enqueue date/time (job ``.id`` sort order)
 
-        The method memorises an ``offset`` attribute to ensure all jobs have a
-        chance to get queries across multiple workers. If all jobs have been
-        checked, then the offset is reset and querying starts from top.
-
-        In order to handle high priority jobs, the existence of a job *below*
-        the current offset is checked. If a job with a higher priority exists
-        below the ``offset``, then this high-priority job is returned.
-
-        :return: job document from collection ``sys.queue``
-        """
-        query = [
-            {'locked': None},
-            {'attempts_left': {'$gt': 0}},
-            {'$or': [
-                {'state': s} for s in [
-                    core4.queue.job.STATE_PENDING,
-                    core4.queue.job.STATE_FAILED,
-                    core4.queue.job.STATE_DEFERRED]]
-            },
-            {'$or': [{'worker': self.identifier},
-                     {'worker': None}]},
-            {'removed_at': None},
-            {'killed_at': None},
-            {'$or': [{'query_at': {'$lte': self.at}},
-                     {'query_at': None}]},
-        ]
-        order = [
-            ('force', pymongo.DESCENDING),
-            ('priority', pymongo.DESCENDING),
-            ('_id', pymongo.ASCENDING)
-        ]
-        if self.offset:
-            cur2 = self.config.sys.queue.find(
-                filter={'$and': query + [{"_id": {"$lte": self.offset}}]},
-                sort=order)
-            query.append({'_id': {'$gt': self.offset}})
-        else:
-            cur2 = None
-        cur1 = self.config.sys.queue.find(
-            filter={'$and': query}, sort=order)
+        The job is claimed with a single atomic
+        :meth:`find_one_and_update <pymongo.collection.Collection.find_one_and_update>`
+        which sets state ``running`` and the ``locked`` attribute. Competing
+        workers therefore never receive the same job. The reservation is
+        finally secured in collection ``sys.lock`` which is still used by job
+        removal, kill and restart.
+
+        The method memorises the sort key (``force``, ``priority``, ``_id``)
+        of the last claimed job as ``offset`` to ensure all jobs have a chance
+        to get queried across multiple workers. The claim is restricted to
+        jobs with a higher ``force`` and ``priority`` than the ``offset`` or
+        with the same ``force`` and ``priority`` but enqueued after the
+        ``offset``. This way high priority jobs are still returned first. If
+        all jobs have been checked, then the offset is reset and querying
+        starts from top.
+
+        :return: job document from collection ``sys.queue`` as it has been
+                 before the claim or ``None``
+        """
+        query = self.filter_next_job(self.identifier, self.at)
+        query += self._filter_maintenance()
+        query += self._filter_slot()
+        query += self._filter_resources()
+        order = core4.queue.query.SORT_NEXT_JOB
         while True:
-            try:
-                data = cur1.next()
-            except StopIteration:
-                data = None
-            if cur2 is not None:
-                try:
-                    data2 = cur2.next()
-                except StopIteration:
-                    data2 = None
-            else:
-                data2 = None
+            data = None
+            if self.offset is not None:
+                data = self._claim_job(
+                    query + [self._filter_offset(*self.offset)], order)
+                if data is not None:
+                    self.logger.debug(
+                        "next job from bottom chunk [%s]", data["_id"])
             if data is None:
-                if data2 is None:
+                data = self._claim_job(query, order)
+                if data is None:
                     self.offset = None
                     return None
-                self.logger.debug(
-                    "next job from top chunk [%s]", data2["_id"])
-                data = data2
-            else:
-                self.logger.debug(
-                    "next job from bottom chunk [%s]", data["_id"])
-                if data2 is not None and data2["priority"] > data["priority"]:
-                    data = data2
-                    self.logger.debug(
-                        "next job from prioritised top chunk [%s]",
-                        data["_id"])
-            project = data["name"].split(".")[0]
-            if self.queue.maintenance(project):
-                self.logger.debug(
-                    "skipped job [%s] in maintenance", data["_id"])
-                continue
-
-            # check system resources
-            cur_stats = self.avg_stats()
-            if ((cur_stats[0] > self.config.worker.max_cpu)
-                    or (cur_stats[1] < self.config.worker.min_free_ram)):
-                if not data["force"]:
-                    self.logger.info(
-                        'skipped job [%s] with _id [%s]: '
-                        'not enough resources available: '
-                        'cpu [%1.1f], memory [%1.1f]',
-                        data["name"], data["_id"], *cur_stats[:2])
-                    return None
-
-            # check max_parallel
-            count = self.config.sys.queue.count_documents(
-                filter={'name': data["name"],
-                        "locked.worker": self.identifier})
-            if count >= data["max_parallel"]:
-                continue
-            # acquire lock
+                self.logger.debug("next job from top chunk [%s]", data["_id"])
+            # secure the reservation
             if not self.queue.lock_job(self.identifier, data["_id"]):
                 self.logger.debug('skipped job [%s] due to lock failure',
                                   data["_id"])
+                self.config.sys.queue.update_one(
+                    filter={"_id": data["_id"]},
+                    update={"$set": self._release_update(data)})
+                query.append({"_id": {"$ne": data["_id"]}})
                 continue
-
-            self.offset = data["_id"]
+            self.offset = (data.get("force"), data.get("priority"),
+                           data["_id"])
             self.logger.debug('successfully reserved [%s]', data["_id"])
             return data
 
+    @staticmethod
+    def _filter_offset(force, priority, _id):
+        # internal method to filter jobs not passed by the offset with
+        #   SORT_NEXT_JOB, i.e. with a higher force and priority or with the
+        #   same force and priority and enqueued later
+        if force is None:
+            higher = [False, True]
+        elif force:
+            higher = []
+        else:
+            higher = [True]
+        return {"$or": [
+            {"force": {"$in": higher}},
+            {"force": force, "priority": {"$gt": priority}},
+            {"force": force, "priority": priority, "_id": {"$gt": _id}}
+        ]}
+
+    def _claim_job(self, query, order):
+        # internal method to atomically claim the first job matching the
+        #   passed query and sort order
+        return self.config.sys.queue.find_one_and_update(
+            filter={'$and': query},
+            update={
+                "$set": self._claim_update(),
+                "$inc": {"trial": 1}
+            },
+            sort=order,
+            return_document=pymongo.ReturnDocument.BEFORE)
+
+    def _filter_maintenance(self):
+        # internal method to exclude jobs of projects in maintenance
+        project = self.queue.maintenance(project=True)
+        if project:
+            regex = "^(" + "|".join([re.escape(p) for p in project]) + r")\."
+            return [{"name": {"$not": re.compile(regex)}}]
+        return []
+
+    def _filter_slot(self):
+        # internal method to exclude jobs which reached max_parallel and
+        #   jobs which exceed the free cpu and memory slots
+        cur = self.config.sys.queue.aggregate(
+            self.queue.pipeline_worker_slot(self.identifier))
+        exclude = []
+        cpu = self.slot["cpu"]
+        memory = self.slot["memory"]
+        for doc in cur:
+            exclude.append(
+                {"name": doc["_id"], "max_parallel": {"$lte": doc["n"]}})
+            cpu -= doc["cpu"]
+            memory -= doc["memory"]
+        query = [{"$or": [
+            {"force": True},
+            {
+                "cpu": {"$not": {"$gt": cpu}},
+                "memory": {"$not": {"$gt": memory}}
+            }
+        ]}]
+        if exclude:
+            query.append({"$nor": exclude})
+        return query
+
+    def _filter_resources(self):
+        # internal method to restrict to forced jobs if resources are low
+        cur_stats = self.avg_stats()
+        if ((cur_stats[0] > self.config.worker.max_cpu)
+                or (cur_stats[1] < self.config.worker.min_free_ram)):
+            self.logger.info(
+                'not enough resources available: cpu [%1.1f], '
+                'memory [%1.1f], launching forced jobs only', *cur_stats[:2])
+            return [{"force": True}]
+        return []
+
     def remove_jobs(self):
         """
         This method is part of the main
         :meth:`loop <core4.queue.daemon.CoreDaemon.loop>` phase of the worker.
 
         The processing step queries all jobs with a specified ``removed_at``
-        attribute. After successful job lock, the job is moved from
-        ``sys.queue`` into ``sys.journal``.
+        attribute. After successful job lock, the jobs are moved from
+        ``sys.queue`` into ``sys.journal`` in batches of ``REMOVE_BATCH``
+        jobs (see :meth:`.CoreQueue.move_journal`).
 
         .. note:: This method does not unlock the job from ``sys.lock``. This
                   special behavior is required to prevent race conditions
@@ -363,27 +556,135 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
                   locking the job between ``sys.queue`` and ``sys.lock``.
         """
 
-        cur = self.config.sys.queue.find(
-            {"removed_at": {"$ne": None}}
-        )
+        cur = self.config.sys.queue.find(self.filter_removed_jobs())
+        batch = []
         for doc in cur:
             if self.queue.lock_job(self.identifier, doc["_id"]):
-                if self.queue.journal(doc):
-                    ret = self.config.sys.queue.delete_one({"_id": doc["_id"]})
-                    if ret.raw_result["n"] != 1:
-                        raise RuntimeError(
-                            "failed to re<move job [{}]".format(doc["_id"]))
-                    self.queue.make_stat('remove_job', str(doc["_id"]))
-                    self.logger.info(
-                        "successfully journaled and removed job [%s]",
-                        doc["_id"])
-                    # note: we will not unlock the job to prevent race
-                    # conditions with other workds; this will be settled
-                    # with .cleanup
-                    continue
+                batch.append(doc)
+                if len(batch) >= REMOVE_BATCH:
+                    self._remove_batch(batch)
+                    batch = []
+        self._remove_batch(batch)
+
+    def _remove_batch(self, batch):
+        # internal method used by .remove_jobs to journal and remove a batch
+        #   of locked jobs
+        if not batch:
+            return
+        moved = set(self.queue.move_journal(batch))
+        for doc in batch:
+            if doc["_id"] in moved:
+                self.queue.make_stat('remove_job', str(doc["_id"]))
+                self.logger.info(
+                    "successfully journaled and removed job [%s]", doc["_id"])
+                # note: we will not unlock the job to prevent race
+                # conditions with other workds; this will be settled
+                # with .cleanup
+            else:
                 self.logger.error(
                     "failed to journal and remove job [%s]", doc["_id"])
 
+    def register_process(self, _id, pid):
+        """
+        Registers the process of a job launched by :meth:`.start_job` for
+        supervision with :meth:`.reap_jobs`. On Linux the process is watched
+        with a process file descriptor (see :func:`os.pidfd_open`). The
+        creation time of the process identifies the process if the process
+        id is recycled.
+
+        :param _id: job ``_id``
+        :param pid: process id of the job
+        """
+        try:
+            created = psutil.Process(pid).create_time()
+        except psutil.NoSuchProcess:
+            created = None
+        fd = None
+        if self.poller is not None:
+            try:
+                fd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                fd = None
+            except OSError:
+                self.poller = None
+            else:
+                self.poller.register(fd, select.POLLIN)
+        self.process[_id] = {"pid": pid, "fd": fd, "created": created}
+
+    def supervise_jobs(self):
+        """
+        This method is part of the main
+        :meth:`loop <core4.queue.daemon.CoreDaemon.loop>` phase of the worker.
+
+        The method handles died jobs (see :meth:`.reap_jobs`) and jobs
+        requested to be killed (see :meth:`.check_kill`). In contrast to
+        :meth:`.flag_jobs` this step only processes changes, i.e. exited
+        processes and kill requests.
+        """
+        self.reap_jobs()
+        self.check_kill()
+
+    def reap_jobs(self):
+        """
+        Identifies exited job processes registered with
+        :meth:`.register_process`. If the job is still ``running`` in
+        ``sys.queue``, then the job died and is flagged ``killed``.
+
+        With process file descriptors a single :meth:`select.poll.poll`
+        returns the exited processes, else each process is checked with
+        :meth:`.process_exited`. Exited child processes of the worker are
+        reaped.
+        """
+        if not self.process:
+            return
+        if self.poller is not None:
+            ready = set([fd for fd, _ in self.poller.poll(0)])
+            exited = [_id for _id, proc in self.process.items()
+                      if proc["fd"] is None or proc["fd"] in ready]
+        else:
+            exited = [_id for _id, proc in self.process.items()
+                      if self.process_exited(proc)]
+        for _id in exited:
+            proc = self.process.pop(_id)
+            try:
+                os.waitpid(proc["pid"], os.WNOHANG)
+            except ChildProcessError:
+                pass
+            if proc["fd"] is not None:
+                if self.poller is not None:
+                    self.poller.unregister(proc["fd"])
+                os.close(proc["fd"])
+            doc = self.config.sys.queue.find_one(
+                {"_id": _id, "state": core4.queue.job.STATE_RUNNING,
+                 "locked.worker": self.identifier},
+                projection=["_id", "name"])
+            if doc is not None:
+                self.logger.error("pid [%s] not exists, killing", proc["pid"])
+                self.queue.exec_kill(doc)
+
+    @staticmethod
+    def process_exited(proc):
+        """
+        Returns ``True`` if the passed job process registered with
+        :meth:`.register_process` exited. Child processes of the worker are
+        reaped with :func:`os.waitpid`. Other processes, e.g. forked by the
+        fork server, are identified by their process id and creation time.
+
+        :param proc: dict with ``pid`` and ``created``
+        :return: ``True`` if the process exited
+        """
+        try:
+            pid, _ = os.waitpid(proc["pid"], os.WNOHANG)
+            return pid != 0
+        except ChildProcessError:
+            pass
+        try:
+            process = psutil.Process(proc["pid"])
+            return (process.create_time() != proc["created"]
+                    or process.status() == psutil.STATUS_ZOMBIE)
+        except psutil.NoSuchProcess:
+            return True
+
     def flag_jobs(self):
         """
         This method is part of the main
@@ -393,16 +694,32 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         worker and forward processing to
 
         #. identify and flag non-stopping jobs (see :meth:`.flag_nonstop`),
-        #. identify and flag zombies (see :meth:`.flag_zombie`),
-        #. identify and handle died jobs (see :meth:`.check_pid`), and to
-        #. manage jobs requested to be kill (see :meth:`.kill_pid` and
-           :meth:`.check_kill`)
+        #. identify and flag zombies (see :meth:`.flag_zombie`), and to
+        #. identify and handle died jobs which have not been launched by this
+           worker process (see :meth:`.check_pid`)
+
+        Died jobs launched by this worker process and kill requests are
+        handled with :meth:`.supervise_jobs`. Therefore the query is
+        restricted to jobs not registered with :meth:`.register_process` and
+        to jobs due to be flagged non-stopping or zombie.
         """
+        at = self.at
+
+        def expired(attr, secs):
+            return {"$expr": {"$lt": [attr, {"$subtract": [
+                at, {"$multiply": [secs, 1000]}]}]}}
+
         cur = self.config.sys.queue.find(
-            {
-                "state": core4.queue.job.STATE_RUNNING,
-                "locked.worker": self.identifier
-            },
+            {"$and": [
+                self.filter_running_jobs(self.identifier),
+                {"$or": [
+                    {"_id": {"$nin": list(self.process.keys())}},
+                    dict(expired("$started_at", "$wall_time"),
+                         wall_at=None),
+                    dict(expired("$locked.heartbeat", "$zombie_time"),
+                         zombie_at=None)
+                ]}
+            ]},
             projection=[
                 "_id", "wall_time", "wall_at", "zombie_time", "zombie_at",
                 "started_at", "locked.heartbeat", "locked.pid", "killed_at",
@@ -412,36 +729,33 @@ class CoreWorker(CoreDaemon, core4.queue.query.QueryMixin):
         for doc in cur:
             self.flag_nonstop(doc)
             self.flag_zombie(doc)
-            self.check_pid(doc)
-            self.kill_pid(doc)
-        self.check_kill()
+            if doc["_id"] not in self.process:
+                self.check_pid(doc)
 
     def check_kill(self):
         """
-        Identifies jobs requested to be killed in waiting state (``pending``,
-        ``deferred`` or ``failed``).
-
-        :param doc: job MongoDB document
+        Identifies jobs requested to be killed. Running jobs of this worker are
+        killed with :meth:`.kill_pid`. Jobs in waiting state (``pending``,
+        ``deferred`` or ``failed``) are locked and flagged ``killed``, too.
+        The query is restricted to the small set of jobs with ``killed_at``.
         """
         cur = self.config.sys.queue.find(
-            {
-                "state": {"$in": [
-                    core4.queue.job.STATE_PENDING,
-                    core4.queue.job.STATE_DEFERRED,
-                    core4.queue.job.STATE_FAILED
-                ]},
-                "killed_at": {
-                    "$ne": None
-                }
-            },
+            self.filter_killed_jobs(),
             projection=[
                 "_id", "wall_time", "wall_at", "zombie_time", "zombie_at",
-                "started_at", "locked.heartbeat", "locked.pid", "killed_at",
-                "name"
+                "started_at", "locked.heartbeat", "locked.pid",
+                "locked.worker", "killed_at", "name", "state"
             ]
         )
         for doc in cur:
-            if self.queue.lock_job(self.identifier, doc["_id"]):
+            if doc["state"] == core4.queue.job.STATE_RUNNING:
+                if (doc.get("locked") or {}).get("worker") == self.identifier:
+                    if (doc["locked"].get("pid") is None
+                            and doc["_id"] in self.process):
+                        # the job process did not advertise its pid, yet
+                        doc["locked"]["pid"] = self.process[doc["_id"]]["pid"]
+                    self.kill_pid(doc)
+            elif self.queue.lock_job(self.identifier, doc["_id"]):
                 self.kill_pid(doc)
 
     def flag_nonstop(self, doc):
@@ -26,7 +26,7 @@ Options:
   -q --qual_name=QUAL_NAME  qual_name filter
   -i --identifier=ID        object identifier filter
   -m --message=PATTERN      message regular expression filter
-  -f --follow               follow log message interval
+  -f --follow               follow log messages, SECONDS to reconnect
   -c --case-sensitive       search [default: False]
   -t --tab                  tab seperated
   -h --help                 Show this screen
@@ -36,13 +36,13 @@ import logging
 import re
 import sys
 from datetime import datetime, time, timedelta
-from time import sleep
 
 from docopt import docopt
 
 import core4
 import core4.util.data
 from core4.base.main import CoreBase
+from core4.logger.tail import follow
 
 LOG_LEVEL = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
 
@@ -262,20 +262,9 @@ def run(args, clock=None):
         offset = doc["_id"]
     if args["--follow"]:
         try:
-            while True:
-                if offset is not None:
-                    iq = query + [{"_id": {"$gt": offset}}]
-                else:
-                    iq = query
-                cur = base.config.sys.log.find(
-                    filter={
-                        "$and": iq
-                    },
-                    sort=[("_id", 1)])
-                for doc in cur:
-                    handle(doc)
-                    offset = doc["_id"]
-                sleep(float(args["SECONDS"] or 1))
+            for doc in follow(base.config.sys.log.connect(), query, offset,
+                              float(args["SECONDS"] or 1)):
+                handle(doc)
         except KeyboardInterrupt:
             print()
         except:
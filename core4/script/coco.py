@@ -20,13 +20,16 @@ Use coco to interact with the core4 backend and frontend in the areas of
 Usage:
   coco --init [PROJECT] [DESCRIPTION] [--yes]
   coco --halt
+  coco --setup
   coco --worker [IDENTIFIER]
   coco --application [IDENTIFIER] [--routing=ROUTING] [--port=PORT] \
-[--address=ADDRESS] [--project=PROJECT] [--filter=FILTER]...
+[--address=ADDRESS] [--project=PROJECT] [--filter=FILTER]... \
+[--processes=PROCESSES]
   coco --scheduler [IDENTIFIER]
   coco --alive
   coco --enqueue QUAL_NAME [ARGS]...
   coco --info
+  coco --explain
   coco --listing [STATE]...
   coco --detail (ID | QUAL_NAME)...
   coco --remove (ID | QUAL_NAME)...
@@ -46,9 +49,13 @@ Usage:
 Options:
   -e --enqueue     enqueue job
   -w --worker      launch worker
+  --processes=PROCESSES  number of application server processes, 0 for one
+                   per CPU [default: 1]
   -s --scheduler   launch scheduler
   -a --alive       worker alive/dead state
   -i --info        job state summary
+  --explain        explain query plans of hot sys.queue queries
+  --setup          setup core4 prerequisites and re-create modified indices
   -l --listing     job listing
   -d --detail      job details
   -x --halt        immediate system halt
@@ -82,6 +89,7 @@ import core4.queue.scheduler
 import core4.queue.worker
 import core4.service.introspect.main
 import core4.service.project
+import core4.service.setup
 import core4.util.data
 import core4.util.node
 from core4.service.operation import build, release
@@ -155,6 +163,30 @@ def info():
         )
 
 
+def setup():
+    core = core4.service.setup.CoreSetup()
+    core.make_all()
+    core.update_queue()
+
+
+def explain():
+    rec = QUEUE.explain_queue()
+    mx = max([len(doc["query"]) for doc in rec])
+    fmt = "{:%ds} {:8s} {:24s} {:s}" % (mx)
+    print(fmt.format("query", "scan", "index", "stage"))
+    print(" ".join(["-" * i for i in [mx, 8, 24, 40]]))
+    for doc in rec:
+        print(fmt.format(
+            doc["query"],
+            "COLLSCAN" if doc["collscan"] else "ok",
+            ", ".join(doc["index"]) or "-",
+            " > ".join(doc["stage"])
+        ))
+    collscan = [doc["query"] for doc in rec if doc["collscan"]]
+    if collscan:
+        raise SystemExit("COLLSCAN in [{}]".format(", ".join(collscan)))
+
+
 def listing(*state):
     filter = []
     for s in list(state):
@@ -451,7 +483,8 @@ def main():
     elif args["--application"]:
         app(name=args["IDENTIFIER"], port=args["--port"],
             project=args["--project"], filter=args["--filter"],
-            routing=args["--routing"], address=args["--address"])
+            routing=args["--routing"], address=args["--address"],
+            processes=int(args["--processes"]))
     elif args["--scheduler"]:
         scheduler(args["IDENTIFIER"])
     elif args["--pause"]:
@@ -466,6 +499,10 @@ def main():
         alive()
     elif args["--info"]:
         info()
+    elif args["--explain"]:
+        explain()
+    elif args["--setup"]:
+        setup()
     elif args["--listing"]:
         listing(*args["STATE"])
     elif args["--remove"]:
@@ -36,6 +36,13 @@ from core4.queue.process import CoreWorkerProcess
 CoreWorkerProcess().start("{job_id:s}")
 """
 
+#: command used to launch a warm job interpreter with
+#: :func:`core4.queue.forkserver.serve`
+FORK_SERVER = """
+from core4.queue.forkserver import serve
+serve("{project:s}", {preload})
+"""
+
 #: command used to kill a job with :meth:`.CoreQueue._exec_kill`
 KILL = """
 from core4.queue.main import CoreQueue
@@ -544,6 +544,28 @@ class CoreIntrospector(core4.base.CoreBase, core4.queue.query.QueryMixin):
             "daemon": list(self.iter_daemon())
         }
 
+    def get_python(self, name):
+        """
+        Returns the Python interpreter of the project's virtual environment.
+        Falls back to the current interpreter if the project has no virtual
+        environment in ``config.folder.home``.
+
+        :param name: qual_name to extract project name
+        :return: path to Python executable
+        """
+        project = name.split(".")[0]
+        home = self.get_home()
+        python_path = None
+        if home is not None:
+            python_path = os.path.join(home, project, VENV_PYTHON)
+            if not os.path.exists(python_path):
+                self.logger.warning("python not found at [%s]", python_path)
+                python_path = None
+        if python_path is None:
+            python_path = sys.executable
+        self.logger.debug("python found at [%s]", python_path)
+        return python_path
+
     def exec_project(self, name, command, wait=True, comm=False, replace=False,
                      *args, **kwargs):
         """
@@ -559,20 +581,12 @@ class CoreIntrospector(core4.base.CoreBase, core4.queue.query.QueryMixin):
         :param args: to be injected using Python method ``.format``
         :param kwargs: to be injected using Python method ``.format``
 
-        :return: STDOUT if ``wait is True``, else nothing is returned
+        :return: STDOUT and STDERR if ``comm is True``, the
+                 :class:`subprocess.Popen` object if ``wait is False``, else
+                 nothing is returned
         """
-        project = name.split(".")[0]
-        home = self.get_home()
-        python_path = None
+        python_path = self.get_python(name)
         currdir = os.path.abspath(os.curdir)
-        if home is not None:
-            python_path = os.path.join(home, project, VENV_PYTHON)
-            if not os.path.exists(python_path):
-                self.logger.warning("python not found at [%s]", python_path)
-                python_path = None
-        if python_path is None:
-            python_path = sys.executable
-        self.logger.debug("python found at [%s]", python_path)
         # os.chdir(os.path.join(home, project))
         cmd = command.format(*args, **kwargs)
         if wait:
@@ -607,6 +621,8 @@ class CoreIntrospector(core4.base.CoreBase, core4.queue.query.QueryMixin):
                     stdout = "null"
                 return stdout, stderr
             proc.wait()
+            return None
+        return proc
 
     def collect_job(self):
         """
@@ -693,7 +709,9 @@ def exec_project(name, command, wait=True, comm=False, replace=False, *args,
     :param replace: replace current process (defaults to ``False``).
     :param args: to be injected using Python method ``.format``
     :param kwargs: to be injected using Python method ``.format``
-    :return: STDOUT if ``wait is True``, else nothing is returned
+    :return: STDOUT and STDERR if ``comm is True``, the
+             :class:`subprocess.Popen` object if ``wait is False``, else
+             nothing is returned
     """
     intro = CoreIntrospector()
     return intro.exec_project(name, command, wait, comm, replace, *args,
@@ -21,6 +21,37 @@ from core4.base import CoreBase
 from core4.util.tool import Singleton
 
 
+#: managed indices of ``sys.queue`` with name, key and index options
+QUEUE_INDEX = (
+    (
+        "job_args",
+        [("name", pymongo.ASCENDING), ("_hash", pymongo.ASCENDING)],
+        {"unique": True}
+    ),
+    (
+        "next_job",
+        [("state", pymongo.ASCENDING), ("force", pymongo.DESCENDING),
+         ("priority", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)],
+        {}
+    ),
+    (
+        "worker_job",
+        [("locked.worker", pymongo.ASCENDING), ("name", pymongo.ASCENDING)],
+        {"partialFilterExpression": {"locked.worker": {"$exists": True}}}
+    ),
+    (
+        "removed_job",
+        [("removed_at", pymongo.ASCENDING)],
+        {"partialFilterExpression": {"removed_at": {"$type": "date"}}}
+    ),
+    (
+        "killed_job",
+        [("killed_at", pymongo.ASCENDING), ("state", pymongo.ASCENDING)],
+        {"partialFilterExpression": {"killed_at": {"$type": "date"}}}
+    ),
+)
+
+
 def once(f):
     """
     Execute decorated methods only once.
@@ -41,7 +72,7 @@ class CoreSetup(CoreBase, metaclass=Singleton):
 
     * folders
     * users and roles
-    * collection index of ``sys.queue``
+    * collection indices of ``sys.queue``
     * collection TTL of ``sys.stdout``
     """
 
@@ -132,20 +163,58 @@ class CoreSetup(CoreBase, metaclass=Singleton):
     @once
     def make_queue(self):
         """
-        Creates collection ``sys.queue`` and its index on ``name`` and
-        ``_hash``. The ``_hash`` attribute ensures that jobs are unique with
-        regard to their :meth:`.qual_name` and job arguments.
+        Creates collection ``sys.queue`` and its managed indices as defined in
+        :data:`QUEUE_INDEX`. The ``job_args`` index on ``name`` and ``_hash``
+        ensures that jobs are unique with regard to their :meth:`.qual_name`
+        and job arguments. All other indices support the hot queries of
+        :class:`.CoreWorker`. Existing indices with a modified key
+        specification or modified options ``unique`` and
+        ``partialFilterExpression`` are reported but not touched since this
+        method runs with every queue and daemon. Use :meth:`.update_queue`
+        or ``coco --setup`` to re-create these indices.
+
+        Use ``coco --explain`` to verify the query plans.
         """
-        if "job_args" not in self.config.sys.queue.index_information():
-            self.config.sys.queue.create_index(
-                [
-                    ("name", pymongo.ASCENDING),
-                    ("_hash", pymongo.ASCENDING)
-                ],
-                unique=True,
-                name="job_args"
-            )
-            self.logger.info("created index [job_args] on [sys.queue]")
+        self._make_queue_index(recreate=False)
+
+    def update_queue(self):
+        """
+        Creates missing and re-creates modified managed indices of collection
+        ``sys.queue`` as defined in :data:`QUEUE_INDEX`. Other than
+        :meth:`.make_queue` this method drops existing indices with a
+        modified key specification or modified options ``unique`` and
+        ``partialFilterExpression``.
+        """
+        self._make_queue_index(recreate=True)
+
+    def _make_queue_index(self, recreate):
+        # internal method to create missing managed indices of sys.queue and
+        #   to either re-create or report modified indices
+        existing = self.config.sys.queue.index_information()
+        for name, key, kwargs in QUEUE_INDEX:
+            if name in existing:
+                if self._same_index(existing[name], key, kwargs):
+                    continue
+                if not recreate:
+                    self.logger.warning(
+                        "index [%s] on [sys.queue] differs from definition, "
+                        "run coco --setup to re-create", name)
+                    continue
+                self.config.sys.queue.drop_index(name)
+                self.logger.warning("dropped index [%s] on [sys.queue]", name)
+            self.config.sys.queue.create_index(key, name=name, **kwargs)
+            self.logger.info("created index [%s] on [sys.queue]", name)
+
+    @staticmethod
+    def _same_index(info, key, kwargs):
+        # internal method to compare the key specification and options of an
+        #   existing index with the managed index definition
+        if info["key"] != key:
+            return False
+        if bool(info.get("unique")) != bool(kwargs.get("unique")):
+            return False
+        return (info.get("partialFilterExpression")
+                == kwargs.get("partialFilterExpression"))
 
     @once
     def make_stdout(self):
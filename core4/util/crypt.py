@@ -10,10 +10,33 @@ Support for assymetric password encryption and decryption. Use with::
 
     hash_value = core4.util.crypt.pwd_context.hash(clear_text)
     assert core4.util.crypt.pwd_context.verify(clear_text, hash_value))
+
+Password hashing is deliberately expensive. Use :func:`get_executor` to run
+hashing and verification off the event loop.
 """
+import concurrent.futures
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(
     schemes=["pbkdf2_sha256", "des_crypt"],
     deprecated="auto",
 )
+
+#: process-wide thread pools by number of workers
+_executor = {}
+
+
+def get_executor(max_workers):
+    """
+    Returns the process-wide thread pool to hash and verify passwords. The
+    key derivation of :mod:`hashlib` releases the GIL, so password
+    verification in the pool does not block the event loop.
+
+    :param max_workers: maximum number of concurrent password hash operations
+    :return: :class:`concurrent.futures.ThreadPoolExecutor`
+    """
+    if max_workers not in _executor:
+        _executor[max_workers] = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers)
+    return _executor[max_workers]
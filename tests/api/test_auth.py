@@ -1,13 +1,19 @@
+import asyncio
+import base64
 import os
 import re
 import datetime
 import pytest
 import json
+import time
 
+import core4.api.v1.request.role.model
 import core4.queue.main
+import core4.util.crypt
 from tests.api.test_test import setup, core4api
 from core4.api.v1.tool.functool import serve
 from core4.api.v1.server import CoreApiServer
+from core4.api.v1.request.token import CoreTokenCache
 
 
 _ = setup
@@ -20,6 +26,12 @@ def short_expire(tmpdir):
     os.environ["CORE4_OPTION_api__token__refresh"] = "!!int 4"
 
 
+@pytest.fixture()
+def slide_expire(tmpdir):
+    os.environ["CORE4_OPTION_api__token__expiration"] = "!!int 8"
+    os.environ["CORE4_OPTION_api__token__refresh"] = "!!int 5"
+
+
 async def test_login(core4api):
     resp = await core4api.get(
         '/core4/api/v1/login?username=admin&password=hans')
@@ -43,6 +55,26 @@ async def test_cookie(core4api):
     assert resp.code == 200
 
 
+async def test_cookie_extended(slide_expire, core4api):
+    resp = await core4api.get(
+        '/core4/api/v1/login?username=admin&password=hans')
+    assert resp.code == 200
+    header = {"Cookie": resp.headers.get("set-cookie")}
+
+    def cookie(rv):
+        return [c for c in rv.headers.get_list("set-cookie")
+                if c.startswith("token=")]
+
+    rv = await core4api.get('/core4/api/v1/profile', headers=header)
+    assert rv.code == 200
+    assert cookie(rv) == []
+    await asyncio.sleep(3.5)
+    rv = await core4api.get('/core4/api/v1/profile', headers=header)
+    assert rv.code == 200
+    assert "token" not in rv.headers
+    assert len(cookie(rv)) == 1
+
+
 async def test_token(core4api):
     resp = await core4api.get(
         '/core4/api/v1/login?username=admin&password=hans')
@@ -52,6 +84,75 @@ async def test_token(core4api):
     assert resp.code == 200
 
 
+async def test_token_cache(core4api):
+    resp = await core4api.get(
+        '/core4/api/v1/login?username=admin&password=hans')
+    assert resp.code == 200
+    token = resp.json()["data"]["token"]
+    cache = CoreTokenCache()
+    cache.clear()
+    for _ in range(5):
+        resp = await core4api.get('/core4/api/v1/profile?token=' + token)
+        assert resp.code == 200
+    assert cache.miss == 1
+    assert cache.hit == 4
+    assert cache.hit_rate == 0.8
+    (payload,) = cache.cache.values()
+    payload["exp"] = 0
+    resp = await core4api.get('/core4/api/v1/profile?token=' + token)
+    assert resp.code == 200
+    assert cache.miss == 2
+    resp = await core4api.get('/core4/api/v1/profile?token=' + token[:-2])
+    assert resp.code != 200
+    assert len(cache.cache) == 1
+
+
+async def test_login_storm(core4api, mongodb):
+    os.environ["CORE4_OPTION_api__password__max_workers"] = "!!int 1"
+    await core4api.login()
+    token = core4api.token
+    core4api.token = None
+    doc = mongodb.sys.role.find_one({"name": "admin"})
+    t0 = time.perf_counter()
+    assert core4.util.crypt.pwd_context.verify("hans", doc["password"])
+    verify = time.perf_counter() - t0
+    basic = "Basic " + base64.b64encode(b"admin:hans").decode("utf-8")
+    latency = []
+
+    async def timed():
+        t0 = time.perf_counter()
+        rv = await core4api.get('/core4/api/v1/profile?token=' + token)
+        assert rv.code == 200
+        latency.append(time.perf_counter() - t0)
+
+    nlogin = 20
+    requests = [core4api.get('/core4/api/v1/profile',
+                             headers={"Authorization": basic})
+                for _ in range(nlogin)]
+    requests += [timed() for _ in range(nlogin)]
+    rv = await asyncio.gather(*requests)
+    assert all(r.code == 200 for r in rv[:nlogin])
+    assert max(latency) < 0.5 * nlogin * verify
+
+
+async def test_credential_cache(core4api):
+    os.environ["CORE4_OPTION_api__password__cache_ttl"] = "!!int 60"
+    basic = "Basic " + base64.b64encode(b"admin:hans").decode("utf-8")
+    core4.api.v1.request.role.model.CoreRole._credential.clear()
+    rv = await core4api.get('/core4/api/v1/profile',
+                            headers={"Authorization": basic})
+    assert rv.code == 200
+    assert len(core4.api.v1.request.role.model.CoreRole._credential) == 1
+    rv = await core4api.get('/core4/api/v1/profile',
+                            headers={"Authorization": basic})
+    assert rv.code == 200
+    wrong = "Basic " + base64.b64encode(b"admin:xxxx").decode("utf-8")
+    rv = await core4api.get('/core4/api/v1/profile',
+                            headers={"Authorization": wrong})
+    assert rv.code == 401
+    assert len(core4.api.v1.request.role.model.CoreRole._credential) == 1
+
+
 async def test_body(core4api):
     resp = await core4api.post(
         '/core4/api/v1/login', body={"username": "admin", "password": "hans"})
@@ -0,0 +1,106 @@
+import json
+
+from tornado.websocket import WebSocketClosedError
+
+import core4.api.v1.request.standard.event
+import core4.const
+from core4.api.v1.request.role.perm import CorePermMatcher
+from core4.api.v1.request.standard.event import EventHandler
+
+
+class User:
+
+    def __init__(self, name, perm, is_active=True):
+        self.name = name
+        self.is_active = is_active
+        self.perm = perm
+        self.matcher = CorePermMatcher(perm)
+        self.checked = 0
+
+    async def casc_perm(self):
+        return self.perm
+
+    async def has_api_access(self, qual_name):
+        self.checked += 1
+        return self.matcher.admin or self.matcher.has_api(qual_name)
+
+
+class RoleCache:
+    role = {}
+
+    async def find_one(self, name):
+        return self.role.get(name)
+
+
+class Waiter:
+
+    def __init__(self, user, closed=False):
+        self.user = user
+        self.closed = closed
+        self.last = None
+        self.perm_key = None
+        self.message = []
+
+    def write_message(self, message):
+        if self.closed:
+            raise WebSocketClosedError()
+        self.message.append(message)
+
+
+def summary(*name):
+    return [{"name": n, "state": "pending", "n": 1} for n in name]
+
+
+async def test_on_queue(monkeypatch):
+    admin = User("admin", [core4.const.COP])
+    user = [User("user{}".format(i), ["api://project.*"]) for i in range(3)]
+    monkeypatch.setattr(core4.api.v1.request.standard.event, "CoreRoleCache",
+                        RoleCache)
+    monkeypatch.setattr(RoleCache, "role", dict(
+        [(u.name, u) for u in [admin] + user]))
+    waiter = [Waiter(admin), Waiter(user[0]), Waiter(user[1]),
+              Waiter(user[2], closed=True), Waiter(admin)]
+    monkeypatch.setattr(EventHandler, "waiters", dict(
+        [(w, [core4.const.QUEUE_CHANNEL]) for w in waiter]))
+    monkeypatch.setattr(EventHandler, "summary", {})
+    assert EventHandler.has_interest(core4.const.QUEUE_CHANNEL)
+    assert not EventHandler.has_interest("message")
+
+    change = summary("project.Job", "other.Job", "other.Job")
+    await EventHandler.on_queue(change)
+    assert [len(w.message) for w in waiter] == [1, 1, 1, 0, 1]
+    assert len(EventHandler.summary) == 2
+    assert waiter[1].message[0] is waiter[2].message[0]
+    assert user[0].checked == 2
+    assert user[1].checked == 0
+    data = json.loads(waiter[1].message[0])["data"]
+    assert [d["name"] for d in data] == [
+        "project.Job", "UnauthorizedJob", "UnauthorizedJob"]
+    assert change[1]["name"] == "other.Job"
+    data = json.loads(waiter[0].message[0])["data"]
+    assert [d["name"] for d in data] == [
+        "project.Job", "other.Job", "other.Job"]
+
+    await EventHandler.on_queue(summary("project.Job", "other.Job",
+                                        "other.Job"))
+    assert [len(w.message) for w in waiter] == [1, 1, 1, 0, 1]
+
+    await EventHandler.on_queue(summary("project.Job", "other.Job"))
+    assert [len(w.message) for w in waiter] == [2, 2, 2, 0, 2]
+
+    await EventHandler.on_queue(summary("project.Job", "other.Test"))
+    assert [len(w.message) for w in waiter] == [3, 2, 2, 0, 3]
+
+    # role changed and revalidated by the role cache
+    RoleCache.role["user0"] = User("user0", ["api://other.*"])
+    await EventHandler.on_queue(summary("project.Job", "other.Test"))
+    assert [len(w.message) for w in waiter] == [3, 3, 2, 0, 3]
+    data = json.loads(waiter[1].message[-1])["data"]
+    assert [d["name"] for d in data] == ["UnauthorizedJob", "other.Test"]
+    assert waiter[1].user is RoleCache.role["user0"]
+
+    # inactive users receive no summary
+    RoleCache.role["user1"] = User("user1", ["api://other.*"],
+                                   is_active=False)
+    await EventHandler.on_queue(summary("other.Test"))
+    assert [len(w.message) for w in waiter] == [4, 4, 2, 0, 4]
@@ -1,6 +1,6 @@
 import pytest
 
-from core4.api.v1.application import CoreApiContainer
+from core4.api.v1.application import CoreApiContainer, CoreHandlerDirectory
 from core4.api.v1.request.main import CoreRequestHandler
 from core4.api.v1.request.static import CoreStaticFileHandler
 from core4.api.v1.server import CoreApiServer
@@ -74,6 +74,20 @@ async def test_simple(info_server):
         assert rv.code == 404
 
 
+async def test_stale_directory(info_server, mongodb):
+    await info_server.login()
+    handler = await get_info(info_server, "SimpleHandler")
+    url = "/test/_info/help/" + handler[0]["rsc_id"]
+    directory = CoreHandlerDirectory()
+    directory.handler = []
+    rv = await info_server.get(url)
+    assert rv.code == 200
+    mongodb.sys.handler.delete_many({})
+    await directory.refresh()
+    rv = await info_server.get(url)
+    assert rv.code == 404
+
+
 async def get_info(server, qn, key="qual_name"):
     rv = await server.get("/core4/api/v1/_info")
     assert rv.code == 200
@@ -139,4 +153,41 @@ async def test_version_info(info_server):
     ep = rv1.json()["data"]
     t = 'core4.api.v1.request.standard.login.LoginHandler'
     v = [i for i in ep if i["qual_name"] == t][0]
-    assert v["version"] == core4.__version__
\ No newline at end of file
+    assert v["version"] == core4.__version__
+
+class ReverseHandler(CoreRequestHandler):
+
+    async def get(self, key):
+        self.reply(await self.reverse_url("reverse", "abc"))
+
+
+class ReverseServer(CoreApiContainer):
+    root = "/reverse"
+    rules = [
+        (r"/item/(.+)", ReverseHandler, None, "reverse"),
+    ]
+
+
+@pytest.fixture()
+def reverse_server():
+    yield from run(
+        ReverseServer,
+        CoreApiServer
+    )
+
+
+async def test_reverse_url(reverse_server, mongodb):
+    await reverse_server.login()
+    rv = await reverse_server.get("/reverse/item/xyz")
+    assert rv.code == 200
+    assert rv.json()["data"].endswith("/reverse/item/abc")
+    directory = CoreHandlerDirectory()
+    assert directory.timestamp is not None
+    mongodb.sys.handler.delete_many({})
+    rv = await reverse_server.get("/reverse/item/xyz")
+    assert rv.code == 200
+    assert rv.json()["data"].endswith("/reverse/item/abc")
+    await directory.refresh()
+    assert await directory.reverse("reverse") is None
+    rv = await reverse_server.get("/reverse/item/xyz")
+    assert rv.code == 500
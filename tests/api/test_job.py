@@ -1,15 +1,21 @@
+import asyncio
 import json
+import os
 import threading
 
+import pymongo.errors
 import pytest
 import time
 from bson.objectid import ObjectId
 
 import core4.api.v1.request.role.field
 import core4.queue.helper.job.example
+import core4.queue.job
 import core4.queue.main
 import core4.util.crypt
 from core4.api.v1.request.queue.job import JobStream
+from core4.api.v1.request.queue.watch import (
+    CoreJobWatch, JobSubscription, UNSET, apply)
 from core4.api.v1.request.role.main import CoreRole
 from core4.api.v1.server import CoreApiServer, CoreApiContainer
 from tests.api.test_test import setup, mongodb, core4api, run
@@ -73,6 +79,26 @@ async def test_post(core4api, worker):
                "name"] == "core4.queue.helper.job.example.DummyJob"
 
 
+async def test_post_many(core4api):
+    await core4api.login()
+    data = {
+        "name": "core4.queue.helper.job.example.DummyJob",
+        "args": [{"i": 1}, {"i": 2, "priority": 5}, {"i": 1}]
+    }
+    resp = await core4api.post('/core4/api/v1/jobs/enqueue_many', json=data)
+    assert resp.code == 200
+    ret = resp.json()["data"]
+    assert len(ret) == 3
+    assert ret[0]["_id"] is not None
+    assert ret[1]["_id"] is not None
+    assert ret[2]["_id"] is None
+    assert "exists" in ret[2]["error"]
+    queue = core4.queue.main.CoreQueue()
+    job = queue.find_job(ObjectId(ret[1]["_id"]))
+    assert job.priority == 5
+    assert job.args == {"i": 2}
+
+
 class MyJob(core4.queue.helper.job.example.DummyJob):
     author = "mra"
 
@@ -110,6 +136,85 @@ async def test_poll(core4api, worker):
     assert event[-1]["data"] == {}
 
 
+async def test_poll_many(core4api, worker):
+    worker.start()
+    await core4api.login()
+    resp = await core4api.post('/core4/api/v1/jobs/enqueue', json={
+        "name": "tests.api.test_job.MyJob"})
+    assert resp.code == 200
+    _id = resp.json()["data"]["_id"]
+    resp = await asyncio.gather(
+        *[core4api.get('/core4/api/v1/jobs/poll/' + _id) for _ in range(5)])
+    worker.wait_queue()
+    for rv in resp:
+        assert rv.code == 200
+        body = rv.body.decode("utf-8")
+        assert body.count("event: log") >= 50
+        assert body.endswith("event: close\ndata: {}\n\n")
+    assert CoreJobWatch().subscriber == {}
+
+
+async def test_job_subscription():
+    doc = {"state": "running", "prog": {"value": 0.1}}
+    assert apply(doc, {"prog.value": 0.2, "locked.heartbeat": 1})
+    assert doc == {"state": "running", "prog": {"value": 0.2},
+                   "locked": {"heartbeat": 1}}
+    assert apply(doc, {"prog.value": 0.2}) is False
+    assert apply(doc, {"locked": UNSET})
+    assert "locked" not in doc
+    assert apply({"args": [1]}, {"args.0": 2}) is None
+
+    subscription = JobSubscription(ObjectId(), 0.5)
+    subscription.push({"prog.value": 0.1})
+    assert await subscription.get() == (False, {"prog.value": 0.1})
+    t0 = time.monotonic()
+    for i in range(10):
+        subscription.push({"prog.value": i / 10})
+    assert await subscription.get() == (False, {"prog.value": 0.9})
+    assert time.monotonic() - t0 >= 0.4
+    t0 = time.monotonic()
+    subscription.push({"state": "complete"})
+    assert await subscription.get() == (False, {"state": "complete"})
+    assert time.monotonic() - t0 < 0.4
+    subscription.push({"prog.value": 1.})
+    subscription.push()
+    subscription.push({"state": "error"})
+    assert await subscription.get() == (True, {})
+
+
+async def test_watch_fallback(core4api, monkeypatch):
+    os.environ["CORE4_OPTION_api__job_stream__change_stream"] = "!!bool True"
+    os.environ["CORE4_OPTION_api__job_stream__interval"] = "!!float 0.1"
+    opened = []
+
+    def _stream(self, name):
+        opened.append(name)
+        raise pymongo.errors.OperationFailure(
+            "The $changeStream stage is only supported on replica sets")
+
+    monkeypatch.setattr(CoreJobWatch, "_stream", _stream)
+    queue = core4.queue.main.CoreQueue()
+    job = queue.enqueue(core4.queue.helper.job.example.DummyJob)
+    watch = CoreJobWatch()
+    subscription = watch.subscribe(job._id)
+    await asyncio.sleep(0.5)
+    assert set(opened) == {"queue", "journal"}
+    assert not watch._streaming()
+    assert watch.poller is not None and not watch.poller.done()
+    await subscription.get()
+    job.config.sys.queue.update_one(
+        {"_id": job._id}, {"$set": {"prog.value": 0.5}})
+    await asyncio.wait_for(subscription.event.wait(), 2)
+    (reload, delta) = await subscription.get()
+    assert delta["prog"]["value"] == 0.5
+    task = list(watch.watcher.values())
+    watch.unsubscribe(subscription)
+    await asyncio.sleep(0.3)
+    assert watch.poller.done()
+    assert watch.watcher == {}
+    assert all(t.done() for t in task)
+
+
 class MyJobHandler(JobStream):
     author = "mra"
     title = "job enqueue"
@@ -156,6 +261,42 @@ async def test_enqueue_permission(core4api, worker):
     assert resp.code == 200
 
 
+class ListingJob(core4.queue.job.CoreJob):
+    author = "mra"
+
+
+async def test_listing_permission(core4api):
+    queue = core4.queue.main.CoreQueue()
+    for i in range(15):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i)
+        queue.enqueue(ListingJob, i=i)
+    await CoreRole(
+        name="mra",
+        realname="Michael Rau",
+        is_active=True,
+        email="m.rau@plan-net.com",
+        password="hello world",
+        perm=[
+            "job://core4.queue.helper.job.example.DummyJob/r",
+            "api://core4.api.v1.request.queue.*",
+        ]
+    ).save()
+    await core4api.login()
+    resp = await core4api.get('/core4/api/v1/jobs?per_page=10')
+    assert resp.code == 200
+    assert resp.json()["total_count"] == 30
+    await core4api.login("mra", "hello world")
+    resp = await core4api.get('/core4/api/v1/jobs?per_page=10&page=1')
+    assert resp.code == 200
+    assert resp.json()["total_count"] == 15
+    assert resp.json()["page_count"] == 2
+    assert resp.json()["count"] == 5
+    assert set(d["name"] for d in resp.json()["data"]) == {
+        "core4.queue.helper.job.example.DummyJob"}
+    assert [d["args"]["i"] for d in resp.json()["data"]] == list(
+        range(10, 15))
+
+
 class MyCoreApiServer(CoreApiContainer):
     root = "/another"
     rules = [
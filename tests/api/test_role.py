@@ -1,7 +1,10 @@
 import pytest
+from bson.objectid import ObjectId
 
 import core4.api.v1.request.role.field
 from core4.api.v1.request.role.main import CoreRole
+from core4.api.v1.request.role.model import CoreRoleCache
+from core4.api.v1.request.role.perm import CorePermMatcher
 from tests.api.test_test import setup, mongodb, core4api
 
 _ = setup
@@ -67,6 +70,34 @@ def test_perm_validate():
     p.validate_value()
 
 
+def test_perm_matcher():
+    matcher = CorePermMatcher([
+        "api://core4.api.v1.request.standard.*",
+        "api://project.api.info",
+        "job://core4.queue.helper.*/x",
+        "job://project.job.Read.*/r",
+        "app://client/customer/one",
+        "mongodb://core4test"
+    ])
+    assert not matcher.admin
+    assert matcher.has_api("core4.api.v1.request.standard.login.LoginHandler")
+    assert matcher.has_api("project.api.info")
+    assert not matcher.has_api("project.api")
+    assert not matcher.has_api("core4.queue.helper.job.example.DummyJob")
+    assert matcher.has_job("core4.queue.helper.job.example.DummyJob",
+                           ("x", "r"))
+    assert matcher.has_job("core4.queue.helper.job.example.DummyJob", "x")
+    assert matcher.has_job("project.job.ReadJob", ("x", "r"))
+    assert not matcher.has_job("project.job.ReadJob", "x")
+    assert not matcher.has_job("project.job.WriteJob", ("x", "r"))
+    assert matcher.has_client("customer/one")
+    assert not matcher.has_client("customer")
+    assert len(matcher.memo) == 9
+    assert matcher.has_job("project.job.ReadJob", ("x", "r"))
+    assert len(matcher.memo) == 9
+    assert CorePermMatcher(["cop"]).admin
+
+
 def test_has_mail():
     role = CoreRole(
         name="mra",
@@ -599,6 +630,37 @@ async def test_access(core4api):
     assert rv.code == 200
 
 
+async def test_role_cache(core4api, mongodb):
+    await core4api.login()
+    data = {
+        "name": "user",
+        "realname": "test role1",
+        "email": "user@mail.com",
+        "passwd": "123456",
+        "perm": ["api://core4.api.v1.request.standard"]
+    }
+    rv = await core4api.post("/core4/api/v1/roles", body=data)
+    assert rv.code == 200
+    cache = CoreRoleCache()
+    user1 = await cache.find_one("user")
+    assert await user1.casc_perm() == ["api://core4.api.v1.request.standard"]
+    assert await cache.find_one("user") is user1
+    mongodb.sys.role.update_one(
+        {"name": "user"}, {"$set": {"etag": ObjectId(), "perm": []}})
+    assert await cache.find_one("user") is user1
+    cache.cache["user"]["timestamp"] -= 3600
+    user2 = await cache.find_one("user")
+    assert user2 is not user1
+    assert await user2.casc_perm() == []
+    cache.cache["user"]["timestamp"] -= 3600
+    assert await cache.find_one("user") is user2
+    rv = await core4api.delete(
+        "/core4/api/v1/roles/{}?etag={}".format(user2._id, user2.etag))
+    assert rv.code == 200
+    assert cache.cache == {}
+    assert await cache.find_one("user") is None
+
+
 async def test_update(core4api):
     await core4api.login()
     data = {
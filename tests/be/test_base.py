@@ -1,16 +1,21 @@
 import logging
+import multiprocessing
 import os
 import re
 import sys
+import threading
 
 import pymongo
 import pytest
 
 import core4.base
 import core4.base.collection
+import core4.base.main
 import core4.config
+import core4.config.main
 import core4.config.tag
 import core4.error
+import core4.logger.handler
 import core4.service.setup
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -279,6 +284,94 @@ def test_unwind_config(mongodb):
     assert 2 == sum([1 for i in data if i["level"] == "ERROR"])
 
 
+def test_config_snapshot():
+    a = core4.base.CoreBase()
+    b = core4.base.CoreBase()
+    assert a.config._config is b.config._config
+    os.environ["CORE4_OPTION_folder__temp"] = "temp2"
+    c = core4.base.CoreBase()
+    assert c.config._config is not a.config._config
+    assert c.config.folder.temp == "temp2"
+    assert a.config.folder.temp == "temp"
+
+    class B(core4.base.CoreBase):
+        pass
+
+    class C(core4.base.CoreBase):
+        pass
+
+    n = len(core4.config.main.CoreConfig._snapshot)
+    d = B()
+    assert d.config._config is not c.config._config
+    assert d.config.tests.be.test_base.B.log_level is None
+    e = C()
+    assert e.config.tests.be.test_base.C.log_level is None
+    assert "C" not in d.config.tests.be.test_base
+    # one shared snapshot, sections without class overlay are shared
+    assert len(core4.config.main.CoreConfig._snapshot) == n
+    assert d.config._config["sys"] is c.config._config["sys"]
+    assert e.config._config["sys"] is c.config._config["sys"]
+    assert d.config.sys.role.connect_async() is not d.config.sys.role.connect()
+
+
+def test_fork_connection():
+    a = core4.base.CoreBase()
+    coll = a.config.sys.log.connect()
+    client = coll.connection
+    handle = coll.handle
+    handler = core4.logger.handler.MongoLoggingHandler(coll)
+    collection = handler.collection
+    assert coll.connection is client
+    ctx = multiprocessing.get_context("fork")
+    result = ctx.Queue()
+
+    def run():
+        result.put((coll.connection is not client,
+                    coll.handle is not handle,
+                    coll.handle.database.client is coll.connection,
+                    handler.collection is not collection,
+                    a.config.sys.log.connect().connection is not client))
+
+    proc = ctx.Process(target=run)
+    proc.start()
+    proc.join()
+    assert result.get(timeout=5) == (True, True, True, True, True)
+    assert coll.connection is client
+
+
+def test_context_identifier():
+    token = core4.base.main.set_identifier("0815")
+    a = core4.base.CoreBase()
+    assert a.identifier == "0815"
+    result = {}
+
+    def run():
+        result["b"] = core4.base.CoreBase().identifier
+
+    t = threading.Thread(target=run)
+    t.start()
+    t.join()
+    assert result["b"] is None
+    core4.base.main.reset_identifier(token)
+    assert core4.base.CoreBase().identifier is None
+
+
+def test_inspect_identifier():
+
+    class A(core4.base.CoreBase):
+
+        def create(self):
+            return core4.base.CoreBase()
+
+    a = A()
+    a.identifier = "0815"
+    assert a.create().identifier is None
+    os.environ["CORE4_OPTION_base__inspect_identifier"] = "!!bool True"
+    a = A()
+    a.identifier = "0815"
+    assert a.create().identifier == "0815"
+
+
 def test_message_format():
     b = core4.base.CoreBase()
     assert b.format_args() == ""
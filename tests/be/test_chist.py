@@ -145,3 +145,27 @@ def test_main():
 
     with pytest.raises(SystemExit):
         build_query({"--level": "x"}, clock=clock)
+
+
+def test_follow():
+    import pymongo
+    from core4.logger.tail import follow
+    db = pymongo.MongoClient(MONGO_URL)[MONGO_DATABASE]
+    db.drop_collection("tail")
+    db.create_collection("tail", capped=True, size=1000000)
+    coll = db["tail"]
+    coll.insert_many([{"identifier": "a", "i": i} for i in range(3)])
+    coll.insert_one({"identifier": "b", "i": 3})
+    gen = follow(coll, [{"identifier": "a"}])
+    assert [next(gen)["i"] for _ in range(3)] == [0, 1, 2]
+    coll.insert_one({"identifier": "a", "i": 4})
+    assert next(gen)["i"] == 4
+    gen.close()
+    offset = coll.find_one({"i": 1})["_id"]
+    gen = follow(coll, [{"identifier": "a"}], offset=offset)
+    assert [next(gen)["i"] for _ in range(2)] == [2, 4]
+    coll.insert_many([{"identifier": "b", "i": 5},
+                      {"identifier": "a", "i": 6},
+                      {"identifier": "a", "i": 7}])
+    assert [next(gen)["i"] for _ in range(2)] == [6, 7]
+    gen.close()
@@ -8,6 +8,7 @@ import pymongo
 import pymongo.errors
 
 import core4.config
+import core4.config.map
 import core4.config.test
 import core4.error
 import tests.be.util
@@ -512,6 +513,23 @@ class TestConfig(unittest.TestCase):
         conf.sys.log.insert_one({})
         self.assertEqual(1, conf.sys.log.count_documents({}))
 
+    def test_resolved(self):
+        extra = tests.be.util.asset("config/empty.yaml")
+        local = tests.be.util.asset("config/local1.yaml")
+        conf = MyConfig(project_config=("test", extra), config_file=local)
+        self.assertIs(conf.logging, conf["logging"])
+        self.assertIn("logging", conf.__dict__)
+        self.assertIs(conf.logging.stderr, conf["logging"]["stderr"])
+        self.assertIn("stderr", conf.logging.__dict__)
+        self.assertIs(conf.sys.log.handle, conf.sys.log.handle)
+        conf.sys.log.insert_one({})
+        self.assertEqual(1, conf.sys.log.count_documents({}))
+        self.assertRaises(core4.error.Core4ConfigurationError,
+                          conf.logging.update, {"stderr": None})
+        conf._config_cache = core4.config.map.ConfigMap({"logging": {}})
+        self.assertNotIn("logging", conf.__dict__)
+        self.assertEqual(conf.logging, {})
+
     def test_extra_no_project(self):
         extra = tests.be.util.asset("config/extra1.yaml")
         os.environ["CORE4_CONFIG"] = tests.be.util.asset("config/empty.yaml")
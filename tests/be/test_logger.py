@@ -3,6 +3,7 @@ import importlib
 import logging
 import os
 import sys
+import time
 import unittest
 
 import pymongo
@@ -14,6 +15,8 @@ import core4.config
 import core4.config.test
 import core4.error
 import core4.logger
+import core4.logger.exception
+import core4.logger.handler
 import core4.util
 import core4.util.tool
 import project.ident
@@ -170,6 +173,7 @@ class TestLogging(unittest.TestCase):
         os.environ["CORE4_OPTION_logging__mongodb"] = "DEBUG"
         os.environ["CORE4_OPTION_logging__stderr"] = ""
         os.environ["CORE4_OPTION_logging__stdout"] = ""
+        os.environ["CORE4_OPTION_base__inspect_identifier"] = "!!bool True"
         LogOn()
         m = project.ident.Massive()
         m.execute()
@@ -414,6 +418,65 @@ class TestLogging(unittest.TestCase):
         assert mongo["core4test"]["sys.log"].count_documents({}) > 0
 
 
+    def test_queue(self):
+        os.environ["CORE4_CONFIG"] = tests.be.util.asset("logger/simple.yaml")
+        os.environ["CORE4_OPTION_logging__queue__maxsize"] = "!!int 1000"
+        b = LogOn()
+        (handler,) = [h for h in logging.getLogger("core4").handlers
+                      if isinstance(h, core4.logger.handler.MongoLoggingHandler)]
+        for i in range(100):
+            b.logger.info("this is INFO %d", i)
+        handler.flush()
+        coll = self.mongo.core4test.sys.log
+        self.assertEqual(100, coll.count_documents({"level": "INFO"}))
+        b.logger.critical("this is CRITICAL")
+        self.assertEqual(1, coll.count_documents({"level": "CRITICAL"}))
+        self.assertEqual(0, handler.dropped)
+        self.assertEqual(coll.count_documents({}), handler.written)
+        logging.shutdown()
+        self.assertFalse(handler.thread)
+
+    def test_queue_drop(self):
+
+        class Slow:
+            def insert_many(self, docs, ordered=True):
+                time.sleep(0.5)
+
+        handler = core4.logger.handler.MongoLoggingHandler(
+            Slow(), maxsize=2, batch=1, interval=0.01)
+        for i in range(10):
+            handler.handle(logging.makeLogRecord(
+                {"msg": "record %d" % i, "levelno": logging.INFO,
+                 "levelname": "INFO"}))
+        self.assertGreater(handler.dropped, 0)
+        handler.close()
+        self.assertEqual(10, handler.written + handler.dropped)
+
+    def test_exception_lazy(self):
+
+        class Target:
+            docs = []
+
+            def insert_many(self, docs):
+                self.docs.append(docs)
+
+        target = Target()
+        handler = core4.logger.exception.CoreExceptionHandler(
+            level="INFO", size=3, target=target)
+        for i in range(5):
+            handler.emit(logging.makeLogRecord(
+                {"msg": "record %d", "args": (i,), "levelno": logging.DEBUG,
+                 "levelname": "DEBUG"}))
+        self.assertTrue(all(isinstance(r, logging.LogRecord)
+                            for r in handler.queue))
+        handler.emit(logging.makeLogRecord(
+            {"msg": "critical", "levelno": logging.CRITICAL,
+             "levelname": "CRITICAL"}))
+        self.assertEqual(1, len(target.docs))
+        self.assertEqual(["record 2", "record 3", "record 4"],
+                         [d["message"] for d in target.docs[0]])
+        self.assertEqual(0, len(handler.queue))
+
     def test_event(self):
         base = core4.base.CoreBase()
         base.trigger("test")
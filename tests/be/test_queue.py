@@ -3,6 +3,7 @@
 import logging
 import os
 import signal
+import time
 import pymongo
 import pytest
 
@@ -17,6 +18,7 @@ import core4.queue.helper.job
 import core4.queue.helper.job.example
 import core4.queue.job
 import core4.queue.main
+import core4.queue.query
 import core4.service.setup
 
 ASSET_FOLDER = '../asset'
@@ -185,3 +187,98 @@ def test_project_maintenance():
     assert not q.maintenance('project1')
 
 
+
+
+def test_queue_count_snapshot():
+    q = core4.queue.main.CoreQueue()
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=1)
+    assert q.get_queue_count(max_age=60) == {"pending": 1}
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=2)
+    assert q.get_queue_count(max_age=60) == {"pending": 1}
+    assert q.get_queue_count() == {"pending": 2}
+    assert q.get_queue_count(max_age=60) == {"pending": 2}
+
+
+def test_queue_state(monkeypatch):
+    q = core4.queue.main.CoreQueue()
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=1)
+    assert q.get_queue_count(max_age=60) == {"pending": 1}
+    state = q.queue_state()
+    assert q.config.sys.queue.info_url in state["count"]
+    assert q.queue_state() is state
+    pid = os.getpid()
+    monkeypatch.setattr(os, "getpid", lambda: pid + 1)
+    assert q.queue_state() == {"count": {}, "trailing": set()}
+    monkeypatch.undo()
+    core4.util.tool.Singleton._instances = {}
+    assert core4.queue.main.CoreQueue().queue_state()["count"] == {}
+
+
+def test_enqueue_many():
+    q = core4.queue.main.CoreQueue()
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=2)
+    ret = q.enqueue_many(core4.queue.helper.job.example.DummyJob,
+                         [{"i": 1}, {"i": 2}, {"i": 3, "priority": 5}, {}])
+    assert isinstance(ret[1], core4.error.CoreJobExists)
+    assert [j.args for j in ret if not isinstance(j, Exception)] == [
+        {"i": 1}, {"i": 3}, {}]
+    assert ret[2].priority == 5
+    assert ret[0].priority == 0
+    assert q.config.sys.queue.count_documents({}) == 4
+    doc = q.config.sys.queue.find_one({"_id": ret[2]._id})
+    assert doc["_hash"] == core4.queue.helper.job.example.DummyJob(
+        i=3).make_hash()
+    assert doc["state"] == "pending"
+    assert doc["priority"] == 5
+    assert q.enqueue_many(core4.queue.helper.job.example.DummyJob, []) == []
+
+
+def test_move_journal():
+    q = core4.queue.main.CoreQueue()
+    ret = q.enqueue_many(core4.queue.helper.job.example.DummyJob,
+                         [{"i": i} for i in range(3)])
+    docs = list(q.config.sys.queue.find(sort=[("_id", 1)]))
+    q.config.sys.journal.insert_one(docs[1])
+    moved = q.move_journal(docs)
+    assert moved == [ret[0]._id, ret[2]._id]
+    assert q.config.sys.journal.count_documents({}) == 3
+    assert [d["_id"] for d in q.config.sys.queue.find()] == [ret[1]._id]
+    assert q.move_journal([]) == []
+
+
+def test_queue_count_flush():
+    os.environ["CORE4_OPTION_event__queue_count_interval"] = "!!float 0.5"
+    os.environ["CORE4_OPTION_event__write_concern"] = "!!int 1"
+    q = core4.queue.main.CoreQueue()
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=1)
+    assert q.get_queue_reuse(q.config.sys.queue) is None
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=2)
+    assert q.get_queue_reuse(q.config.sys.queue) is not None
+    q.flush_stat()
+    assert q.config.sys.event.count_documents({"name": "queue_count"}) == 0
+    time.sleep(0.5)
+    q.flush_stat()
+    assert q.get_queue_reuse(q.config.sys.queue) is None
+    q.enqueue(core4.queue.helper.job.example.DummyJob, i=3)
+    q.make_stat("complete_job", None)
+    doc = list(q.config.sys.event.find(
+        {"channel": "queue"}, sort=[("_id", 1)]))
+    assert [(d["name"], d["data"]["queue"]) for d in doc] == [
+        ("enqueue_job", {"pending": 1}),
+        ("enqueue_job", {"pending": 1}),
+        ("queue_count", {"pending": 2}),
+        ("enqueue_job", {"pending": 2}),
+        ("complete_job", {"pending": 3})
+    ]
+
+
+def test_enqueue_many_event(monkeypatch):
+    os.environ["CORE4_OPTION_event__write_concern"] = "!!int 1"
+    monkeypatch.setattr(core4.queue.main, "MAX_EVENT_ID", 2)
+    q = core4.queue.main.CoreQueue()
+    ret = q.enqueue_many(core4.queue.helper.job.example.DummyJob,
+                         [{"i": i} for i in range(5)])
+    doc = q.config.sys.event.find_one({"name": "enqueue_many"})
+    assert doc["data"]["n"] == 5
+    assert doc["data"]["_id"] == [str(ret[0]._id), str(ret[1]._id)]
+    assert doc["data"]["queue"] == {"pending": 5}
@@ -10,6 +10,7 @@ import time
 
 import core4.logger.mixin
 import core4.queue.job
+import core4.service.introspect.main
 import core4.util
 import core4.util.tool
 from core4.queue.main import CoreQueue
@@ -232,6 +233,58 @@ def test_gap(mongodb):
             {'name': re.compile(e)}) == c
 
 
+def test_catch_up_once(mongodb):
+    s = CoreScheduler()
+    s.startup()
+    s.at = datetime.datetime(2018, 1, 1, 0, 0, 0)
+    s.run_step()
+    s.at = datetime.datetime(2018, 1, 1, 0, 30, 0)
+    assert s.run_step() == 5
+    for _ in range(5):
+        mongodb.core4test.sys.queue.delete_many({})
+        assert s.run_step() == 0
+
+
+def test_catch_up_all(mongodb):
+    os.environ["CORE4_OPTION_scheduler__catch_up"] = "all"
+    s = CoreScheduler()
+    s.startup()
+    s.at = datetime.datetime(2018, 1, 1, 0, 0, 0)
+    s.run_step()
+    s.at = datetime.datetime(2018, 1, 1, 0, 30, 0)
+    enqueued = {}
+    for _ in range(35):
+        s.run_step()
+        for job in mongodb.core4test.sys.queue.find(projection=["name"]):
+            enqueued.setdefault(job["name"].split(".")[-1], []).append(1)
+        mongodb.core4test.sys.queue.delete_many({})
+    assert len(enqueued["ValidSchedule1"]) == 1
+    assert len(enqueued["ValidSchedule3"]) == 1
+    assert len(enqueued["ValidSchedule2"]) == 1
+    assert len(enqueued["ValidSchedule4"]) == 30
+    assert len(enqueued["GapJob1"]) == 2
+    assert "GapJob2" not in enqueued
+
+
+def test_catch_up_retry(mongodb):
+    os.environ["CORE4_OPTION_scheduler__catch_up"] = "all"
+    s = CoreScheduler()
+    s.startup()
+    s.job = {"tests.be.test_scheduler.ValidSchedule4": {
+        "schedule": "* * * * *"}}
+    s.at = datetime.datetime(2018, 1, 1, 0, 0, 0)
+    s.run_step()
+    s.at = datetime.datetime(2018, 1, 1, 0, 3, 0)
+    assert s.run_step() == 1
+    assert s.run_step() == 0
+    mongodb.core4test.sys.queue.delete_many({})
+    assert s.run_step() == 1
+    mongodb.core4test.sys.queue.delete_many({})
+    assert s.run_step() == 1
+    mongodb.core4test.sys.queue.delete_many({})
+    assert s.run_step() == 0
+
+
 class ValidSchedule3(InvalidSchedule):
     author = "mra"
     schedule = "28 * * * *"
@@ -242,6 +295,46 @@ class ValidSchedule4(InvalidSchedule):
     schedule = "* * * * *"
 
 
+def test_enqueue_failure(mongodb, monkeypatch):
+    s = CoreScheduler()
+    s.startup()
+    s.at = datetime.datetime(2018, 1, 1, 0, 0, 0)
+    s.run_step()
+
+    def failure(*args, **kwargs):
+        raise pymongo.errors.AutoReconnect("down")
+
+    monkeypatch.setattr(s.queue, "enqueue_jobs", failure)
+    s.at = datetime.datetime(2018, 1, 1, 0, 30, 0)
+    assert s.run_step() == 0
+    doc = mongodb.core4test.sys.job.find_one({"_id": "__schedule__"})
+    assert doc["schedule_at"] == datetime.datetime(2018, 1, 1, 0, 0, 0)
+    monkeypatch.undo()
+    s.at += datetime.timedelta(seconds=1)
+    assert s.run_step() == 5
+    doc = mongodb.core4test.sys.job.find_one({"_id": "__schedule__"})
+    assert doc["schedule_at"] == s.at
+
+
+def test_reload(mongodb, monkeypatch):
+    s = CoreScheduler()
+    s.startup()
+    s.at = datetime.datetime(2018, 1, 1, 0, 0, 0)
+    s.run_step()
+    job = dict(s.job)
+    name = "tests.be.test_scheduler.ValidSchedule1"
+    job[name] = dict(job[name], schedule="45 0 * * *")
+    monkeypatch.setattr(
+        core4.service.introspect.main.CoreIntrospector, "collect_job",
+        lambda self: job)
+    s.reload_at = 0
+    s.at = datetime.datetime(2018, 1, 1, 0, 30, 0)
+    assert s.run_step() == 4
+    assert mongodb.core4test.sys.queue.count_documents({"name": name}) == 0
+    assert s.cron[name]["schedule"] == "45 0 * * *"
+    assert s.reload_at > time.monotonic()
+
+
 @pytest.mark.timeout(30)
 def test_loop(queue, scheduler):
     scheduler.start()
@@ -11,6 +11,7 @@ import core4.config
 import core4.config.tag
 import core4.error
 import core4.logger.mixin
+import core4.queue.main
 import core4.service.setup
 import core4.service.setup
 import core4.util
@@ -86,3 +87,42 @@ def test_make_queue2():
     setup.make_folder()
     for f in ["transfer", "proc", "arch", "temp"]:
         assert os.path.exists(os.path.join(setup.config.folder.root, f))
+
+
+def test_make_queue_index():
+    setup = core4.service.setup.CoreSetup()
+    setup.make_queue()
+    index = setup.config.sys.queue.index_information()
+    for name, key, _ in core4.service.setup.QUEUE_INDEX:
+        assert name in index
+        assert index[name]["key"] == list(key)
+
+
+def test_make_queue_index_options():
+    setup = core4.service.setup.CoreSetup()
+    setup.config.sys.queue.create_index(
+        [("locked.worker", 1), ("name", 1)], name="worker_job")
+    setup.config.sys.queue.create_index(
+        [("name", 1), ("_hash", 1)], name="job_args")
+    setup.make_queue()
+    index = setup.config.sys.queue.index_information()
+    assert "partialFilterExpression" not in index["worker_job"]
+    assert not index["job_args"].get("unique")
+    assert "next_job" in index
+    setup.update_queue()
+    index = setup.config.sys.queue.index_information()
+    assert index["worker_job"]["partialFilterExpression"] == {
+        "locked.worker": {"$exists": True}}
+    assert index["job_args"]["unique"]
+    setup.update_queue()
+    assert setup.config.sys.queue.index_information() == index
+
+
+def test_explain_queue():
+    setup = core4.service.setup.CoreSetup()
+    setup.make_queue()
+    queue = core4.queue.main.CoreQueue()
+    for doc in queue.explain_queue():
+        assert not doc["collscan"], doc["query"]
+        if doc["query"] == "max_parallel":
+            assert doc["index"] == ["worker_job"]
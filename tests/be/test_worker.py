@@ -4,6 +4,7 @@ import ctypes
 import datetime
 import os
 import signal
+import subprocess
 import sys
 import threading
 import time
@@ -14,6 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
 import core4.base.main
 import core4.logger.mixin
+import core4.queue.forkserver
 import core4.queue.helper
 import core4.queue.helper.job
 import core4.queue.helper.job.example
@@ -253,7 +255,8 @@ def test_maintenance():
     t.join()
     del worker.cycle["total"]
     assert worker.cycle == {
-        'collect_stats': 0, 'work_jobs': 0, 'flag_jobs': 0, 'remove_jobs': 0}
+        'collect_stats': 0, 'work_jobs': 0, 'supervise_jobs': 0,
+        'flag_jobs': 0, 'remove_jobs': 0}
 
 
 @pytest.mark.timeout(120)
@@ -300,6 +303,23 @@ def test_offset():
     assert enqueued_id[0:len(dequeued_id)] == dequeued_id
 
 
+def test_offset_force():
+    queue = core4.queue.main.CoreQueue()
+    enqueued_id = []
+    for i in range(0, 3):
+        enqueued_id.append(queue.enqueue(
+            core4.queue.helper.job.example.DummyJob, i=i)._id)
+    queue.config.sys.queue.update_many({}, {"$set": {"force": False}})
+    queue.config.sys.queue.update_one(
+        {"_id": enqueued_id[0]}, {"$set": {"force": True}})
+    worker = core4.queue.worker.CoreWorker()
+    worker.offset = (False, 0, enqueued_id[1])
+    assert worker.get_next_job()["_id"] == enqueued_id[0]
+    assert worker.get_next_job()["_id"] == enqueued_id[1]
+    assert worker.get_next_job()["_id"] == enqueued_id[2]
+    assert worker.get_next_job() is None
+
+
 def test_lock():
     queue = core4.queue.main.CoreQueue()
     worker = core4.queue.worker.CoreWorker()
@@ -309,6 +329,82 @@ def test_lock():
     assert queue.lock_job(job["_id"], worker.identifier) is False
 
 
+def test_claim():
+    queue = core4.queue.main.CoreQueue()
+    for i in range(0, 6):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i)
+    w1 = core4.queue.worker.CoreWorker(name="worker-1")
+    w2 = core4.queue.worker.CoreWorker(name="worker-2")
+    w1.at = w2.at = core4.util.node.mongo_now()
+    claimed = []
+    for _ in range(3):
+        for w in (w1, w2):
+            doc = w.get_next_job()
+            assert doc["state"] == "pending"
+            claimed.append(doc["_id"])
+    assert len(set(claimed)) == 6
+    assert w1.get_next_job() is None
+    assert queue.config.sys.queue.count_documents(
+        {"state": "running", "trial": 1}) == 6
+    assert queue.config.sys.queue.count_documents(
+        {"locked.worker": "worker-1"}) == 3
+    assert queue.config.sys.lock.count_documents({}) == 6
+
+
+def test_claim_max_parallel():
+    queue = core4.queue.main.CoreQueue()
+    for i in range(0, 3):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i,
+                      max_parallel=2)
+    worker = core4.queue.worker.CoreWorker()
+    worker.at = core4.util.node.mongo_now()
+    assert worker.get_next_job() is not None
+    assert worker.get_next_job() is not None
+    assert worker.get_next_job() is None
+
+
+def test_claim_slot():
+    queue = core4.queue.main.CoreQueue()
+    for i in range(0, 3):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i, cpu=2)
+    queue.enqueue(core4.queue.helper.job.example.DummyJob, i=3, memory=512)
+    worker = core4.queue.worker.CoreWorker()
+    worker.slot = {"cpu": 3, "memory": 1024}
+    worker.at = core4.util.node.mongo_now()
+    assert worker.get_next_job()["args"] == {"i": 0}
+    assert worker.get_next_job()["args"] == {"i": 3}
+    assert worker.get_next_job() is None
+    queue.enqueue(core4.queue.helper.job.example.DummyJob, i=4, cpu=2,
+                  force=True)
+    assert worker.get_next_job()["args"] == {"i": 4}
+
+
+def test_claim_maintenance():
+    queue = core4.queue.main.CoreQueue()
+    queue.enqueue(core4.queue.helper.job.example.DummyJob)
+    queue.enter_maintenance("core4")
+    worker = core4.queue.worker.CoreWorker()
+    worker.at = core4.util.node.mongo_now()
+    assert worker.get_next_job() is None
+    queue.leave_maintenance("core4")
+    assert worker.get_next_job() is not None
+
+
+def test_wakeup():
+    worker = core4.queue.worker.CoreWorker()
+    worker.at = core4.util.node.mongo_now()
+    worker.wait_time = 5
+    worker.watcher = threading.Thread()
+    step = [s for s in worker.plan if s["name"] == "work_jobs"][0]
+    step["next"] = worker.at + datetime.timedelta(seconds=60)
+    worker.wakeup.set()
+    t0 = time.time()
+    worker.wait()
+    assert time.time() - t0 < 1
+    assert step["next"] == worker.at
+    assert not worker.wakeup.is_set()
+
+
 
 def test_remove(mongodb):
     queue = core4.queue.main.CoreQueue()
@@ -439,6 +535,105 @@ def test_ok(queue, worker):
     worker.wait_queue()
 
 
+@pytest.fixture
+def fork_server():
+    os.environ["CORE4_OPTION_worker__fork_server__enabled"] = "!!bool True"
+
+
+@pytest.mark.timeout(120)
+def test_fork_server(fork_server, queue, worker):
+    for i in range(3):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, sleep=0, i=i)
+    worker.start(1)
+    worker.wait_queue()
+    assert queue.config.sys.journal.count_documents(
+        {"state": "complete"}) == 3
+    data = list(queue.config.sys.log.find())
+    assert sum([1 for d in data
+                if "spawned fork server" in d["message"]]) == 1
+
+
+def fake_fork_server(out, preload=0, stall=0, answer=True):
+    # fork server which records the job ids it runs in file out
+    return "\n".join([
+        "import sys, time",
+        "time.sleep({})".format(preload),
+        "print('ready', flush=True)",
+        "time.sleep({})".format(stall),
+        "for line in sys.stdin:",
+        "    open({!r}, 'a').write(line)".format(out),
+        "    print(4711, flush=True)" if answer else "    time.sleep(30)"
+    ])
+
+
+class FakeForkServer(core4.queue.forkserver.CoreForkServer):
+
+    def __init__(self, out, **kwargs):
+        super().__init__()
+        self.out = out
+        self.script = fake_fork_server(out, **kwargs)
+        self.spawned = []
+
+    def spawn(self, name):
+        proc = subprocess.Popen(
+            [sys.executable, "-c", self.script], stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE, universal_newlines=True, bufsize=1)
+        self.server[name.split(".")[0]] = proc
+        self.spawned.append(proc)
+        return proc
+
+    def run(self, job_id):
+        # launch with the fall back of CoreWorker.start_job
+        pid = self.launch("project.Job", job_id)
+        if pid is None:
+            with open(self.out, "a") as fh:
+                fh.write(job_id + "\n")
+        return pid
+
+    def executed(self):
+        with open(self.out, "r") as fh:
+            return sorted(fh.read().split())
+
+
+@pytest.mark.timeout(60)
+def test_fork_server_preload(fork_server, queue, tmpdir):
+    server = FakeForkServer(str(tmpdir.join("out")), preload=2)
+    assert server.run("job1") is None
+    assert server.run("job2") is None
+    assert not server.is_ready("project")
+    time.sleep(3)
+    assert server.is_ready("project")
+    assert server.run("job3") == 4711
+    server.stop()
+    assert len(server.spawned) == 1
+    assert server.executed() == ["job1", "job2", "job3"]
+
+
+@pytest.mark.timeout(60)
+def test_fork_server_failure(fork_server, queue, tmpdir):
+    os.environ["CORE4_OPTION_worker__fork_server__timeout"] = "!!int 1"
+    server = FakeForkServer(str(tmpdir.join("out")), stall=3)
+    assert server.run("job1") is None
+    while not server.is_ready("project"):
+        time.sleep(0.1)
+    # no answer, the job id is still buffered
+    assert server.run("job2") is None
+    assert server.spawned[0].poll() is not None
+    time.sleep(3)
+    assert server.executed() == ["job1", "job2"]
+    # fork server quits
+    server.script = ("import sys; print('ready', flush=True); "
+                     "sys.stdin.readline()")
+    assert server.run("job3") is None
+    while not server.is_ready("project"):
+        time.sleep(0.1)
+    assert server.run("job4") is None
+    assert server.spawned[1].poll() is not None
+    assert "project" not in server.server
+    server.stop()
+    assert server.executed() == ["job1", "job2", "job3", "job4"]
+
+
 @pytest.mark.timeout(120)
 def test_error(queue, worker):
     import tests.project.work
@@ -788,6 +983,65 @@ def test_restart_error(queue, worker):
     assert queue.config.sys.lock.count_documents({}) == 0
 
 
+def test_reap(queue):
+    job = queue.enqueue(core4.queue.helper.job.example.DummyJob)
+    worker = core4.queue.worker.CoreWorker()
+    worker.at = core4.util.node.mongo_now()
+    doc = worker.get_next_job()
+    proc = subprocess.Popen(["sleep", "60"])
+    worker.register_process(doc["_id"], proc.pid)
+    worker.reap_jobs()
+    assert queue.find_job(job._id).state == "running"
+    proc.kill()
+    proc.wait()
+    worker.reap_jobs()
+    assert worker.process == {}
+    assert queue.find_job(job._id).state == "killed"
+
+
+def test_reap_fallback(queue):
+    job = queue.enqueue(core4.queue.helper.job.example.DummyJob)
+    worker = core4.queue.worker.CoreWorker()
+    worker.poller = None
+    worker.at = core4.util.node.mongo_now()
+    doc = worker.get_next_job()
+    proc = subprocess.Popen(["sleep", "60"])
+    worker.register_process(doc["_id"], proc.pid)
+    worker.reap_jobs()
+    assert queue.find_job(job._id).state == "running"
+    proc.kill()
+    worker.reap_jobs()
+    assert worker.process == {}
+    assert queue.find_job(job._id).state == "killed"
+    assert not psutil.pid_exists(proc.pid)
+
+
+def test_process_exited():
+    pid = os.getpid()
+    created = psutil.Process(pid).create_time()
+    exited = core4.queue.worker.CoreWorker.process_exited
+    assert not exited({"pid": pid, "created": created})
+    # recycled process id
+    assert exited({"pid": pid, "created": created - 1})
+    assert exited({"pid": pid, "created": None})
+
+
+@pytest.mark.timeout(120)
+def test_kill_latency(queue, worker):
+    job = queue.enqueue(ForeverJob)
+    worker.start(1)
+    while True:
+        job = queue.find_job(job._id)
+        if job.locked and job.locked["pid"]:
+            break
+    t0 = time.time()
+    queue.kill_job(job._id)
+    while queue.find_job(job._id).state != "killed":
+        time.sleep(0.05)
+    assert time.time() - t0 < 2
+    worker.stop()
+
+
 def test_kill_running_only(queue):
     job = queue.enqueue(core4.queue.helper.job.example.DummyJob)
     assert not queue.kill_job(job._id)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the request latency of an authenticated user with nested roles
+against the core4 API server of ``tests/api``. The benchmark reports the hit
+rate of :class:`.CoreTokenCache`.
+
+Usage:
+  bench_auth [--requests=REQUESTS] [--depth=DEPTH] [--ttl=TTL]
+
+Options:
+  --requests=REQUESTS  number of requests [default: 500]
+  --depth=DEPTH        number of nested roles of the user [default: 5]
+  --ttl=TTL            role cache ttl in seconds, 0 revalidates each request
+                       [default: 10]
+"""
+
+import os
+import statistics
+import time
+
+import tornado.ioloop
+from docopt import docopt
+
+from core4.api.v1.request.token import CoreTokenCache
+from core4.api.v1.server import CoreApiServer
+from tests.api.test_test import run, asset
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+async def bench(client, nreq, depth):
+    await client.login()
+    parent = []
+    for i in range(depth):
+        rv = await client.post("/core4/api/v1/roles", body={
+            "name": "role{}".format(i),
+            "perm": ["api://core4.api.v1.request.standard"],
+            "role": parent
+        })
+        assert rv.code == 200
+        parent = ["role{}".format(i)]
+    rv = await client.post("/core4/api/v1/roles", body={
+        "name": "user",
+        "email": "user@mail.com",
+        "passwd": "123456",
+        "role": parent
+    })
+    assert rv.code == 200
+    await client.login("user", "123456")
+    latency = []
+    with Timer() as timer:
+        for _ in range(nreq):
+            t0 = time.perf_counter()
+            rv = await client.get("/core4/api/v1/profile")
+            assert rv.code == 200
+            latency.append((time.perf_counter() - t0) * 1000.)
+    report("profile with {} nested roles".format(depth), nreq,
+           timer.elapsed, "requests")
+    print("request latency [msec.]: mean {:1.2f}, median {:1.2f}, "
+          "max {:1.2f}".format(statistics.mean(latency),
+                               statistics.median(latency), max(latency)))
+    print("token cache hit rate: {:1.2f}".format(CoreTokenCache().hit_rate))
+
+
+def main():
+    args = docopt(__doc__)
+    os.environ["CORE4_CONFIG"] = asset("config/empty.yaml")
+    conn = setup(api__role_cache__ttl="!!int {}".format(args["--ttl"]),
+                 api__setting__cookie_secret="bench",
+                 api__setting__debug="!!bool False")
+    loop = tornado.ioloop.IOLoop.current()
+    for client in run(CoreApiServer):
+        loop.run_sync(lambda: bench(client, int(args["--requests"]),
+                                    int(args["--depth"])))
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures job claims per second of :meth:`.CoreWorker.get_next_job` with
+concurrent workers.
+
+Usage:
+  bench_claim [--worker=WORKER] [--jobs=JOBS]
+
+Options:
+  --worker=WORKER  number of concurrent workers [default: 4]
+  --jobs=JOBS      number of jobs to enqueue [default: 1000]
+"""
+
+import threading
+
+from docopt import docopt
+
+import core4.queue.helper.job.example
+import core4.queue.main
+import core4.queue.worker
+import core4.util.node
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def claim(worker, count):
+    while True:
+        worker.at = core4.util.node.mongo_now()
+        doc = worker.get_next_job()
+        if doc is None:
+            break
+        count.append(doc["_id"])
+
+
+def main():
+    args = docopt(__doc__)
+    nworker = int(args["--worker"])
+    njobs = int(args["--jobs"])
+    conn = setup(worker__max_cpu="!!int 100",
+                 worker__min_free_ram="!!int 0")
+    queue = core4.queue.main.CoreQueue()
+    for i in range(njobs):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i,
+                      max_parallel=njobs)
+    workers = [core4.queue.worker.CoreWorker(name="bench-{}".format(i))
+               for i in range(nworker)]
+    claimed = [[] for _ in workers]
+    pool = [threading.Thread(target=claim, args=(w, c))
+            for w, c in zip(workers, claimed)]
+    with Timer() as t:
+        for th in pool:
+            th.start()
+        for th in pool:
+            th.join()
+    total = [_id for c in claimed for _id in c]
+    assert len(total) == len(set(total)), "duplicate claims"
+    report("claims with {} worker".format(nworker), len(total), t.elapsed,
+           "claims")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
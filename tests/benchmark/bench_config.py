@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures :class:`.CoreBase` construction time with and without the
+process-wide configuration snapshot of :class:`.CoreConfig`.
+
+Usage:
+  bench_config [--objects=OBJECTS]
+
+Options:
+  --objects=OBJECTS  number of objects to create [default: 1000]
+"""
+
+from docopt import docopt
+
+import core4.base
+import core4.config.main
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def main():
+    args = docopt(__doc__)
+    nobj = int(args["--objects"])
+    conn = setup()
+    for cache in (False, True):
+        core4.config.main.CoreConfig.cache = cache
+        with Timer() as timer:
+            for _ in range(nobj):
+                core4.base.CoreBase()
+        report("CoreBase() {} snapshot".format(
+            "with" if cache else "without"), nobj, timer.elapsed, "objects")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
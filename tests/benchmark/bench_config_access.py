@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the configuration and collection access of the worker loop, i.e.
+``config.sys.queue``, ``config.worker.max_cpu`` and
+``config.api.token.refresh``.
+
+Usage:
+  bench_config_access [--loops=LOOPS]
+
+Options:
+  --loops=LOOPS  number of loops [default: 1000000]
+"""
+
+from docopt import docopt
+
+from core4.base import CoreBase
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def main():
+    args = docopt(__doc__)
+    nloops = int(args["--loops"])
+    conn = setup()
+    config = CoreBase().config
+    with Timer() as timer:
+        for _ in range(nloops):
+            config.worker.max_cpu
+    report("config.worker.max_cpu", nloops, timer.elapsed, "access")
+    with Timer() as timer:
+        for _ in range(nloops):
+            config.api.token.refresh
+    report("config.api.token.refresh", nloops, timer.elapsed, "access")
+    with Timer() as timer:
+        for _ in range(nloops):
+            config.sys.queue.find
+    report("config.sys.queue.find", nloops, timer.elapsed, "access")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
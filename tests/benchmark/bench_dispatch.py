@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the latency between job enqueue and job claim of a running
+:class:`.CoreWorker` with polling and with change stream dispatch (requires
+a MongoDB replica set).
+
+Usage:
+  bench_dispatch [--jobs=JOBS] [--change-stream]
+
+Options:
+  --jobs=JOBS      number of jobs to enqueue one after another [default: 20]
+  --change-stream  enable ``worker.change_stream``
+"""
+
+import statistics
+import threading
+import time
+
+from docopt import docopt
+
+import core4.queue.helper.job.example
+import core4.queue.main
+import core4.queue.worker
+from tests.benchmark.util import setup, teardown
+
+
+class ClaimWorker(core4.queue.worker.CoreWorker):
+    """
+    Claims jobs without launching them.
+    """
+
+    def start_job(self, doc, run_async=True, claimed=False):
+        pass
+
+
+def main():
+    args = docopt(__doc__)
+    njobs = int(args["--jobs"])
+    conn = setup(worker__max_cpu="!!int 100",
+                 worker__min_free_ram="!!int 0",
+                 worker__change_stream="!!bool {}".format(
+                     args["--change-stream"]))
+    queue = core4.queue.main.CoreQueue()
+    worker = ClaimWorker(name="bench")
+    thread = threading.Thread(target=worker.start)
+    thread.start()
+    while worker.phase["loop"] is None:
+        time.sleep(0.1)
+    latency = []
+    for i in range(njobs):
+        t0 = time.perf_counter()
+        job = queue.enqueue(core4.queue.helper.job.example.DummyJob, i=i)
+        while queue.config.sys.queue.count_documents(
+                {"_id": job._id, "state": "running"}) == 0:
+            time.sleep(0.002)
+        latency.append((time.perf_counter() - t0) * 1000.)
+    worker.exit = True
+    thread.join()
+    print("enqueue to claim latency with {} [msec.]: mean {:1.1f}, "
+          "median {:1.1f}, max {:1.1f}".format(
+              "change stream" if args["--change-stream"] else "polling",
+              statistics.mean(latency), statistics.median(latency),
+              max(latency)))
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compares enqueue throughput of looped :meth:`.CoreQueue.enqueue` with
+:meth:`.CoreQueue.enqueue_many`.
+
+Usage:
+  bench_enqueue [--jobs=JOBS]
+
+Options:
+  --jobs=JOBS  number of jobs to enqueue per mode [default: 5000]
+"""
+
+from docopt import docopt
+
+import core4.queue.helper.job.example
+import core4.queue.main
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def main():
+    args = docopt(__doc__)
+    njobs = int(args["--jobs"])
+    conn = setup()
+    queue = core4.queue.main.CoreQueue()
+    job = core4.queue.helper.job.example.DummyJob
+    with Timer() as t:
+        for i in range(njobs):
+            queue.enqueue(job, i=i)
+    report("enqueue", njobs, t.elapsed, "jobs")
+    with Timer() as t:
+        queue.enqueue_many(job, [{"i": i} for i in range(njobs, 2 * njobs)])
+    report("enqueue_many", njobs, t.elapsed, "jobs")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
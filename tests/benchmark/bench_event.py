@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the broadcast of the job state summary of :class:`.EventHandler`
+to many websocket subscribers of channel *queue* against the core4 API
+server of ``tests/api``. The benchmark compares the summary built per
+subscriber with the summary built once per distinct set of permissions (see
+:meth:`.EventHandler.on_queue`). Both broadcast the same summaries, each
+other round with a change.
+
+Usage:
+  bench_event [--clients=CLIENTS] [--users=USERS] [--jobs=JOBS] \
+[--rounds=ROUNDS]
+
+Options:
+  --clients=CLIENTS  number of websocket subscribers [default: 1000]
+  --users=USERS      number of users with distinct permissions [default: 10]
+  --jobs=JOBS        number of job names in the summary [default: 100]
+  --rounds=ROUNDS    number of broadcasts [default: 20]
+"""
+
+import asyncio
+import os
+
+import tornado.ioloop
+import tornado.websocket
+from docopt import docopt
+
+import core4.const
+import core4.util.node
+from core4.api.v1.request.standard.event import EventHandler
+from core4.api.v1.server import CoreApiServer
+from core4.util.data import json_encode
+from tests.api.test_test import run, asset
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+async def on_queue(change):
+    # summary built, checked and encoded per subscriber
+    data = {
+        "created": core4.util.node.mongo_now(),
+        "name": "summary",
+        "author": core4.util.node.get_username(),
+        "channel": core4.const.QUEUE_CHANNEL,
+    }
+    for waiter, interest in EventHandler.waiters.items():
+        if core4.const.QUEUE_CHANNEL in interest:
+            data["data"] = []
+            for line in change:
+                line = dict(line)
+                if not await waiter.user.has_api_access(line["name"]):
+                    line["name"] = "UnauthorizedJob"
+                data["data"].append(line)
+            if data["data"] != waiter.last:
+                waiter.write_message(json_encode(data))
+                waiter.last = data["data"]
+
+
+def make_change(njob, nround):
+    return [{"name": "project{}.job.Job{}".format(i % 10, i),
+             "state": "pending", "zombie": False, "wall": False,
+             "removed": False, "killed": False,
+             "n": 1 + nround // 2, "progress": None}
+            for i in range(njob)]
+
+
+async def broadcast(title, func, received, nround, njob):
+    for waiter in EventHandler.waiters:
+        waiter.last = None
+    start = sum(received)
+    with Timer() as timer:
+        for i in range(nround):
+            await func(make_change(njob, i))
+            # let the server write the messages
+            await asyncio.sleep(0)
+    report(title, nround, timer.elapsed, "broadcasts")
+    while sum(received) - start < len(received) * ((nround + 1) // 2):
+        await asyncio.sleep(0.1)
+    print("messages received: {}".format(sum(received) - start))
+
+
+async def bench(client, nclient, nuser, njob, nround):
+    await client.login()
+    token = []
+    for i in range(nuser):
+        rv = await client.post("/core4/api/v1/roles", body={
+            "name": "user{}".format(i),
+            "email": "user{}@mail.com".format(i),
+            "passwd": "123456",
+            "perm": ["api://core4.api.v1.request.standard.*",
+                     "api://project{}.*".format(i)]
+        })
+        assert rv.code == 200
+        await client.login("user{}".format(i), "123456")
+        token.append(client.token)
+    received = [0] * nclient
+
+    def count(i):
+        def callback(message):
+            if message is not None:
+                received[i] += 1
+        return callback
+
+    url = client.get_url("/core4/api/v1/event").replace("http", "ws", 1)
+    conn = []
+    for i in range(nclient):
+        ws = await tornado.websocket.websocket_connect(
+            url + "?token=" + token[i % nuser],
+            on_message_callback=count(i))
+        ws.write_message(json_encode({
+            "type": "interest", "data": [core4.const.QUEUE_CHANNEL]}))
+        conn.append(ws)
+    # wait for the confirmation of all interests
+    while sum(received) < nclient:
+        await asyncio.sleep(0.1)
+    assert EventHandler.has_interest(core4.const.QUEUE_CHANNEL)
+    await broadcast("per subscriber", on_queue, received, nround, njob)
+    await broadcast("per permission set", EventHandler.on_queue, received,
+                    nround, njob)
+    for ws in conn:
+        ws.close()
+
+
+def main():
+    args = docopt(__doc__)
+    os.environ["CORE4_CONFIG"] = asset("config/empty.yaml")
+    conn = setup(api__setting__cookie_secret="bench",
+                 api__setting__debug="!!bool False",
+                 event__queue_interval="!!int 3600")
+    loop = tornado.ioloop.IOLoop.current()
+    for client in run(CoreApiServer):
+        loop.run_sync(lambda: bench(
+            client, int(args["--clients"]), int(args["--users"]),
+            int(args["--jobs"]), int(args["--rounds"])))
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
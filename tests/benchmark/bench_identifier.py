@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the instantiation of :class:`.CoreBase` objects in a deep call
+stack with the identifier inherited from the context and with frame
+inspection.
+
+Usage:
+  bench_identifier [--objects=OBJECTS] [--depth=DEPTH]
+
+Options:
+  --objects=OBJECTS  number of objects to create [default: 2000]
+  --depth=DEPTH      depth of the call stack [default: 50]
+"""
+
+import os
+
+from docopt import docopt
+
+import core4.base.main
+from core4.base import CoreBase
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def create(depth, nobj):
+    if depth > 0:
+        return create(depth - 1, nobj)
+    return [CoreBase().identifier for _ in range(nobj)]
+
+
+def main():
+    args = docopt(__doc__)
+    nobj = int(args["--objects"])
+    depth = int(args["--depth"])
+    conn = setup()
+    token = core4.base.main.set_identifier("bench")
+    with Timer() as timer:
+        ident = create(depth, nobj)
+    report("context identifier", nobj, timer.elapsed, "objects")
+    assert set(ident) == {"bench"}
+    core4.base.main.reset_identifier(token)
+    os.environ["CORE4_OPTION_base__inspect_identifier"] = "!!bool True"
+    owner = CoreBase()
+    owner.identifier = "bench"
+    with Timer() as timer:
+        ident = create(depth, nobj)
+    report("frame inspection", nobj, timer.elapsed, "objects")
+    assert set(ident) == {"bench"}
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures job launch latency of :class:`.CoreWorker` with a new Python
+interpreter per job (``Popen``) and with the fork server. Latency is the time
+between :meth:`.CoreWorker.start_job` and the job's process id arriving in
+``locked.pid``.
+
+Usage:
+  bench_launch [--jobs=JOBS]
+
+Options:
+  --jobs=JOBS  number of jobs to launch per mode [default: 20]
+"""
+
+import statistics
+import time
+
+from docopt import docopt
+
+import core4.queue.forkserver
+import core4.queue.helper.job.example
+import core4.queue.main
+import core4.queue.worker
+import core4.util.node
+from tests.benchmark.util import setup, teardown
+
+
+def measure(worker, queue, njobs):
+    latency = []
+    for i in range(njobs):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob, sleep=0, i=i)
+        worker.at = core4.util.node.mongo_now()
+        doc = worker.get_next_job()
+        t0 = time.perf_counter()
+        worker.start_job(doc, claimed=True)
+        while queue.config.sys.queue.count_documents(
+                {"_id": doc["_id"], "locked.pid": None}) > 0:
+            time.sleep(0.001)
+        latency.append((time.perf_counter() - t0) * 1000.)
+    while queue.config.sys.queue.count_documents({}) > 0:
+        time.sleep(0.1)
+    return latency
+
+
+def main():
+    args = docopt(__doc__)
+    njobs = int(args["--jobs"])
+    conn = setup(worker__max_cpu="!!int 100",
+                 worker__min_free_ram="!!int 0")
+    queue = core4.queue.main.CoreQueue()
+    worker = core4.queue.worker.CoreWorker(name="bench")
+    result = [("popen", measure(worker, queue, njobs))]
+    worker.fork_server = core4.queue.forkserver.CoreForkServer()
+    # first launch spawns the fork server and falls back to popen
+    result.append(("fork server (cold)", measure(worker, queue, 1)))
+    while not worker.fork_server.is_ready("core4"):
+        time.sleep(0.1)
+    result.append(("fork server (warm)", measure(worker, queue, njobs)))
+    worker.fork_server.stop()
+    for mode, latency in result:
+        print("launch latency {:20s} [msec.]: mean {:7.1f}, median {:7.1f}, "
+              "max {:7.1f}".format(mode, statistics.mean(latency),
+                                   statistics.median(latency), max(latency)))
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures job permission checks of :class:`.CorePermMatcher` against the
+iteration over all permission strings with :func:`re.match`.
+
+Usage:
+  bench_perm [--names=NAMES] [--perm=PERM] [--distinct=DISTINCT]
+
+Options:
+  --names=NAMES        number of job names to check [default: 100000]
+  --perm=PERM          number of job permissions of the role [default: 50]
+  --distinct=DISTINCT  number of distinct job names [default: 200]
+"""
+
+import re
+
+from docopt import docopt
+
+from core4.api.v1.request.role.perm import CorePermMatcher
+from tests.benchmark.util import Timer, report
+
+
+def iterate(perm, qual_name, access):
+    for p in perm:
+        (*proto, qn, acc) = p.split("/")
+        if proto[0] == "job:":
+            if re.match(qn, qual_name):
+                if acc.lower() in access:
+                    return True
+    return False
+
+
+def main():
+    args = docopt(__doc__)
+    nnames = int(args["--names"])
+    ndistinct = int(args["--distinct"])
+    perm = ["job://project{}.job.*/x".format(i)
+            for i in range(int(args["--perm"]))]
+    perm += ["api://core4.api.v1.request.standard.*"]
+    names = ["project{}.job.Job{}".format(i % 100, i % ndistinct)
+             for i in range(nnames)]
+    with Timer() as timer:
+        n1 = sum(iterate(perm, qn, ("x", "r")) for qn in names)
+    report("iterate permissions", nnames, timer.elapsed, "checks")
+    with Timer() as timer:
+        matcher = CorePermMatcher(perm)
+        n2 = sum(matcher.has_job(qn, ("x", "r")) for qn in names)
+    report("compiled matcher", nnames, timer.elapsed, "checks")
+    assert n1 == n2
+
+
+if __name__ == '__main__':
+    main()
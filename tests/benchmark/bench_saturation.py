@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures node saturation of a running :class:`.CoreWorker`. The benchmark
+enqueues a batch of :class:`.DummyJob` and samples the number of running
+jobs, the occupied CPU slots and the node's CPU utilisation every second
+until all jobs completed.
+
+Usage:
+  bench_saturation [--jobs=JOBS] [--sec=SEC] [--cpu=CPU] [--slot=SLOT]
+
+Options:
+  --jobs=JOBS  number of jobs to enqueue [default: 32]
+  --sec=SEC    sleep time of each job in seconds [default: 5]
+  --cpu=CPU    CPU slots requested by each job [default: 1]
+  --slot=SLOT  CPU slots of the worker, defaults to the number of CPUs
+"""
+
+import threading
+import time
+
+import psutil
+from docopt import docopt
+
+import core4.queue.helper.job.example
+import core4.queue.main
+import core4.queue.worker
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def main():
+    args = docopt(__doc__)
+    njobs = int(args["--jobs"])
+    option = dict(worker__max_cpu="!!int 100",
+                  worker__min_free_ram="!!int 0")
+    if args["--slot"]:
+        option["worker__slot__cpu"] = "!!int {}".format(args["--slot"])
+    conn = setup(**option)
+    queue = core4.queue.main.CoreQueue()
+    for i in range(njobs):
+        queue.enqueue(core4.queue.helper.job.example.DummyJob,
+                      sleep=int(args["--sec"]), i=i, cpu=int(args["--cpu"]))
+    worker = core4.queue.worker.CoreWorker(name="bench")
+    thread = threading.Thread(target=worker.start)
+    psutil.cpu_percent()
+    with Timer() as timer:
+        thread.start()
+        while queue.config.sys.queue.count_documents({}) > 0:
+            time.sleep(1)
+            running = list(queue.config.sys.queue.find(
+                {"state": "running"}, projection=["cpu"]))
+            print("{:8.1f} sec. running {:>4d} jobs, {:>4d} of {} cpu "
+                  "slots, cpu {:5.1f}%".format(
+                      time.perf_counter() - timer.start, len(running),
+                      sum(d.get("cpu") or 1 for d in running),
+                      worker.slot["cpu"], psutil.cpu_percent()))
+    worker.exit = True
+    thread.join()
+    report("complete jobs with {} cpu slots".format(worker.slot["cpu"]),
+           njobs, timer.elapsed, "jobs")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the tick rate of :meth:`.CoreScheduler.get_next` with many
+scheduled jobs.
+
+Usage:
+  bench_schedule [--jobs=JOBS] [--ticks=TICKS]
+
+Options:
+  --jobs=JOBS    number of scheduled jobs [default: 5000]
+  --ticks=TICKS  number of one second ticks [default: 3600]
+"""
+
+import datetime
+
+from docopt import docopt
+
+from core4.queue.scheduler import CoreScheduler
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def main():
+    args = docopt(__doc__)
+    njobs = int(args["--jobs"])
+    nticks = int(args["--ticks"])
+    conn = setup()
+    scheduler = CoreScheduler()
+    scheduler.job = dict(
+        ("bench.job{}".format(i), {"schedule": "{} * * * *".format(i % 60)})
+        for i in range(njobs))
+    start = datetime.datetime(2018, 1, 1)
+    previous = None
+    due = 0
+    with Timer() as timer:
+        for i in range(nticks):
+            at = start + datetime.timedelta(seconds=i)
+            due += len(scheduler.get_next(previous, at))
+            previous = at
+    report("get_next with {} jobs, {} due".format(njobs, due), nticks,
+           timer.elapsed, "ticks")
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
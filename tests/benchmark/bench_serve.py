@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures the request rate of the core4 API server with one or multiple
+server processes sharing the listening socket (see
+:meth:`.CoreApiServerTool.fork`). Each client process sends requests with
+the admin token to the passed endpoint.
+
+Usage:
+  bench_serve [--processes=PROCESSES]... [--requests=REQUESTS] \
+[--clients=CLIENTS] [--port=PORT] [--path=PATH]
+
+Options:
+  --processes=PROCESSES  number of server processes [default: 1 2 4]
+  --requests=REQUESTS    number of requests per client [default: 500]
+  --clients=CLIENTS      number of client processes [default: 8]
+  --port=PORT            port to serve [default: 5901]
+  --path=PATH            endpoint to request [default: /core4/api/v1/profile]
+"""
+
+import multiprocessing
+import time
+
+import requests
+from docopt import docopt
+
+import core4.logger.mixin
+import core4.queue.main
+from core4.api.v1.server import CoreApiServer
+from core4.api.v1.tool.functool import serve
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def run_server(port, processes):
+    core4.logger.mixin.logon()
+    serve(CoreApiServer, port=port, processes=processes)
+
+
+def run_client(url, token, nreq):
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer " + token
+    for _ in range(nreq):
+        rv = session.get(url)
+        assert rv.status_code == 200
+
+
+def login(base):
+    for _ in range(100):
+        try:
+            rv = requests.get(base + "/core4/api/v1/login",
+                              params={"username": "admin", "password": "hans"})
+        except requests.ConnectionError:
+            time.sleep(0.2)
+        else:
+            return rv.json()["data"]["token"]
+    raise RuntimeError("server not available")
+
+
+def main():
+    args = docopt(__doc__)
+    port = int(args["--port"])
+    nreq = int(args["--requests"])
+    nclient = int(args["--clients"])
+    base = "http://localhost:{}".format(port)
+    conn = setup(api__admin_password="hans",
+                 api__setting__cookie_secret="bench",
+                 api__setting__debug="!!bool False",
+                 daemon__heartbeat="!!int 1")
+    processes = [int(p) for a in args["--processes"] for p in a.split()]
+    for nproc in processes:
+        server = multiprocessing.Process(target=run_server,
+                                         args=(port, nproc))
+        server.start()
+        token = login(base)
+        clients = [multiprocessing.Process(
+            target=run_client, args=(base + args["--path"], token, nreq))
+            for _ in range(nclient)]
+        with Timer() as timer:
+            for c in clients:
+                c.start()
+            for c in clients:
+                c.join()
+        report("{} server processes, {} clients".format(nproc, nclient),
+               nreq * nclient, timer.elapsed, "requests")
+        core4.queue.main.CoreQueue().halt(now=True)
+        server.join()
+        time.sleep(1)
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+Measures :class:`.JobStream` with many concurrent SSE clients watching the
+same job against the core4 API server of ``tests/api``. The benchmark
+reports the MongoDB query rate while the job is idle, the number of state
+events per client while the job reports progress and the delay until all
+clients received the final job state.
+
+Usage:
+  bench_stream [--clients=CLIENTS] [--updates=UPDATES] [--rate=RATE] \
+[--idle=IDLE] [--change-stream]
+
+Options:
+  --clients=CLIENTS  number of concurrent SSE clients [default: 200]
+  --updates=UPDATES  number of progress updates of the job [default: 100]
+  --rate=RATE        progress updates per second [default: 20]
+  --idle=IDLE        seconds to measure the idle query rate [default: 5]
+  --change-stream    watch job states with change streams (requires
+                     MongoDB replica set)
+"""
+
+import asyncio
+import os
+
+import tornado.httpclient
+import tornado.ioloop
+import tornado.simple_httpclient
+from bson.objectid import ObjectId
+from docopt import docopt
+
+import core4.util.node
+from core4.api.v1.request.queue.watch import CoreJobWatch
+from core4.api.v1.server import CoreApiServer
+from tests.api.test_test import run, asset
+from tests.benchmark.util import setup, teardown, Timer, report
+
+
+def opcount(conn):
+    counter = conn.admin.command("serverStatus")["opcounters"]
+    return counter["query"] + counter["getmore"] + counter["command"]
+
+
+async def bench(client, conn, nclient, nupdate, rate, idle):
+    await client.login()
+    rv = await client.post("/core4/api/v1/jobs/enqueue", json={
+        "name": "core4.queue.helper.job.example.DummyJob"})
+    assert rv.code == 200
+    _id = rv.json()["data"]["_id"]
+    oid = ObjectId(_id)
+    event = [0] * nclient
+
+    def count(i):
+        def callback(chunk):
+            event[i] += chunk.count(b"event: state")
+        return callback
+
+    stream = tornado.simple_httpclient.SimpleAsyncHTTPClient(
+        force_instance=True, max_clients=nclient)
+    response = [stream.fetch(tornado.httpclient.HTTPRequest(
+        client.get_url("/core4/api/v1/jobs/poll/" + _id),
+        headers={"Authorization": "bearer " + client.token},
+        streaming_callback=count(i), request_timeout=3600))
+        for i in range(nclient)]
+    await asyncio.sleep(1)
+    assert len(CoreJobWatch().subscriber[oid]) == nclient
+    start = opcount(conn)
+    await asyncio.sleep(idle)
+    print("idle queries per second with {} clients: {:1.2f}".format(
+        nclient, (opcount(conn) - start) / idle))
+
+    coll = CoreJobWatch().config.sys.queue.connect_async()
+    with Timer() as timer:
+        for i in range(nupdate):
+            await coll.update_one({"_id": oid}, update={"$set": {
+                "locked.heartbeat": core4.util.node.now(),
+                "prog.message": "update {}".format(i),
+                "prog.value": i / nupdate}})
+            await asyncio.sleep(1. / rate)
+    report("progress updates", nupdate, timer.elapsed, "updates")
+    print("state events per client: mean {:1.2f}, max {}".format(
+        sum(event) / nclient, max(event)))
+    with Timer() as timer:
+        await coll.update_one({"_id": oid},
+                              update={"$set": {"state": "complete"}})
+        for rv in await asyncio.gather(*response):
+            assert rv.code == 200
+    print("final state delivered to {} clients in {:1.2f} sec.".format(
+        nclient, timer.elapsed))
+    stream.close()
+
+
+def main():
+    args = docopt(__doc__)
+    os.environ["CORE4_CONFIG"] = asset("config/empty.yaml")
+    conn = setup(api__setting__cookie_secret="bench",
+                 api__setting__debug="!!bool False",
+                 api__job_stream__change_stream="!!bool {}".format(
+                     args["--change-stream"]))
+    loop = tornado.ioloop.IOLoop.current()
+    for client in run(CoreApiServer):
+        loop.run_sync(lambda: bench(
+            client, conn, int(args["--clients"]), int(args["--updates"]),
+            float(args["--rate"]), float(args["--idle"])))
+    teardown(conn)
+
+
+if __name__ == '__main__':
+    main()